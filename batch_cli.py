@@ -0,0 +1,282 @@
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from btc_mining_calculator import BTCMiningCalculator
+
+# 场景文件中必须提供的列，列名与calculate_roi的参数名一致
+REQUIRED_COLUMNS = ['hashrate_th', 'power_watts', 'electricity_cost_kwh', 'hardware_cost']
+
+# 可选列及其默认值，与calculate_roi的默认参数一致
+OPTIONAL_COLUMNS = {
+    'pool_fee_percent': 2.0,
+    'maintenance_cost_yearly': 0.0,
+    'hardware_depreciation_yearly': 0.0,
+    'block_reward': None,
+    'annual_utilization_rate': 100.0
+}
+
+DEFAULT_CHUNK_SIZE = 100_000
+
+FORMAT_BY_EXTENSION = {
+    '.csv': 'csv',
+    '.json': 'json',
+    '.jsonl': 'jsonl',
+    '.ndjson': 'jsonl',
+    '.parquet': 'parquet',
+    '.pq': 'parquet'
+}
+
+
+def detect_format(path, explicit=None):
+    """
+    根据扩展名推断文件格式
+    :param path: 文件路径
+    :param explicit: 命令行显式指定的格式，优先使用
+    :return: csv/json/jsonl/parquet之一
+    """
+    if explicit:
+        return explicit
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in FORMAT_BY_EXTENSION:
+        raise ValueError(f"无法识别文件格式: {path}，请使用--input-format/--output-format指定")
+    return FORMAT_BY_EXTENSION[ext]
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise RuntimeError("读写Parquet需要安装pyarrow: pip install pyarrow")
+    return pyarrow
+
+
+def iter_scenario_chunks(path, fmt, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    分块读取场景文件，保证内存占用与文件大小无关
+    :param path: 场景文件路径
+    :param fmt: 文件格式
+    :param chunk_size: 每块的行数
+    :return: 逐块产出DataFrame的生成器
+    """
+    if fmt == 'csv':
+        yield from pd.read_csv(path, chunksize=chunk_size)
+    elif fmt == 'jsonl':
+        yield from pd.read_json(path, lines=True, chunksize=chunk_size)
+    elif fmt == 'parquet':
+        pa = _require_pyarrow()
+        parquet_file = pa.parquet.ParquetFile(path)
+        for batch in parquet_file.iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+    elif fmt == 'json':
+        # JSON数组无法流式解析，整体读入后再分块计算；大文件请使用JSON Lines
+        with open(path, encoding='utf-8') as f:
+            records = json.load(f)
+        for start in range(0, len(records), chunk_size):
+            yield pd.DataFrame.from_records(records[start:start + chunk_size])
+    else:
+        raise ValueError(f"不支持的输入格式: {fmt}")
+
+
+def _json_column(series):
+    # 非有限浮点数（如无法回本时的roi_days）和缺失值写为null，与pandas.to_json一致
+    if series.dtype.kind == 'f':
+        values = series.to_numpy()
+        column = values.tolist()
+        for i in np.flatnonzero(~np.isfinite(values)):
+            column[i] = None
+        return column
+    if series.dtype.kind in 'iub':
+        return series.tolist()
+    return series.astype(object).where(series.notna(), None).tolist()
+
+
+def to_json_lines(df):
+    """
+    将DataFrame转换为JSON Lines文本，浮点数按最短往返表示写出，保留全部有效数字
+    （pandas.to_json最多保留15位小数，BTC等很小的数值会丢失精度）
+    :param df: DataFrame
+    :return: 每行一条记录的字符串
+    """
+    names = [str(name) for name in df.columns]
+    columns = [_json_column(df[name]) for name in df.columns]
+    encode = json.JSONEncoder(ensure_ascii=False).encode
+    return ''.join(encode(dict(zip(names, row))) + '\n' for row in zip(*columns))
+
+
+class ResultWriter:
+    """
+    逐块追加写出结果，支持CSV、JSON Lines和Parquet
+    """
+
+    def __init__(self, path, fmt):
+        if fmt not in ('csv', 'jsonl', 'parquet'):
+            raise ValueError(f"不支持的输出格式: {fmt}")
+        self.path = path
+        self.fmt = fmt
+        self.rows_written = 0
+        self._file = None
+        self._parquet_writer = None
+
+    def write(self, df):
+        if self.fmt == 'csv':
+            df.to_csv(self.path, mode='w' if self.rows_written == 0 else 'a',
+                      header=self.rows_written == 0, index=False)
+        elif self.fmt == 'jsonl':
+            if self._file is None:
+                self._file = open(self.path, 'w', encoding='utf-8')
+            self._file.write(to_json_lines(df))
+        else:
+            pa = _require_pyarrow()
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if self._parquet_writer is None:
+                self._parquet_writer = pa.parquet.ParquetWriter(self.path, table.schema)
+            else:
+                table = table.cast(self._parquet_writer.schema)
+            self._parquet_writer.write_table(table)
+        self.rows_written += len(df)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+            self._parquet_writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def chunk_to_params(calculator, chunk):
+    """
+    将场景DataFrame转换为calculate_roi_batch的参数，缺失的可选列按默认值填充
+    :param calculator: BTCMiningCalculator实例
+    :param chunk: 场景DataFrame
+    :return: 参数字典
+    """
+    missing = [c for c in REQUIRED_COLUMNS if c not in chunk.columns]
+    if missing:
+        raise ValueError(f"场景文件缺少必需列: {', '.join(missing)}")
+
+    params = {c: chunk[c].to_numpy(dtype='float64') for c in REQUIRED_COLUMNS}
+    for column, default in OPTIONAL_COLUMNS.items():
+        if column in chunk.columns:
+            values = chunk[column]
+            if default is None:
+                # 缺省的区块奖励按计算器默认值填充
+                values = values.fillna(calculator.block_reward)
+            else:
+                values = values.fillna(default)
+            params[column] = values.to_numpy(dtype='float64')
+        elif default is not None:
+            params[column] = default
+    return params
+
+
+def evaluate_chunk(calculator, chunk, snapshot):
+    """
+    对一块场景进行批量计算
+    :param calculator: BTCMiningCalculator实例
+    :param chunk: 场景DataFrame
+    :param snapshot: 市场数据快照
+    :return: 原始列加计算结果列的DataFrame
+    """
+    params = chunk_to_params(calculator, chunk)
+    result = calculator.calculate_roi_batch(snapshot=snapshot, **params)
+    # 参数列统一为float64，避免各块类型推断不一致导致输出schema漂移
+    output = chunk.reset_index(drop=True)
+    for column in params:
+        if column in output.columns:
+            output[column] = params[column]
+    result_columns = {k: v for k, v in result.items() if k not in output.columns}
+    return pd.concat([output, pd.DataFrame(result_columns)], axis=1)
+
+
+def load_snapshot(path):
+    with open(path, encoding='utf-8') as f:
+        snapshot = json.load(f)
+    for key in ('btc_price', 'network_difficulty'):
+        if key not in snapshot:
+            raise ValueError(f"市场快照缺少字段: {key}")
+    return snapshot
+
+
+def run_batch(input_path, output_path, snapshot, input_format=None, output_format=None,
+              chunk_size=DEFAULT_CHUNK_SIZE, calculator=None):
+    """
+    批量计算场景文件并写出结果
+    :param input_path: 场景文件路径
+    :param output_path: 结果文件路径
+    :param snapshot: 市场数据快照
+    :param input_format: 输入格式，为None时根据扩展名推断
+    :param output_format: 输出格式，为None时根据扩展名推断
+    :param chunk_size: 每块的行数
+    :param calculator: BTCMiningCalculator实例，为None时新建
+    :return: 写出的行数
+    """
+    calculator = calculator or BTCMiningCalculator()
+    in_fmt = detect_format(input_path, input_format)
+    out_fmt = detect_format(output_path, output_format)
+    with ResultWriter(output_path, out_fmt) as writer:
+        for chunk in iter_scenario_chunks(input_path, in_fmt, chunk_size):
+            writer.write(evaluate_chunk(calculator, chunk, snapshot))
+        return writer.rows_written
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="比特币挖矿收益批量计算")
+    parser.add_argument('input', help="场景文件（CSV/JSON/JSON Lines/Parquet）")
+    parser.add_argument('output', help="结果文件（CSV/JSON Lines/Parquet）")
+    parser.add_argument('--input-format', choices=['csv', 'json', 'jsonl', 'parquet'])
+    parser.add_argument('--output-format', choices=['csv', 'jsonl', 'parquet'])
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help="每块处理的行数")
+    parser.add_argument('--snapshot', help="使用指定的市场快照JSON文件，而不是实时获取")
+    parser.add_argument('--save-snapshot', help="将本次使用的市场快照保存到JSON文件")
+    parser.add_argument('--btc-price', type=float, help="覆盖BTC价格（美元）")
+    parser.add_argument('--difficulty', type=float, help="覆盖网络难度")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    calculator = BTCMiningCalculator()
+
+    if args.snapshot:
+        snapshot = load_snapshot(args.snapshot)
+    elif args.btc_price is not None and args.difficulty is not None:
+        snapshot = {'btc_price': args.btc_price, 'network_difficulty': args.difficulty}
+    else:
+        # 整个批次只获取一次市场数据
+        snapshot = calculator.get_market_snapshot()
+        if snapshot is None:
+            return 1
+    # 显式指定的0（如价格归零的压力测试）同样覆盖
+    if args.btc_price is not None:
+        snapshot['btc_price'] = args.btc_price
+    if args.difficulty is not None:
+        snapshot['network_difficulty'] = args.difficulty
+
+    if args.save_snapshot:
+        with open(args.save_snapshot, 'w', encoding='utf-8') as f:
+            json.dump(snapshot, f, ensure_ascii=False, indent=2)
+
+    start = time.time()
+    rows = run_batch(args.input, args.output, snapshot, args.input_format, args.output_format,
+                     args.chunk_size, calculator)
+    elapsed = time.time() - start
+    print(f"已计算 {rows} 个场景，耗时 {elapsed:.2f} 秒，结果写入 {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
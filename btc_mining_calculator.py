@@ -1,8 +1,150 @@
 import requests
-import pandas as pd
+import numpy as np
+from dataclasses import dataclass, fields
 from datetime import datetime, timedelta
 import time
 import json
+from contextlib import nullcontext
+
+from localization import localize_result
+from price_aggregator import PriceAggregator
+from difficulty_forecast import get_difficulty_forecast
+from lifecycle import project_lifecycle
+from profiling import Profiler, profile_mode_from_env, profiled
+from singleflight import SingleFlight
+
+
+# 进程内所有计算器实例共享，合并并发的价格和难度请求
+_market_data_requests = SingleFlight()
+
+
+@dataclass(slots=True)
+class ROIResult:
+    """
+    单个场景的投资回报分析结果，字段名与calculate_roi_batch返回的列名一致
+    """
+    btc_price: float
+    network_difficulty: float
+    annual_utilization_rate: float
+    daily_btc_full: float
+    daily_btc_actual: float
+    daily_revenue_usd: float
+    daily_power_cost_full_usd: float
+    daily_power_cost_usd: float
+    daily_maintenance_cost_usd: float
+    daily_depreciation_usd: float
+    daily_total_cost_usd: float
+    daily_profit_usd: float
+    roi_days: float
+    monthly_profit_usd: float
+    annual_profit_usd: float
+    pool_fee_percent: float
+    maintenance_cost_yearly_usd: float
+    hardware_depreciation_yearly_usd: float
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in RESULT_FIELDS}
+
+    def to_display_dict(self, lang='zh'):
+        """
+        转换为以显示名称为键的字典
+        :param lang: 语言，见localization.RESULT_LABELS
+        """
+        return localize_result(self.to_dict(), lang)
+
+
+RESULT_FIELDS = tuple(f.name for f in fields(ROIResult))
+
+# 批量结果的结构化数组类型，每个场景一条紧凑记录
+RESULT_DTYPE = np.dtype([(name, np.float64) for name in RESULT_FIELDS])
+
+
+def results_to_records(batch_result):
+    """
+    将calculate_roi_batch的结果转换为结构化数组
+    :param batch_result: 以字段名为键、数组为值的字典
+    :return: dtype为RESULT_DTYPE的结构化数组
+    """
+    size = len(batch_result['daily_profit_usd'])
+    records = np.empty(size, dtype=RESULT_DTYPE)
+    for name in RESULT_FIELDS:
+        records[name] = batch_result[name]
+    return records
+
+
+def record_to_result(record):
+    """
+    将结构化数组中的一条记录转换为ROIResult
+    """
+    return ROIResult(*(float(record[name]) for name in RESULT_FIELDS))
+
+
+def batch_mining_revenue(hashrate_th, pool_fee_percent, block_reward, annual_utilization_rate,
+                         btc_price, network_difficulty):
+    """
+    批量计算每日挖矿收益，公式与calculate_mining_revenue一致
+    :return: (每日BTC收益(满载，已扣矿池费), 每日BTC收益(实际), 每日收入(USD))
+    """
+    # 全网每秒哈希数，每日144个区块
+    network_hashrate = network_difficulty * 2**32 / 600
+    daily_btc = (np.asarray(hashrate_th, dtype=np.float64) * 1e12 / network_hashrate) * 144 * block_reward
+    daily_btc = daily_btc * (1 - np.asarray(pool_fee_percent, dtype=np.float64) / 100)
+    daily_btc_actual = daily_btc * (np.asarray(annual_utilization_rate, dtype=np.float64) / 100.0)
+    return daily_btc, daily_btc_actual, daily_btc_actual * btc_price
+
+
+def batch_power_cost(power_watts, electricity_cost_kwh, annual_utilization_rate):
+    """
+    批量计算每日电费，公式与calculate_power_cost一致
+    :return: (每日电费(满载), 每日电费(实际))
+    """
+    daily_power_cost = (np.asarray(power_watts, dtype=np.float64) * 24) / 1000 * electricity_cost_kwh
+    return daily_power_cost, daily_power_cost * (np.asarray(annual_utilization_rate, dtype=np.float64) / 100.0)
+
+
+def assemble_roi_batch(btc_price, network_difficulty, annual_utilization_rate, daily_btc, daily_btc_actual,
+                       daily_revenue_usd, daily_power_cost, daily_power_cost_actual, hardware_cost,
+                       pool_fee_percent, maintenance_cost_yearly, hardware_depreciation_yearly):
+    """
+    由收益和电费汇总出完整的批量结果，字段见RESULT_FIELDS
+    """
+    arrays = np.broadcast_arrays(*(np.asarray(v, dtype=np.float64) for v in (
+        btc_price, network_difficulty, annual_utilization_rate, daily_btc, daily_btc_actual, daily_revenue_usd,
+        daily_power_cost, daily_power_cost_actual, hardware_cost, pool_fee_percent,
+        maintenance_cost_yearly, hardware_depreciation_yearly)))
+    btc_price, network_difficulty, annual_utilization_rate, daily_btc, daily_btc_actual, daily_revenue_usd, \
+        daily_power_cost, daily_power_cost_actual, hardware_cost, pool_fee_percent, \
+        maintenance_cost_yearly, hardware_depreciation_yearly = arrays
+
+    daily_maintenance_cost = maintenance_cost_yearly / 365
+    daily_depreciation = hardware_depreciation_yearly / 365
+    daily_total_cost = daily_power_cost_actual + daily_maintenance_cost + daily_depreciation
+    daily_profit = daily_revenue_usd - daily_total_cost
+
+    # 不盈利时回本天数为inf，与calculate_roi一致
+    roi_days = np.full(daily_profit.shape, np.inf)
+    np.divide(hardware_cost, daily_profit, out=roi_days, where=daily_profit > 0)
+
+    return {
+        'btc_price': btc_price,
+        'network_difficulty': network_difficulty,
+        'annual_utilization_rate': annual_utilization_rate,
+        'daily_btc_full': daily_btc,
+        'daily_btc_actual': daily_btc_actual,
+        'daily_revenue_usd': daily_revenue_usd,
+        'daily_power_cost_full_usd': daily_power_cost,
+        'daily_power_cost_usd': daily_power_cost_actual,
+        'daily_maintenance_cost_usd': daily_maintenance_cost,
+        'daily_depreciation_usd': daily_depreciation,
+        'daily_total_cost_usd': daily_total_cost,
+        'daily_profit_usd': daily_profit,
+        'roi_days': roi_days,
+        'monthly_profit_usd': daily_profit * 30,
+        'annual_profit_usd': daily_profit * 365,
+        'pool_fee_percent': pool_fee_percent,
+        'maintenance_cost_yearly_usd': maintenance_cost_yearly,
+        'hardware_depreciation_yearly_usd': hardware_depreciation_yearly
+    }
 
 class BTCMiningCalculator:
     def __init__(self):
@@ -16,7 +158,10 @@ class BTCMiningCalculator:
         # 添加缓存
         self._btc_price_cache = None
         self._network_difficulty_cache = None
+        # 多来源价格聚合器，首次使用时创建
+        self.price_aggregator = None
 
+    @profiled('数据获取: BTC价格')
     def get_btc_price(self, use_cache=False):
         """
         获取当前比特币价格，如果主API失败则尝试备用API
@@ -25,6 +170,17 @@ class BTCMiningCalculator:
         if use_cache and self._btc_price_cache is not None:
             return self._btc_price_cache
 
+        # 多个会话或线程同时请求时只向外部API发出一次请求，共享结果
+        key = ('btc_price', self.binance_api_url, self.coingecko_api_url, self.okx_api_url)
+        price = _market_data_requests.do(key, self._fetch_btc_price)
+        if price is not None:
+            self._btc_price_cache = price
+        return price
+
+    def _fetch_btc_price(self):
+        """
+        依次尝试各个价格API，返回第一个成功的价格，全部失败时返回None
+        """
         # 尝试Binance API
         try:
             print("\n尝试从Binance获取价格...")
@@ -35,8 +191,7 @@ class BTCMiningCalculator:
             if response.status_code == 200:
                 data = response.json()
                 if isinstance(data, dict) and 'price' in data:
-                    self._btc_price_cache = float(data['price'])
-                    return self._btc_price_cache
+                    return float(data['price'])
                 print("Binance API返回格式不符合预期")
         except Exception as e:
             print(f"Binance API错误: {e}")
@@ -51,8 +206,7 @@ class BTCMiningCalculator:
             if response.status_code == 200:
                 data = response.json()
                 if isinstance(data, dict) and 'bitcoin' in data and 'usd' in data['bitcoin']:
-                    self._btc_price_cache = float(data['bitcoin']['usd'])
-                    return self._btc_price_cache
+                    return float(data['bitcoin']['usd'])
                 print("CoinGecko API返回格式不符合预期")
         except Exception as e:
             print(f"CoinGecko API错误: {e}")
@@ -67,8 +221,7 @@ class BTCMiningCalculator:
             if response.status_code == 200:
                 data = response.json()
                 if isinstance(data, dict) and 'data' in data and len(data['data']) > 0:
-                    self._btc_price_cache = float(data['data'][0]['last'])
-                    return self._btc_price_cache
+                    return float(data['data'][0]['last'])
                 print("OKX API返回格式不符合预期")
         except Exception as e:
             print(f"OKX API错误: {e}")
@@ -76,6 +229,28 @@ class BTCMiningCalculator:
         print("所有API都失败了")
         return None
 
+    def get_btc_price_aggregated(self, currency='USD', use_cache=False):
+        """
+        并行从所有配置的来源获取价格，剔除异常值后加权平均
+        :param currency: 报价币种，如USD、EUR、CNY、USDT
+        :param use_cache: 是否使用缓存的价格（仅USD）
+        :return: 聚合后的价格，所有来源均失败时返回None
+        """
+        currency = currency.upper()
+        if use_cache and currency == 'USD' and self._btc_price_cache is not None:
+            return self._btc_price_cache
+        if self.price_aggregator is None:
+            self.price_aggregator = PriceAggregator()
+        aggregated = self.price_aggregator.get_price(currency)
+        if aggregated is None:
+            return None
+        if aggregated.rejected_sources:
+            print(f"已剔除异常报价: {', '.join(aggregated.rejected_sources)}")
+        if currency == 'USD':
+            self._btc_price_cache = aggregated.price
+        return aggregated.price
+
+    @profiled('数据获取: 网络难度')
     def get_network_difficulty(self, use_cache=False):
         """
         获取当前网络难度
@@ -84,6 +259,13 @@ class BTCMiningCalculator:
         if use_cache and self._network_difficulty_cache is not None:
             return self._network_difficulty_cache
 
+        difficulty = _market_data_requests.do(('network_difficulty', self.difficulty_api_url),
+                                              self._fetch_network_difficulty)
+        if difficulty is not None:
+            self._network_difficulty_cache = difficulty
+        return difficulty
+
+    def _fetch_network_difficulty(self):
         try:
             print("\n获取网络难度...")
             response = requests.get(self.difficulty_api_url, timeout=10)
@@ -91,12 +273,29 @@ class BTCMiningCalculator:
             print(f"难度API返回内容: {response.text}")
             
             if response.status_code == 200:
-                self._network_difficulty_cache = float(response.text)
-                return self._network_difficulty_cache
+                return float(response.text)
         except Exception as e:
             print(f"获取网络难度时出错: {e}")
         return None
 
+    def get_difficulty_forecast(self, block_timings_path=None, growth='exponential', monthly_growth_percent=2.0,
+                                horizon_days=3 * 365, use_cache=False):
+        """
+        基于当前难度和本周期出块时间预测未来各难度周期的难度
+        :param block_timings_path: 本地区块时间数据文件（CSV/JSON），为None时假设本周期按600秒出块，
+                                   不反映实际出块偏差（见difficulty_forecast.get_difficulty_forecast）
+        :param growth: 全网算力增长模型，exponential或linear
+        :param monthly_growth_percent: 全网算力月增长率（%）
+        :param horizon_days: 预测天数
+        :param use_cache: 是否使用缓存的难度
+        :return: DifficultyForecast，可用difficulty_on_day/daily_difficulty按天查询；获取难度失败时返回None
+        """
+        difficulty = self.get_network_difficulty(use_cache)
+        if not difficulty:
+            print("无法获取网络难度，无法预测难度")
+            return None
+        return get_difficulty_forecast(difficulty, block_timings_path, growth, monthly_growth_percent, horizon_days)
+
     def calculate_mining_revenue(self, hashrate_th, use_cache=False):
         """
         计算挖矿收益
@@ -151,6 +350,23 @@ class BTCMiningCalculator:
                      pool_fee_percent=2.0, maintenance_cost_yearly=0, hardware_depreciation_yearly=0,
                      block_reward=None, annual_utilization_rate=100.0, use_cache=False):
         """
+        计算投资回报分析，返回以中文显示名称为键的字典
+        参数同calculate_roi_result
+        :return: 投资分析报告
+        """
+        result = self.calculate_roi_result(
+            hashrate_th, power_watts, electricity_cost_kwh, hardware_cost, pool_fee_percent,
+            maintenance_cost_yearly, hardware_depreciation_yearly, block_reward,
+            annual_utilization_rate, use_cache)
+        if result is None:
+            return None
+        return result.to_display_dict()
+
+    @profiled('ROI计算')
+    def calculate_roi_result(self, hashrate_th, power_watts, electricity_cost_kwh, hardware_cost,
+                             pool_fee_percent=2.0, maintenance_cost_yearly=0, hardware_depreciation_yearly=0,
+                             block_reward=None, annual_utilization_rate=100.0, use_cache=False):
+        """
         计算投资回报分析
         :param hashrate_th: 算力（TH/s）
         :param power_watts: 功率（瓦特）
@@ -162,7 +378,7 @@ class BTCMiningCalculator:
         :param block_reward: 区块奖励（BTC）
         :param annual_utilization_rate: 年利用率（%），表示矿机实际运行时间占全年的百分比
         :param use_cache: 是否使用缓存的价格和难度数据
-        :return: 投资分析报告
+        :return: ROIResult
         """
         print("\n开始ROI分析...")
         
@@ -209,27 +425,156 @@ class BTCMiningCalculator:
             roi_days = float('inf')
             print("警告: 当前配置下无法盈利!")
 
+        return ROIResult(
+            btc_price=btc_price,
+            network_difficulty=network_difficulty,
+            annual_utilization_rate=annual_utilization_rate,
+            daily_btc_full=daily_btc,
+            daily_btc_actual=daily_btc_actual,
+            daily_revenue_usd=daily_revenue_usd,
+            daily_power_cost_full_usd=daily_power_cost,
+            daily_power_cost_usd=daily_power_cost_actual,
+            daily_maintenance_cost_usd=daily_maintenance_cost,
+            daily_depreciation_usd=daily_depreciation,
+            daily_total_cost_usd=daily_total_cost,
+            daily_profit_usd=daily_profit,
+            roi_days=roi_days,
+            monthly_profit_usd=daily_profit * 30,
+            annual_profit_usd=daily_profit * 365,
+            pool_fee_percent=pool_fee_percent,
+            maintenance_cost_yearly_usd=maintenance_cost_yearly,
+            hardware_depreciation_yearly_usd=hardware_depreciation_yearly
+        )
+
+    @profiled('数据获取: 市场快照')
+    def get_market_snapshot(self, use_cache=False):
+        """
+        获取一次市场数据快照，供批量计算复用
+        :param use_cache: 是否使用缓存的价格和难度数据
+        :return: 包含btc_price、network_difficulty和timestamp的字典，获取失败时返回None
+        """
+        btc_price = self.get_btc_price(use_cache)
+        network_difficulty = self.get_network_difficulty(use_cache)
+        if not btc_price or not network_difficulty:
+            print("无法获取比特币价格或网络难度，无法生成市场快照")
+            return None
         return {
-            'BTC当前价格': btc_price,
-            '网络难度': network_difficulty,
-            '年利用率': annual_utilization_rate,
-            '每日BTC收益(满载)': daily_btc,
-            '每日BTC收益(含矿池费)': daily_btc_actual,
-            '每日收入(USD)': daily_revenue_usd,
-            '每日电费(满载)': daily_power_cost,
-            '每日电费(USD)': daily_power_cost_actual,
-            '每日维护成本(USD)': daily_maintenance_cost,
-            '每日折旧(USD)': daily_depreciation,
-            '每日总成本(USD)': daily_total_cost,
-            '每日净利润(USD)': daily_profit,
-            '预计回本天数': roi_days,
-            '月度净利润(USD)': daily_profit * 30,
-            '年度净利润(USD)': daily_profit * 365,
-            '矿池手续费': pool_fee_percent,
-            '年度维护成本(USD)': maintenance_cost_yearly,
-            '年度折旧(USD)': hardware_depreciation_yearly
+            'btc_price': btc_price,
+            'network_difficulty': network_difficulty,
+            'timestamp': datetime.now().isoformat(timespec='seconds')
         }
 
+    @profiled('批量ROI计算')
+    def calculate_roi_batch(self, hashrate_th, power_watts, electricity_cost_kwh, hardware_cost,
+                            pool_fee_percent=2.0, maintenance_cost_yearly=0, hardware_depreciation_yearly=0,
+                            block_reward=None, annual_utilization_rate=100.0, snapshot=None):
+        """
+        批量计算投资回报分析，公式与calculate_roi一致，所有参数均可为标量或等长数组
+        :param hashrate_th: 算力（TH/s）
+        :param power_watts: 功率（瓦特）
+        :param electricity_cost_kwh: 每千瓦时电费（美元）
+        :param hardware_cost: 硬件成本（美元）
+        :param pool_fee_percent: 矿池手续费百分比
+        :param maintenance_cost_yearly: 年度维护成本（美元）
+        :param hardware_depreciation_yearly: 年度硬件折旧（美元）
+        :param block_reward: 区块奖励（BTC），为None时使用self.block_reward
+        :param annual_utilization_rate: 年利用率（%）
+        :param snapshot: 市场数据快照（见get_market_snapshot），为None时使用缓存数据获取
+        :return: 以RESULT_FIELDS为键、numpy数组为值的字典，可用results_to_records转换为结构化数组；
+                 获取市场数据失败时返回None
+        """
+        if snapshot is None:
+            snapshot = self.get_market_snapshot(use_cache=True)
+            if snapshot is None:
+                return None
+        if block_reward is None:
+            block_reward = self.block_reward
+
+        hashrate_th, power_watts, electricity_cost_kwh, hardware_cost, pool_fee_percent, \
+            maintenance_cost_yearly, hardware_depreciation_yearly, block_reward, annual_utilization_rate = \
+            np.broadcast_arrays(*(np.asarray(v, dtype=np.float64) for v in (
+                hashrate_th, power_watts, electricity_cost_kwh, hardware_cost, pool_fee_percent,
+                maintenance_cost_yearly, hardware_depreciation_yearly, block_reward, annual_utilization_rate)))
+
+        btc_price = float(snapshot['btc_price'])
+        network_difficulty = float(snapshot['network_difficulty'])
+        daily_btc, daily_btc_actual, daily_revenue_usd = batch_mining_revenue(
+            hashrate_th, pool_fee_percent, block_reward, annual_utilization_rate, btc_price, network_difficulty)
+        daily_power_cost, daily_power_cost_actual = batch_power_cost(
+            power_watts, electricity_cost_kwh, annual_utilization_rate)
+        return assemble_roi_batch(
+            btc_price, network_difficulty, annual_utilization_rate, daily_btc, daily_btc_actual, daily_revenue_usd,
+            daily_power_cost, daily_power_cost_actual, hardware_cost, pool_fee_percent,
+            maintenance_cost_yearly, hardware_depreciation_yearly)
+
+    @profiled('盈亏平衡电价')
+    def calculate_break_even_batch(self, hashrate_th, power_watts, pool_fee_percent=2.0,
+                                   maintenance_cost_yearly=0, hardware_depreciation_yearly=0,
+                                   block_reward=None, annual_utilization_rate=100.0, snapshot=None):
+        """
+        批量计算盈亏平衡电价，即每日净利润为0时的电费单价
+        :param hashrate_th: 算力（TH/s）
+        :param power_watts: 功率（瓦特）
+        :param pool_fee_percent: 矿池手续费百分比
+        :param maintenance_cost_yearly: 年度维护成本（美元）
+        :param hardware_depreciation_yearly: 年度硬件折旧（美元）
+        :param block_reward: 区块奖励（BTC），为None时使用self.block_reward
+        :param annual_utilization_rate: 年利用率（%）
+        :param snapshot: 市场数据快照，为None时使用缓存数据获取
+        :return: 盈亏平衡电价数组（美元/kWh），为负表示电费为0时也无法盈利；获取市场数据失败时返回None
+        """
+        # 电费为0时的结果即为纯收入与固定成本
+        result = self.calculate_roi_batch(hashrate_th, power_watts, 0.0, 0.0, pool_fee_percent,
+                                          maintenance_cost_yearly, hardware_depreciation_yearly,
+                                          block_reward, annual_utilization_rate, snapshot)
+        if result is None:
+            return None
+        daily_kwh_actual = (np.asarray(power_watts, dtype=np.float64) * 24) / 1000 \
+            * result['annual_utilization_rate'] / 100.0
+        margin = result['daily_revenue_usd'] - result['daily_maintenance_cost_usd'] - result['daily_depreciation_usd']
+        break_even = np.full(margin.shape, np.inf)
+        np.divide(margin, daily_kwh_actual, out=break_even, where=daily_kwh_actual > 0)
+        return break_even
+
+    @profiled('生命周期推算')
+    def calculate_lifecycle_batch(self, hashrate_th, power_watts, electricity_cost_kwh, purchase_price,
+                                  hardware_cost=None, start_age_days=0, horizon_days=3 * 365, lifecycle=None,
+                                  pool_fee_percent=2.0, maintenance_cost_yearly=0, block_reward=None,
+                                  annual_utilization_rate=100.0, daily_difficulty=None, snapshot=None):
+        """
+        批量计算考虑算力衰减、故障和残值的生命周期收益，参数均可为标量或等长数组
+        :param hashrate_th: 新机算力（TH/s）
+        :param power_watts: 功率（瓦特）
+        :param electricity_cost_kwh: 每千瓦时电费（美元）
+        :param purchase_price: 购入价格（美元）
+        :param hardware_cost: 新机价格，用于计算残值，为None时等于purchase_price
+        :param start_age_days: 购入时的机龄（天），0为新机
+        :param horizon_days: 推算天数
+        :param lifecycle: lifecycle.LifecycleModel，为None时使用默认模型
+        :param pool_fee_percent: 矿池手续费百分比
+        :param maintenance_cost_yearly: 年度维护成本（美元）
+        :param block_reward: 区块奖励（BTC），为None时使用self.block_reward
+        :param annual_utilization_rate: 年利用率（%）
+        :param daily_difficulty: 每天的预测难度数组（见get_difficulty_forecast），为None时难度保持快照中的值
+        :param snapshot: 市场数据快照，为None时使用缓存数据获取
+        :return: 见lifecycle.project_lifecycle；获取市场数据失败时返回None
+        """
+        if hardware_cost is None:
+            hardware_cost = purchase_price
+        # 折旧由残值体现，这里不再计入年度折旧
+        result = self.calculate_roi_batch(hashrate_th, power_watts, electricity_cost_kwh, hardware_cost,
+                                          pool_fee_percent, maintenance_cost_yearly, 0, block_reward,
+                                          annual_utilization_rate, snapshot)
+        if result is None:
+            return None
+        difficulty_ratio = None
+        if daily_difficulty is not None:
+            network_difficulty = float(np.ravel(result['network_difficulty'])[0])
+            difficulty_ratio = network_difficulty / np.asarray(daily_difficulty, dtype=np.float64)
+        return project_lifecycle(result['daily_revenue_usd'], result['daily_power_cost_usd'],
+                                 result['daily_maintenance_cost_usd'], hardware_cost, purchase_price,
+                                 start_age_days, horizon_days, lifecycle, difficulty_ratio)
+
 def main():
     # 示例参数
     HASHRATE_TH = 200  # 200 TH/s
@@ -247,12 +592,16 @@ def main():
     print(f"硬件成本: ${HARDWARE_COST}")
 
     calculator = BTCMiningCalculator()
-    result = calculator.calculate_roi(
-        hashrate_th=HASHRATE_TH,
-        power_watts=POWER_WATTS,
-        electricity_cost_kwh=ELECTRICITY_COST,
-        hardware_cost=HARDWARE_COST
-    )
+    # 设置环境变量BTC_CALC_PROFILE后记录各阶段耗时并写出trace/pstats文件
+    profile_mode = profile_mode_from_env()
+    profiler = Profiler(profile_mode) if profile_mode else None
+    with profiler.activate() if profiler else nullcontext():
+        result = calculator.calculate_roi(
+            hashrate_th=HASHRATE_TH,
+            power_watts=POWER_WATTS,
+            electricity_cost_kwh=ELECTRICITY_COST,
+            hardware_cost=HARDWARE_COST
+        )
 
     if result:
         print("\n=== 最终分析结果 ===")
@@ -267,5 +616,12 @@ def main():
             else:
                 print(f"{key}: {value}")
 
+    if profiler:
+        print("\n=== 性能分析 ===")
+        for name, count, total_ms in profiler.summary():
+            print(f"{name}: {total_ms:.1f}ms ({count}次)")
+        for path in profiler.dump(prefix='calculator'):
+            print(f"已写出: {path}")
+
 if __name__ == "__main__":
     main() 
\ No newline at end of file
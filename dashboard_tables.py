@@ -0,0 +1,154 @@
+import numpy as np
+
+from miner_catalog import get_catalog_arrays, get_maintenance_coefficients
+
+# 表格中的数值列保持为数值类型，显示格式由页面的column_config统一设置，排序和比较都按数值进行
+# 页面启动时即导入本模块，pandas在构建表格时才导入，不影响首次加载
+
+
+def _pandas():
+    import pandas as pd
+    return pd
+
+
+def catalog_frame(models=None):
+    """
+    矿机参数表，以型号为索引
+    :param models: 矿机型号列表，为None时使用全部型号
+    """
+    pd = _pandas()
+    names, columns = get_catalog_arrays(models)
+    return pd.DataFrame({
+        "Model": names,
+        "Hashrate (TH/s)": columns['hashrate'],
+        "Power (W)": columns['power'],
+        "Cost ($)": columns['cost'],
+        "Efficiency (W/TH)": columns['efficiency'],
+        "维护系数": get_maintenance_coefficients(columns['efficiency']),
+        "Cost per TH ($/TH)": columns['cost_per_th']
+    }, index=pd.Index(names, name="型号"))
+
+
+def selection_frame(catalog, selected):
+    """
+    在矿机参数表前加入"选中"列，供data_editor勾选
+    :param catalog: catalog_frame的结果
+    :param selected: 选中的型号集合
+    """
+    frame = catalog.copy()
+    frame.insert(0, "选中", catalog.index.isin(list(selected)))
+    return frame
+
+
+def annual_return_percent(roi_days):
+    """
+    由回本天数计算年化回报率（%），无法回本时为0
+    """
+    roi_days = np.asarray(roi_days, dtype=np.float64)
+    result = np.zeros(roi_days.shape)
+    np.divide(365 * 100, roi_days, out=result, where=np.isfinite(roi_days) & (roi_days > 0))
+    return result
+
+
+def comparison_frame(names, results):
+    """
+    选中矿机的收益对比表
+    :param names: 矿机型号列表
+    :param results: 与names对应的ROIResult列表
+    :return: 数值列的DataFrame，回本天数为inf（无法回本）时为NaN
+    """
+    pd = _pandas()
+    _, columns = get_catalog_arrays(names)
+
+    def field(name):
+        return np.fromiter((getattr(r, name) for r in results), dtype=np.float64, count=len(results))
+
+    roi_days = field('roi_days')
+    return pd.DataFrame({
+        "矿机型号": list(names),
+        "算力 (TH/s)": columns['hashrate'],
+        "功耗 (W)": columns['power'],
+        "效率 (W/TH)": columns['efficiency'],
+        "维护系数": get_maintenance_coefficients(columns['efficiency']),
+        "硬件成本 ($)": columns['cost'],
+        "每日收入 ($)": field('daily_revenue_usd'),
+        "每日成本 ($)": field('daily_total_cost_usd'),
+        "每日净利润 ($)": field('daily_profit_usd'),
+        "月度净利润 ($)": field('monthly_profit_usd'),
+        "年度净利润 ($)": field('annual_profit_usd'),
+        "回本天数": np.where(np.isfinite(roi_days), roi_days, np.nan),
+        "年化回报率 (%)": annual_return_percent(roi_days)
+    })
+
+
+def best_performers(frame):
+    """
+    对比表中各指标表现最好的矿机
+    :param frame: comparison_frame的结果
+    :return: 指标到(型号, 数值)的字典；没有可回本的矿机时"最快回本"为None
+    """
+    if frame.empty:
+        return {}
+    best = {}
+    for label, column in (("最高日净利润", "每日净利润 ($)"), ("最高年净利润", "年度净利润 ($)"),
+                          ("最高年化回报", "年化回报率 (%)")):
+        row = frame[column].idxmax()
+        best[label] = (frame.at[row, "矿机型号"], frame.at[row, column])
+    roi_days = frame["回本天数"]
+    best["最快回本"] = None if roi_days.isna().all() else \
+        (frame.at[roi_days.idxmin(), "矿机型号"], roi_days.min())
+    return best
+
+
+def break_even_frame(names, electricity_prices, daily_profits):
+    """
+    根据电价敏感性分析结果找出盈亏平衡电价：利润由非负变为负之前的最后一个电价点
+    :param names: 矿机型号列表
+    :param electricity_prices: 电价点数组
+    :param daily_profits: (型号数, 电价点数)的每日利润数组
+    :return: DataFrame，范围内没有盈亏平衡点的型号电价为NaN，Status列说明原因
+    """
+    profits = np.asarray(daily_profits, dtype=np.float64).reshape(len(names), -1)
+    crossing = (profits[:, :-1] >= 0) & (profits[:, 1:] < 0)
+    has_crossing = crossing.any(axis=1)
+    prices = np.asarray(electricity_prices, dtype=np.float64)
+    break_even = np.where(has_crossing, prices[crossing.argmax(axis=1)], np.nan)
+    status = np.where(has_crossing, "Break-even in range",
+                      np.where(profits[:, 0] < 0, "Not profitable in range", "Always profitable in range"))
+    return _pandas().DataFrame({"Miner Model": list(names), "Break-even Price ($/kWh)": break_even, "Status": status})
+
+
+class FrameCache:
+    """
+    按输入对象的身份复用表格：计算图中未重算的行返回同一个结果对象，
+    输入逐个相同（is）时直接返回上次构建的DataFrame。列表和元组逐个元素比较，
+    元素只按身份比较（字符串和数字按值），不比较字典或数组的内容
+    """
+
+    def __init__(self, builder):
+        self.builder = builder
+        self._inputs = None
+        self._frame = None
+
+    def get(self, *inputs):
+        if self._inputs is not None and len(inputs) == len(self._inputs) and all(
+                _same(a, b) for a, b in zip(inputs, self._inputs)):
+            return self._frame
+        self._frame = self.builder(*inputs)
+        self._inputs = inputs
+        return self._frame
+
+
+def _same(a, b):
+    if a is b:
+        return True
+    if isinstance(a, (list, tuple)) and isinstance(b, (list, tuple)):
+        return len(a) == len(b) and all(_same_item(x, y) for x, y in zip(a, b))
+    return _same_item(a, b)
+
+
+def _same_item(a, b):
+    # 字典、数组等可变对象的==可能逐元素比较甚至抛出异常，只有不可变的标量才按值比较
+    if a is b:
+        return True
+    return isinstance(a, (str, int, float)) and type(a) is type(b) and a == b
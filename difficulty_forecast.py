@@ -0,0 +1,231 @@
+import json
+import math
+import os
+from functools import lru_cache
+
+import numpy as np
+
+# 每2016个区块调整一次难度，目标出块时间600秒，单次调整幅度限制在1/4到4倍
+RETARGET_INTERVAL = 2016
+TARGET_BLOCK_SECONDS = 600
+MAX_ADJUSTMENT = 4.0
+SECONDS_PER_DAY = 86400
+
+
+class ExponentialGrowth:
+    """
+    全网算力按固定月增长率指数增长
+    """
+
+    def __init__(self, monthly_growth_percent=2.0):
+        self.monthly_growth_percent = monthly_growth_percent
+        self.rate_per_day = math.log(1 + monthly_growth_percent / 100) / 30
+
+    def factor(self, days):
+        """
+        第days天的算力相对当前算力的倍数
+        """
+        return np.exp(self.rate_per_day * np.asarray(days, dtype=np.float64))
+
+    def days_to_accumulate(self, start_day, work_days):
+        """
+        从start_day开始，累计算力达到"当前算力 x work_days天"所需的天数
+        """
+        r = self.rate_per_day
+        if r == 0:
+            return work_days
+        return math.log(1 + work_days * r * math.exp(-r * start_day)) / r
+
+
+class LinearGrowth:
+    """
+    全网算力按固定月增量线性增长，增量以当前算力的百分比表示
+    """
+
+    def __init__(self, monthly_growth_percent=2.0):
+        self.monthly_growth_percent = monthly_growth_percent
+        self.slope_per_day = monthly_growth_percent / 100 / 30
+
+    def factor(self, days):
+        return np.maximum(1 + self.slope_per_day * np.asarray(days, dtype=np.float64), 1e-6)
+
+    def days_to_accumulate(self, start_day, work_days):
+        # 求解 ∫(1 + s*t)dt = work_days，t从start_day到start_day+T
+        s = self.slope_per_day
+        if s == 0:
+            return work_days
+        b = 1 + s * start_day
+        discriminant = b * b + 2 * s * work_days
+        if discriminant < 0:
+            return math.inf
+        return (-b + math.sqrt(discriminant)) / s
+
+
+GROWTH_MODELS = {'exponential': ExponentialGrowth, 'linear': LinearGrowth}
+
+
+def load_block_timings(path):
+    """
+    读取本地区块时间数据
+    :param path: CSV（height,timestamp列）或JSON（[{"height":..,"timestamp":..}]）文件，时间戳为Unix秒
+    :return: (高度数组, 时间戳数组)，按高度排序
+    """
+    if os.path.splitext(path)[1].lower() == '.json':
+        with open(path, encoding='utf-8') as f:
+            records = json.load(f)
+        heights = np.array([r['height'] for r in records], dtype=np.int64)
+        timestamps = np.array([r['timestamp'] for r in records], dtype=np.float64)
+    else:
+        data = np.genfromtxt(path, delimiter=',', names=True, dtype=None, encoding='utf-8')
+        heights = np.atleast_1d(data['height']).astype(np.int64)
+        timestamps = np.atleast_1d(data['timestamp']).astype(np.float64)
+    order = np.argsort(heights)
+    return heights[order], timestamps[order]
+
+
+def stub_block_timings(tip_height, tip_timestamp, block_seconds=TARGET_BLOCK_SECONDS):
+    """
+    无本地数据时生成当前难度周期内等间隔的区块时间，即假设本周期按block_seconds出块
+    """
+    epoch_start = tip_height - tip_height % RETARGET_INTERVAL
+    heights = np.arange(epoch_start, tip_height + 1, dtype=np.int64)
+    timestamps = tip_timestamp - (tip_height - heights) * float(block_seconds)
+    return heights, timestamps
+
+
+def estimate_next_retarget(heights, timestamps, current_difficulty):
+    """
+    根据当前难度周期内的出块时间估计下一次难度调整
+    :param heights: 区块高度数组（至少包含当前周期的起始区块和最新区块）
+    :param timestamps: 对应的时间戳数组（Unix秒）
+    :param current_difficulty: 当前难度
+    :return: 字典，包含本周期平均出块时间、剩余区块数、预计调整前的天数和下一周期难度
+    """
+    tip_height = int(heights[-1])
+    epoch_start = tip_height - tip_height % RETARGET_INTERVAL
+    in_epoch = heights >= epoch_start
+    epoch_heights = heights[in_epoch]
+    epoch_times = timestamps[in_epoch]
+    if len(epoch_heights) >= 2 and epoch_heights[-1] > epoch_heights[0]:
+        avg_block_seconds = float((epoch_times[-1] - epoch_times[0]) / (epoch_heights[-1] - epoch_heights[0]))
+    else:
+        # 本周期刚开始，数据不足时按目标出块时间估计
+        avg_block_seconds = float(TARGET_BLOCK_SECONDS)
+    avg_block_seconds = max(avg_block_seconds, 1.0)
+
+    remaining_blocks = epoch_start + RETARGET_INTERVAL - tip_height
+    adjustment = TARGET_BLOCK_SECONDS / avg_block_seconds
+    adjustment = min(max(adjustment, 1 / MAX_ADJUSTMENT), MAX_ADJUSTMENT)
+    return {
+        'tip_height': tip_height,
+        'epoch_start_height': epoch_start,
+        'avg_block_seconds': avg_block_seconds,
+        'remaining_blocks': remaining_blocks,
+        'days_to_retarget': remaining_blocks * avg_block_seconds / SECONDS_PER_DAY,
+        'adjustment': adjustment,
+        'next_difficulty': current_difficulty * adjustment
+    }
+
+
+class DifficultyForecast:
+    """
+    按难度周期预测未来难度，结果为每个周期的起始天和难度，可按天快速查询
+    """
+
+    def __init__(self, current_difficulty, heights, timestamps, growth_model=None, horizon_days=3 * 365):
+        """
+        :param current_difficulty: 当前难度
+        :param heights: 区块高度数组
+        :param timestamps: 区块时间戳数组
+        :param growth_model: 算力增长模型，为None时使用月增长2%的ExponentialGrowth
+        :param horizon_days: 预测天数
+        """
+        self.current_difficulty = float(current_difficulty)
+        self.growth_model = growth_model or ExponentialGrowth()
+        self.horizon_days = horizon_days
+        self.next_retarget = estimate_next_retarget(heights, timestamps, self.current_difficulty)
+        self.epoch_start_days, self.epoch_difficulties = self._project()
+        self._daily = None
+
+    def _project(self):
+        """
+        逐周期推算：周期k的难度为D_k时，挖出2016个区块需要的"当前算力天数"为
+        2016 * 600 / 86400 * D_k / D_ref，其中D_ref是与当前算力匹配的难度
+        """
+        retarget = self.next_retarget
+        # 与当前算力匹配的难度（出块时间正好为600秒时的难度）
+        reference_difficulty = self.current_difficulty * TARGET_BLOCK_SECONDS / retarget['avg_block_seconds']
+        epoch_days_at_reference = RETARGET_INTERVAL * TARGET_BLOCK_SECONDS / SECONDS_PER_DAY
+
+        # 本周期剩余部分按当前出块速度完成，之后进入下一周期
+        start_days = [0.0]
+        difficulties = [self.current_difficulty]
+        day = retarget['days_to_retarget']
+        difficulty = retarget['next_difficulty']
+        while day < self.horizon_days:
+            start_days.append(day)
+            difficulties.append(difficulty)
+            work = epoch_days_at_reference * difficulty / reference_difficulty
+            duration = self.growth_model.days_to_accumulate(day, work)
+            if not math.isfinite(duration) or duration <= 0:
+                break
+            adjustment = (epoch_days_at_reference / duration)
+            adjustment = min(max(adjustment, 1 / MAX_ADJUSTMENT), MAX_ADJUSTMENT)
+            day += duration
+            difficulty *= adjustment
+        return np.array(start_days), np.array(difficulties)
+
+    def difficulty_on_day(self, days):
+        """
+        查询第days天（可为数组，0为今天）的难度
+        """
+        index = np.searchsorted(self.epoch_start_days, np.asarray(days, dtype=np.float64), side='right') - 1
+        return self.epoch_difficulties[np.clip(index, 0, len(self.epoch_difficulties) - 1)]
+
+    def daily_difficulty(self):
+        """
+        预测期内每天的难度数组，下标为天数，首次调用后缓存
+        """
+        if self._daily is None:
+            self._daily = self.difficulty_on_day(np.arange(int(math.ceil(self.horizon_days))))
+            self._daily.setflags(write=False)
+        return self._daily
+
+
+@lru_cache(maxsize=32)
+def _cached_forecast(current_difficulty, path, mtime, tip_height, tip_timestamp, growth, monthly_growth_percent,
+                     horizon_days):
+    if path is not None:
+        heights, timestamps = load_block_timings(path)
+    else:
+        heights, timestamps = stub_block_timings(tip_height, tip_timestamp)
+    growth_model = GROWTH_MODELS[growth](monthly_growth_percent)
+    return DifficultyForecast(current_difficulty, heights, timestamps, growth_model, horizon_days)
+
+
+def get_difficulty_forecast(current_difficulty, block_timings_path=None, growth='exponential',
+                            monthly_growth_percent=2.0, horizon_days=3 * 365, tip_height=0, tip_timestamp=0.0):
+    """
+    获取缓存的难度预测，参数相同（且数据文件未修改）时直接复用
+
+    没有区块时间数据文件时为降级模式：由stub_block_timings假设本周期正好按600秒出块，
+    预测无法反映实际出块时间与目标的偏差（下一次调整倍数为1），剩余区块数只由tip_height决定，
+    难度变化完全来自算力增长模型。需要考虑当前周期的实际出块速度时应提供数据文件。
+    :param current_difficulty: 当前难度
+    :param block_timings_path: 本地区块时间数据文件，为None时使用stub_block_timings（降级模式）
+    :param growth: 算力增长模型，exponential或linear
+    :param monthly_growth_percent: 全网算力月增长率（%）
+    :param horizon_days: 预测天数
+    :param tip_height: 无数据文件时的最新区块高度，默认假设处于周期起点
+    :param tip_timestamp: 无数据文件时的最新区块时间戳
+    :return: DifficultyForecast
+    """
+    if growth not in GROWTH_MODELS:
+        raise ValueError(f"未知的算力增长模型: {growth}")
+    path = mtime = None
+    if block_timings_path is not None:
+        # 文件修改时间作为缓存键的一部分，数据更新后自动重新计算
+        path = os.path.abspath(block_timings_path)
+        mtime = os.path.getmtime(path)
+    return _cached_forecast(float(current_difficulty), path, mtime, int(tip_height), float(tip_timestamp),
+                            growth, float(monthly_growth_percent), horizon_days)
@@ -0,0 +1,183 @@
+import json
+from dataclasses import dataclass
+
+import numpy as np
+
+from btc_mining_calculator import assemble_roi_batch, batch_mining_revenue
+from miner_catalog import get_catalog_arrays
+
+DAYS_PER_MONTH = 365 / 12
+
+TIER_MODES = ('volume', 'graduated')
+
+
+@dataclass(slots=True)
+class HostingContract:
+    """
+    托管合同
+
+    tiers为[(起始功率kW, 全包电价$/kWh), ...]，按矿场签约总功率确定电价：
+    volume模式下整个矿场按所达到档位的电价计费，graduated模式下各档功率分别按各自电价计费。
+    """
+    name: str
+    tiers: list
+    tier_mode: str = 'volume'
+    monthly_fee: float = 0.0
+    monthly_fee_per_unit: float = 0.0
+    setup_fee_per_unit: float = 0.0
+    minimum_kw: float = 0.0
+    sla_uptime_percent: float = 95.0
+    expected_uptime_percent: float = None
+
+    def __post_init__(self):
+        if self.tier_mode not in TIER_MODES:
+            raise ValueError(f"未知的阶梯计费方式: {self.tier_mode}")
+        if not self.tiers:
+            raise ValueError(f"{self.name}: 至少需要一档电价")
+        self.tiers = sorted((float(start), float(rate)) for start, rate in self.tiers)
+
+    @property
+    def uptime_percent(self):
+        """
+        计算收益和电量使用的在线率，未单独给出预期值时按SLA承诺计算
+        """
+        return self.sla_uptime_percent if self.expected_uptime_percent is None else self.expected_uptime_percent
+
+
+def load_contracts(path):
+    """
+    从JSON文件读取托管报价
+    :param path: JSON文件，内容为合同列表，字段同HostingContract，如
+                 [{"name": "A", "tiers": [[0, 0.078], [1000, 0.072]], "monthly_fee_per_unit": 5}]
+    :return: HostingContract列表
+    """
+    with open(path, encoding='utf-8') as f:
+        records = json.load(f)
+    return [HostingContract(**record) for record in records]
+
+
+def contract_arrays(contracts):
+    """
+    将合同转换为按列存放的数组，阶梯表按最多档数补齐
+    :return: 参数名到数组的字典，tier_starts/tier_rates形状为(合同数, 最大档数)
+    """
+    size = max(len(c.tiers) for c in contracts)
+    starts = np.full((len(contracts), size), np.inf)
+    rates = np.zeros((len(contracts), size))
+    for i, contract in enumerate(contracts):
+        tier_starts, tier_rates = zip(*contract.tiers)
+        starts[i, :len(tier_starts)] = tier_starts
+        rates[i, :len(tier_rates)] = tier_rates
+        # 补齐的档位沿用最后一档电价，起始功率为inf表示永远达不到
+        rates[i, len(tier_rates):] = tier_rates[-1]
+
+    def column(name):
+        return np.array([getattr(c, name) for c in contracts], dtype=np.float64)
+
+    return {
+        'tier_starts': starts,
+        'tier_rates': rates,
+        'graduated': np.array([c.tier_mode == 'graduated' for c in contracts]),
+        'monthly_fee': column('monthly_fee'),
+        'monthly_fee_per_unit': column('monthly_fee_per_unit'),
+        'setup_fee_per_unit': column('setup_fee_per_unit'),
+        'minimum_kw': column('minimum_kw'),
+        'uptime_percent': column('uptime_percent')
+    }
+
+
+def effective_rate(fleet_kw, tier_starts, tier_rates, graduated):
+    """
+    批量计算阶梯电价下的平均电价
+    :param fleet_kw: (矿场数,)的矿场签约总功率（kW）
+    :param tier_starts: (合同数, 档数)的各档起始功率
+    :param tier_rates: (合同数, 档数)的各档电价
+    :param graduated: (合同数,)是否分档累进计费
+    :return: (矿场数, 合同数)的平均电价（$/kWh）
+    """
+    kw = np.asarray(fleet_kw, dtype=np.float64)[:, None, None]
+    # volume：取已达到的最高档，低于第一档起点时按第一档计
+    reached = np.maximum((tier_starts[None] <= kw).sum(axis=-1) - 1, 0)
+    volume_rate = np.take_along_axis(np.broadcast_to(tier_rates[None], reached.shape + tier_rates.shape[-1:]),
+                                     reached[..., None], axis=-1)[..., 0]
+    # graduated：各档内的功率乘以各自电价后求平均；与volume一致，第一档起点以下的功率按第一档计费
+    lower = tier_starts.copy()
+    lower[:, 0] = 0.0
+    tier_ends = np.concatenate([tier_starts[:, 1:], np.full((len(tier_starts), 1), np.inf)], axis=1)
+    with np.errstate(invalid='ignore'):
+        in_tier = np.clip(kw - lower[None], 0, (tier_ends - lower)[None])
+    in_tier = np.where(np.isfinite(tier_starts)[None], in_tier, 0)
+    total_kw = kw[..., 0]
+    graduated_rate = np.broadcast_to(tier_rates[:, 0], volume_rate.shape).copy()
+    np.divide((in_tier * tier_rates[None]).sum(axis=-1), total_kw, out=graduated_rate,
+              where=np.broadcast_to(total_kw > 0, volume_rate.shape))
+    return np.where(graduated, graduated_rate, volume_rate)
+
+
+def hosting_cost_batch(units, power_watts, contracts):
+    """
+    批量计算托管费用，矿场为第一维、合同为第二维
+    :param units: (矿场数,)的矿机数量
+    :param power_watts: (矿场数,)的单台功率（瓦特）
+    :param contracts: HostingContract列表或contract_arrays的结果
+    :return: 字典，包含effective_rate_kwh、daily_energy_kwh、daily_billed_kwh、daily_fixed_fee_usd、
+             daily_hosting_cost_usd、daily_full_load_cost_usd、setup_fee_usd和uptime_percent，
+             形状均为(矿场数, 合同数)
+    """
+    arrays = contracts if isinstance(contracts, dict) else contract_arrays(contracts)
+    units = np.asarray(units, dtype=np.float64)
+    fleet_kw = units * np.asarray(power_watts, dtype=np.float64) / 1000
+    rate = effective_rate(fleet_kw, arrays['tier_starts'], arrays['tier_rates'], arrays['graduated'])
+    uptime = np.broadcast_to(arrays['uptime_percent'], rate.shape)
+
+    # 最低承诺功率按全天计费（take-or-pay）
+    minimum_kwh = arrays['minimum_kw'] * 24
+    daily_energy = fleet_kw[:, None] * 24 * uptime / 100
+    daily_billed = np.maximum(daily_energy, minimum_kwh)
+    daily_fixed_fee = (arrays['monthly_fee'] + arrays['monthly_fee_per_unit'] * units[:, None]) / DAYS_PER_MONTH
+    return {
+        'effective_rate_kwh': rate,
+        'daily_energy_kwh': daily_energy,
+        'daily_billed_kwh': daily_billed,
+        'daily_fixed_fee_usd': daily_fixed_fee,
+        'daily_hosting_cost_usd': daily_billed * rate + daily_fixed_fee,
+        'daily_full_load_cost_usd': np.maximum(fleet_kw[:, None] * 24, minimum_kwh) * rate + daily_fixed_fee,
+        'setup_fee_usd': arrays['setup_fee_per_unit'] * units[:, None],
+        'uptime_percent': uptime
+    }
+
+
+def evaluate_hosting_offers(calculator, snapshot, contracts, models=None, units=1, pool_fee_percent=2.0,
+                            maintenance_cost_percent=0.0, depreciation_percent=0.0, block_reward=None):
+    """
+    一次计算所有矿机型号（矿场）在所有托管报价下的收益
+    :param calculator: BTCMiningCalculator实例
+    :param snapshot: 市场数据快照
+    :param contracts: HostingContract列表
+    :param models: 矿机型号列表，为None时使用全部型号
+    :param units: 每个型号的台数，标量或与models等长的数组
+    :param pool_fee_percent: 矿池手续费百分比
+    :param maintenance_cost_percent: 托管费之外的年度维护成本占硬件成本的百分比
+    :param depreciation_percent: 年度折旧占硬件成本的百分比
+    :param block_reward: 区块奖励（BTC），为None时使用calculator.block_reward
+    :return: (型号列表, 合同名称列表, 结果字典)；结果字典包含RESULT_FIELDS（电费字段为托管费用，
+             硬件成本含设置费）和hosting_cost_batch的字段，形状均为(型号数, 合同数)
+    """
+    names, columns = get_catalog_arrays(models)
+    units = np.broadcast_to(np.asarray(units, dtype=np.float64), (len(names),))
+    if block_reward is None:
+        block_reward = calculator.block_reward
+    hosting = hosting_cost_batch(units, columns['power'], contracts)
+    uptime = hosting['uptime_percent']
+
+    btc_price = float(snapshot['btc_price'])
+    network_difficulty = float(snapshot['network_difficulty'])
+    daily_btc, daily_btc_actual, daily_revenue = batch_mining_revenue(
+        (columns['hashrate'] * units)[:, None], pool_fee_percent, block_reward, uptime, btc_price, network_difficulty)
+    fleet_cost = (columns['cost'] * units)[:, None]
+    result = assemble_roi_batch(
+        btc_price, network_difficulty, uptime, daily_btc, daily_btc_actual, daily_revenue,
+        hosting['daily_full_load_cost_usd'], hosting['daily_hosting_cost_usd'], fleet_cost + hosting['setup_fee_usd'],
+        pool_fee_percent, fleet_cost * maintenance_cost_percent / 100, fleet_cost * depreciation_percent / 100)
+    result.update(hosting)
+    return names, [c.name for c in contracts], result
@@ -0,0 +1,216 @@
+import itertools
+from collections import OrderedDict
+
+import numpy as np
+
+from btc_mining_calculator import assemble_roi_batch, batch_mining_revenue, batch_power_cost, record_to_result, \
+    results_to_records
+from miner_catalog import get_fixed_costs
+from profiling import span
+
+# 每个阶段默认最多缓存的行数：矿机目录的全部型号加上页面中改动过参数的自定义行
+DEFAULT_MAX_ROWS = 256
+
+# 电价敏感性分析的电价点（0到0.1美元，步长0.01）
+SENSITIVITY_PRICES = np.round(np.arange(11) / 100, 3)
+
+_tokens = itertools.count(1)
+
+
+class IncrementalGraph:
+    """
+    按行缓存的依赖计算图
+
+    每个阶段声明依赖的输入和上游阶段，计算函数对一组行批量计算。
+    只有输入发生变化、上游对应行被重算或者新出现的行才会重新计算，
+    其余行直接复用上次的结果。每个阶段按最近使用保留最多max_rows行，
+    长时间运行（页面会话、watch.py）时不会无限增长。
+    """
+
+    def __init__(self, max_rows=DEFAULT_MAX_ROWS):
+        """
+        :param max_rows: 每个阶段最多缓存的行数，单次计算的行数更多时保留本次的全部行
+        """
+        self.max_rows = max_rows
+        self._stages = {}
+        self._cache = {}
+        # 最近一次evaluate中各阶段重算的行数，便于观察增量效果
+        self.last_recomputed = {}
+
+    def add_stage(self, name, inputs, func, upstream=()):
+        """
+        注册计算阶段
+        :param name: 阶段名称
+        :param inputs: 依赖的输入名称列表
+        :param func: 计算函数func(rows, params, upstream_values)，返回与rows一一对应的结果列表；
+                     params为依赖输入的取值，upstream_values为{上游阶段: 与rows对应的结果列表}
+        :param upstream: 依赖的上游阶段名称列表，必须先注册
+        """
+        for dep in upstream:
+            if dep not in self._stages:
+                raise KeyError(f"上游阶段未注册: {dep}")
+        self._stages[name] = (tuple(inputs), func, tuple(upstream))
+        self._cache[name] = OrderedDict()
+
+    def evaluate(self, name, rows, inputs):
+        """
+        计算指定阶段在给定行上的结果
+        :param name: 阶段名称
+        :param rows: 行键列表，行键需可哈希，且应包含该行的全部参数
+        :param inputs: 输入名称到取值的字典
+        :return: {行键: 结果}
+        """
+        return self.evaluate_many([name], rows, inputs)[name]
+
+    def evaluate_many(self, names, rows, inputs):
+        """
+        一次计算多个阶段，共享的上游阶段只检查一次
+        :return: {阶段名称: {行键: 结果}}
+        """
+        self.last_recomputed = {}
+        rows = list(dict.fromkeys(rows))
+        return {
+            name: {row: value for row, (_, value) in self._evaluate(name, rows, inputs).items()}
+            for name in names
+        }
+
+    def _evaluate(self, name, rows, inputs):
+        input_names, func, upstream = self._stages[name]
+        params = {key: inputs[key] for key in input_names}
+        input_key = tuple(_freeze(params[key]) for key in input_names)
+        upstream_entries = {dep: self._evaluate(dep, rows, inputs) for dep in upstream}
+
+        cache = self._cache[name]
+        stale = []
+        for row in rows:
+            entry = cache.get(row)
+            upstream_tokens = tuple(upstream_entries[dep][row][0] for dep in upstream)
+            if entry is None or entry[0] != input_key or entry[1] != upstream_tokens:
+                stale.append(row)
+
+        if stale:
+            upstream_values = {dep: [upstream_entries[dep][row][1] for row in stale] for dep in upstream}
+            with span(f"计算阶段: {name}", rows=len(stale)):
+                values = func(stale, params, upstream_values)
+            for row, value in zip(stale, values):
+                upstream_tokens = tuple(upstream_entries[dep][row][0] for dep in upstream)
+                cache[row] = (input_key, upstream_tokens, next(_tokens), value)
+        self.last_recomputed[name] = self.last_recomputed.get(name, 0) + len(stale)
+        for row in rows:
+            cache.move_to_end(row)
+        while len(cache) > max(self.max_rows, len(rows)):
+            cache.popitem(last=False)
+        return {row: (cache[row][2], cache[row][3]) for row in rows}
+
+    def clear(self):
+        for cache in self._cache.values():
+            cache.clear()
+
+
+def _freeze(value):
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def miner_row(name, specs):
+    """
+    构造矿机行键，包含计算所需的全部参数，参数改变时自然成为新行
+    :param name: 矿机型号
+    :param specs: 含hashrate、power、cost、efficiency的参数字典
+    """
+    return (name, float(specs['hashrate']), float(specs['power']), float(specs['cost']), float(specs['efficiency']))
+
+
+def _row_columns(rows):
+    columns = np.array([row[1:] for row in rows], dtype=np.float64).reshape(len(rows), 4)
+    return columns[:, 0], columns[:, 1], columns[:, 2], columns[:, 3]
+
+
+def _revenue_stage(rows, params, upstream):
+    hashrate, _, _, _ = _row_columns(rows)
+    snapshot = params['snapshot']
+    daily_btc, daily_btc_actual, daily_revenue_usd = batch_mining_revenue(
+        hashrate, params['pool_fee_percent'], params['block_reward'], params['annual_utilization_rate'],
+        float(snapshot['btc_price']), float(snapshot['network_difficulty']))
+    return [(daily_btc[i], daily_btc_actual[i], daily_revenue_usd[i]) for i in range(len(rows))]
+
+
+def _fixed_cost_stage(rows, params, upstream):
+    _, _, cost, efficiency = _row_columns(rows)
+    maintenance, depreciation = get_fixed_costs(cost, params['maintenance_percent'], params['depreciation_percent'],
+                                                efficiency)
+    return [(maintenance[i], depreciation[i]) for i in range(len(rows))]
+
+
+def _power_cost_stage(rows, params, upstream):
+    _, power, _, _ = _row_columns(rows)
+    full, actual = batch_power_cost(power, params['electricity_cost_kwh'], params['annual_utilization_rate'])
+    return [(full[i], actual[i]) for i in range(len(rows))]
+
+
+def _sweep_power_cost_stage(rows, params, upstream):
+    _, power, _, _ = _row_columns(rows)
+    full, actual = batch_power_cost(power[:, None], SENSITIVITY_PRICES[None, :], params['annual_utilization_rate'])
+    return [(full[i], actual[i]) for i in range(len(rows))]
+
+
+def _stack(values, index):
+    return np.array([v[index] for v in values], dtype=np.float64)
+
+
+def _comparison_stage(rows, params, upstream):
+    _, _, cost, _ = _row_columns(rows)
+    revenue, power_cost, fixed_cost = upstream['revenue'], upstream['power_cost'], upstream['fixed_cost']
+    snapshot = params['snapshot']
+    result = assemble_roi_batch(
+        float(snapshot['btc_price']), float(snapshot['network_difficulty']), params['annual_utilization_rate'],
+        _stack(revenue, 0), _stack(revenue, 1), _stack(revenue, 2),
+        _stack(power_cost, 0), _stack(power_cost, 1), cost, params['pool_fee_percent'],
+        _stack(fixed_cost, 0), _stack(fixed_cost, 1))
+    return [record_to_result(record) for record in results_to_records(result)]
+
+
+def _sweep_stage(rows, params, upstream):
+    _, _, cost, _ = _row_columns(rows)
+    revenue, power_cost, fixed_cost = upstream['revenue'], upstream['sweep_power_cost'], upstream['fixed_cost']
+    snapshot = params['snapshot']
+    result = assemble_roi_batch(
+        float(snapshot['btc_price']), float(snapshot['network_difficulty']), params['annual_utilization_rate'],
+        _stack(revenue, 0)[:, None], _stack(revenue, 1)[:, None], _stack(revenue, 2)[:, None],
+        _stack(power_cost, 0), _stack(power_cost, 1), cost[:, None], params['pool_fee_percent'],
+        _stack(fixed_cost, 0)[:, None], _stack(fixed_cost, 1)[:, None])
+    return [{
+        'electricity_cost_kwh': SENSITIVITY_PRICES,
+        'daily_profit_usd': result['daily_profit_usd'][i],
+        'monthly_profit_usd': result['monthly_profit_usd'][i],
+        'annual_profit_usd': result['annual_profit_usd'][i],
+        'roi_days': result['roi_days'][i]
+    } for i in range(len(rows))]
+
+
+def build_dashboard_graph(max_rows=DEFAULT_MAX_ROWS):
+    """
+    构建页面使用的计算图：
+    - revenue：收益列，依赖市场数据、区块奖励、矿池手续费和利用率
+    - fixed_cost：维护成本和折旧，依赖维护和折旧比例
+    - power_cost：当前电价下的电费，依赖电价和利用率
+    - comparison：对比表和主结果（ROIResult）
+    - sweep_power_cost / sweep：电价敏感性分析
+    输入名称：snapshot、block_reward、pool_fee_percent、annual_utilization_rate、electricity_cost_kwh、
+    maintenance_percent、depreciation_percent
+    :param max_rows: 每个阶段最多缓存的行数
+    """
+    graph = IncrementalGraph(max_rows)
+    graph.add_stage('revenue', ['snapshot', 'block_reward', 'pool_fee_percent', 'annual_utilization_rate'],
+                    _revenue_stage)
+    graph.add_stage('fixed_cost', ['maintenance_percent', 'depreciation_percent'], _fixed_cost_stage)
+    graph.add_stage('power_cost', ['electricity_cost_kwh', 'annual_utilization_rate'], _power_cost_stage)
+    graph.add_stage('sweep_power_cost', ['annual_utilization_rate'], _sweep_power_cost_stage)
+    graph.add_stage('comparison', ['snapshot', 'annual_utilization_rate', 'pool_fee_percent'], _comparison_stage,
+                    upstream=['revenue', 'power_cost', 'fixed_cost'])
+    graph.add_stage('sweep', ['snapshot', 'annual_utilization_rate', 'pool_fee_percent'], _sweep_stage,
+                    upstream=['revenue', 'sweep_power_cost', 'fixed_cost'])
+    return graph
@@ -0,0 +1,170 @@
+import math
+
+import numpy as np
+
+from miner_catalog import get_catalog_arrays, get_fixed_costs
+
+DAYS_PER_YEAR = 365
+
+
+class LifecycleModel:
+    """
+    矿机生命周期模型：算力随使用年限衰减，故障率随年限上升（Weibull累积风险），
+    到期残值按年递减且不低于残值下限。所有方法都接受按天计的机龄数组。
+    """
+
+    def __init__(self, hashrate_decay_percent_yearly=3.0, failure_rate_percent_yearly=5.0, failure_shape=1.5,
+                 resale_decline_percent_yearly=40.0, resale_floor_percent=5.0, service_life_years=5.0):
+        """
+        :param hashrate_decay_percent_yearly: 每年算力衰减百分比
+        :param failure_rate_percent_yearly: 第一年内的故障概率（%）
+        :param failure_shape: Weibull形状参数，大于1表示故障率随机龄上升，等于1为恒定故障率
+        :param resale_decline_percent_yearly: 二手价格每年下降百分比
+        :param resale_floor_percent: 残值下限，占新机价格的百分比
+        :param service_life_years: 使用寿命（年），到期后退役并按残值出售
+        """
+        self.hashrate_decay_percent_yearly = hashrate_decay_percent_yearly
+        self.failure_rate_percent_yearly = failure_rate_percent_yearly
+        self.failure_shape = failure_shape
+        self.resale_decline_percent_yearly = resale_decline_percent_yearly
+        self.resale_floor_percent = resale_floor_percent
+        self.service_life_years = service_life_years
+        # 第一年的累积风险，使一年内的故障概率恰好为failure_rate_percent_yearly
+        self._hazard_scale = -math.log(1 - min(failure_rate_percent_yearly, 99.999) / 100)
+
+    @property
+    def service_life_days(self):
+        return self.service_life_years * DAYS_PER_YEAR
+
+    def hashrate_factor(self, age_days):
+        """
+        机龄为age_days时的算力相对新机的比例
+        """
+        years = np.asarray(age_days, dtype=np.float64) / DAYS_PER_YEAR
+        return (1 - self.hashrate_decay_percent_yearly / 100) ** years
+
+    def survival(self, age_days):
+        """
+        新机运行到age_days时仍未故障的概率
+        """
+        years = np.maximum(np.asarray(age_days, dtype=np.float64), 0) / DAYS_PER_YEAR
+        return np.exp(-self._hazard_scale * years ** self.failure_shape)
+
+    def resale_fraction(self, age_days):
+        """
+        机龄为age_days的正常机器的二手价格占新机价格的比例
+        """
+        years = np.asarray(age_days, dtype=np.float64) / DAYS_PER_YEAR
+        return np.maximum((1 - self.resale_decline_percent_yearly / 100) ** years, self.resale_floor_percent / 100)
+
+
+DEFAULT_LIFECYCLE = LifecycleModel()
+
+
+def project_lifecycle(daily_revenue_full_usd, daily_power_cost_usd, daily_maintenance_cost_usd, hardware_cost,
+                      purchase_price, start_age_days=0, horizon_days=3 * DAYS_PER_YEAR, lifecycle=None,
+                      difficulty_ratio=None):
+    """
+    逐日推算生命周期内的现金流，场景为第一维、天数为第二维，一次完成全部场景的计算
+
+    每台机器的期望产出按"算力衰减 x 存活概率"折算，故障机器不再产生收益、电费和维护成本，
+    也没有残值；机龄达到使用寿命后退役。折旧由实际的购入价格与残值之差体现。
+    :param daily_revenue_full_usd: 新机、当前难度下的每日收入（已扣矿池费并计入利用率）
+    :param daily_power_cost_usd: 每日电费（已计入利用率）
+    :param daily_maintenance_cost_usd: 每日维护成本
+    :param hardware_cost: 新机价格，用于计算残值
+    :param purchase_price: 实际购入价格
+    :param start_age_days: 购入时的机龄（天），0为新机
+    :param horizon_days: 推算天数
+    :param lifecycle: LifecycleModel，为None时使用DEFAULT_LIFECYCLE
+    :param difficulty_ratio: 每天的"当前难度/当日难度"数组，长度不足horizon_days时沿用最后一个值；为None时难度不变
+    :return: 字典，cumulative_profit_usd为(场景数, 天数)的累计经营利润，其余为每个场景一个值
+    """
+    lifecycle = lifecycle or DEFAULT_LIFECYCLE
+    revenue, power_cost, maintenance, hardware_cost, purchase_price, start_age = np.broadcast_arrays(
+        *(np.atleast_1d(np.asarray(v, dtype=np.float64)) for v in (
+            daily_revenue_full_usd, daily_power_cost_usd, daily_maintenance_cost_usd, hardware_cost,
+            purchase_price, start_age_days)))
+
+    days = np.arange(horizon_days, dtype=np.float64)
+    age = start_age[:, None] + days[None, :]
+    in_service = age < lifecycle.service_life_days
+    # 购入时机器正常，之后的存活概率为条件概率
+    alive = lifecycle.survival(age) / lifecycle.survival(start_age)[:, None] * in_service
+
+    ratio = np.ones(horizon_days)
+    if difficulty_ratio is not None:
+        difficulty_ratio = np.asarray(difficulty_ratio, dtype=np.float64)[:horizon_days]
+        ratio[:len(difficulty_ratio)] = difficulty_ratio
+        ratio[len(difficulty_ratio):] = difficulty_ratio[-1] if len(difficulty_ratio) else 1.0
+
+    daily_revenue = revenue[:, None] * lifecycle.hashrate_factor(age) * ratio[None, :] * alive
+    daily_cost = (power_cost + maintenance)[:, None] * alive
+    daily_profit = daily_revenue - daily_cost
+    cumulative_profit = np.cumsum(daily_profit, axis=1)
+
+    # 回本天数：累计经营利润首次达到购入价格的天数（不计残值），推算期内未回本为inf
+    paid_back = cumulative_profit >= purchase_price[:, None]
+    payback_days = np.where(paid_back.any(axis=1), paid_back.argmax(axis=1) + 1.0, np.inf)
+
+    # 退役或推算期结束时按期望残值出售
+    exit_day = np.minimum(lifecycle.service_life_days - start_age, horizon_days)
+    exit_day = np.maximum(exit_day, 0)
+    exit_age = start_age + exit_day
+    exit_alive = lifecycle.survival(exit_age) / lifecycle.survival(start_age)
+    resale_value = hardware_cost * lifecycle.resale_fraction(exit_age) * exit_alive
+
+    total_profit = cumulative_profit[:, -1] if horizon_days > 0 else np.zeros(len(revenue))
+    net_return = total_profit + resale_value - purchase_price
+    roi_percent = np.full(net_return.shape, np.nan)
+    np.divide(net_return * 100, purchase_price, out=roi_percent, where=purchase_price > 0)
+    return {
+        'cumulative_profit_usd': cumulative_profit,
+        'payback_days': payback_days,
+        'service_days': exit_day,
+        'total_profit_usd': total_profit,
+        'resale_value_usd': resale_value,
+        'net_return_usd': net_return,
+        'roi_percent': roi_percent
+    }
+
+
+def compare_used_vs_new(calculator, snapshot, electricity_cost_kwh, used_age_years=2.0, used_price_percent=None,
+                        models=None, lifecycle=None, horizon_days=3 * DAYS_PER_YEAR, pool_fee_percent=2.0,
+                        maintenance_percent=6.0, annual_utilization_rate=100.0, block_reward=None,
+                        daily_difficulty=None):
+    """
+    对矿机目录中的型号批量比较新机与二手机的回本情况
+    :param calculator: BTCMiningCalculator实例
+    :param snapshot: 市场数据快照
+    :param electricity_cost_kwh: 每千瓦时电费（美元）
+    :param used_age_years: 二手机的机龄（年）
+    :param used_price_percent: 二手机价格占新机价格的百分比，为None时按生命周期模型的残值估算
+    :param models: 矿机型号列表，为None时使用全部型号
+    :param lifecycle: LifecycleModel
+    :param horizon_days: 推算天数
+    :param pool_fee_percent: 矿池手续费百分比
+    :param maintenance_percent: 维护成本占新机价格的年百分比，按效率系数调整（同页面）
+    :param annual_utilization_rate: 年利用率（%）
+    :param block_reward: 区块奖励（BTC）
+    :param daily_difficulty: 每天的预测难度数组（见DifficultyForecast.daily_difficulty），为None时难度不变
+    :return: (型号列表, {'new': 结果字典, 'used': 结果字典})，结果字典同calculate_lifecycle_batch
+    """
+    lifecycle = lifecycle or DEFAULT_LIFECYCLE
+    names, columns = get_catalog_arrays(models)
+    used_age_days = used_age_years * DAYS_PER_YEAR
+    if used_price_percent is None:
+        used_price = columns['cost'] * lifecycle.resale_fraction(used_age_days)
+    else:
+        used_price = columns['cost'] * used_price_percent / 100
+    maintenance, _ = get_fixed_costs(columns['cost'], maintenance_percent, None, columns['efficiency'])
+
+    def run(purchase_price, start_age_days):
+        return calculator.calculate_lifecycle_batch(
+            columns['hashrate'], columns['power'], electricity_cost_kwh, purchase_price,
+            hardware_cost=columns['cost'], start_age_days=start_age_days, horizon_days=horizon_days,
+            lifecycle=lifecycle, pool_fee_percent=pool_fee_percent, maintenance_cost_yearly=maintenance,
+            block_reward=block_reward, annual_utilization_rate=annual_utilization_rate,
+            daily_difficulty=daily_difficulty, snapshot=snapshot)
+
+    return names, {'new': run(columns['cost'], 0.0), 'used': run(used_price, used_age_days)}
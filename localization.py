@@ -0,0 +1,71 @@
+# 计算结果字段的显示名称，字段名见btc_mining_calculator.RESULT_FIELDS
+RESULT_LABELS = {
+    'zh': {
+        'btc_price': 'BTC当前价格',
+        'network_difficulty': '网络难度',
+        'annual_utilization_rate': '年利用率',
+        'daily_btc_full': '每日BTC收益(满载)',
+        'daily_btc_actual': '每日BTC收益(含矿池费)',
+        'daily_revenue_usd': '每日收入(USD)',
+        'daily_power_cost_full_usd': '每日电费(满载)',
+        'daily_power_cost_usd': '每日电费(USD)',
+        'daily_maintenance_cost_usd': '每日维护成本(USD)',
+        'daily_depreciation_usd': '每日折旧(USD)',
+        'daily_total_cost_usd': '每日总成本(USD)',
+        'daily_profit_usd': '每日净利润(USD)',
+        'roi_days': '预计回本天数',
+        'monthly_profit_usd': '月度净利润(USD)',
+        'annual_profit_usd': '年度净利润(USD)',
+        'pool_fee_percent': '矿池手续费',
+        'maintenance_cost_yearly_usd': '年度维护成本(USD)',
+        'hardware_depreciation_yearly_usd': '年度折旧(USD)'
+    },
+    'en': {
+        'btc_price': 'BTC Price',
+        'network_difficulty': 'Network Difficulty',
+        'annual_utilization_rate': 'Annual Utilization (%)',
+        'daily_btc_full': 'Daily BTC (Full Load)',
+        'daily_btc_actual': 'Daily BTC (Actual)',
+        'daily_revenue_usd': 'Daily Revenue (USD)',
+        'daily_power_cost_full_usd': 'Daily Power Cost (Full Load)',
+        'daily_power_cost_usd': 'Daily Power Cost (USD)',
+        'daily_maintenance_cost_usd': 'Daily Maintenance (USD)',
+        'daily_depreciation_usd': 'Daily Depreciation (USD)',
+        'daily_total_cost_usd': 'Daily Total Cost (USD)',
+        'daily_profit_usd': 'Daily Profit (USD)',
+        'roi_days': 'ROI Days',
+        'monthly_profit_usd': 'Monthly Profit (USD)',
+        'annual_profit_usd': 'Annual Profit (USD)',
+        'pool_fee_percent': 'Pool Fee (%)',
+        'maintenance_cost_yearly_usd': 'Annual Maintenance (USD)',
+        'hardware_depreciation_yearly_usd': 'Annual Depreciation (USD)'
+    }
+}
+
+
+def get_label(field, lang='zh'):
+    """
+    获取字段的显示名称，未定义时返回字段名本身
+    :param field: 字段名
+    :param lang: 语言
+    """
+    return RESULT_LABELS.get(lang, {}).get(field, field)
+
+
+def localize_result(result, lang='zh'):
+    """
+    将以字段名为键的结果转换为以显示名称为键的字典
+    :param result: 以字段名为键的字典
+    :param lang: 语言，zh或en
+    :return: 以显示名称为键的字典，保持原有顺序
+    """
+    if lang not in RESULT_LABELS:
+        raise ValueError(f"不支持的语言: {lang}")
+    return {get_label(field, lang): value for field, value in result.items()}
+
+
+def localize_columns(df, lang='zh'):
+    """
+    将DataFrame的列名转换为显示名称，用于页面展示和导出
+    """
+    return df.rename(columns=lambda field: get_label(field, lang))
@@ -0,0 +1,87 @@
+import numpy as np
+
+# 定义常见矿机型号及其参数
+MINER_MODELS = {
+    "Custom": {"hashrate": 200.0, "power": 3500.0, "cost": 4000.0, "efficiency": 17.50, "cost_per_th": 20.00},
+    "Antminer S23 Hydro": {"hashrate": 580.0, "power": 5510.0, "cost": 14790.0, "efficiency": 9.50, "cost_per_th": 25.50},
+    "Antminer S21 XP Hydro": {"hashrate": 473.0, "power": 5676.0, "cost": 10170.0, "efficiency": 12.00, "cost_per_th": 21.50},
+    "Antminer S21 XP lmm.": {"hashrate": 300.0, "power": 4050.0, "cost": 7368.0, "efficiency": 13.50, "cost_per_th": 24.56},
+    "Antminer S21 pro": {"hashrate": 234.0, "power": 3510.0, "cost": 3744.0, "efficiency": 15.00, "cost_per_th": 16.00},
+    "Antminer S21+": {"hashrate": 216.0, "power": 3564.0, "cost": 3240.0, "efficiency": 16.50, "cost_per_th": 15.00},
+    "Antminer S21 lmm.": {"hashrate": 215.0, "power": 3440.0, "cost": 3333.0, "efficiency": 16.00, "cost_per_th": 15.50},
+    "Antminer S21+ Hydro": {"hashrate": 358.0, "power": 5370.0, "cost": 5370.0, "efficiency": 15.00, "cost_per_th": 15.00},
+    "Antminer S19 XP+ Hyd.": {"hashrate": 279.0, "power": 5301.0, "cost": 2790.0, "efficiency": 19.01, "cost_per_th": 10.00},
+    "Antminer S19k Pro": {"hashrate": 120.0, "power": 2760.0, "cost": 840.0, "efficiency": 23.00, "cost_per_th": 7.00},
+    "Teraflux AH3880": {"hashrate": 450.0, "power": 6525.0, "cost": 4550.0, "efficiency": 14.50, "cost_per_th": 10.11},
+    "SEALMINER A2 Pro Hyd": {"hashrate": 500.0, "power": 7450.0, "cost": 7500.0, "efficiency": 14.90, "cost_per_th": 15.00},
+    "SEALMINER A2 Pro Air": {"hashrate": 255.0, "power": 3790.0, "cost": 4100.0, "efficiency": 14.86, "cost_per_th": 16.08},
+    "Avalon Q": {"hashrate": 90.0, "power": 1674.0, "cost": 1888.0, "efficiency": 18.60, "cost_per_th": 20.98},
+    "Whatsminer M50S": {"hashrate": 126.0, "power": 3348.0, "cost": 1500.0, "efficiency": 26.57, "cost_per_th": 11.90},
+    "Avalon A1566I-261T": {"hashrate": 261.0, "power": 4959.0, "cost": 3367.0, "efficiency": 19.00, "cost_per_th": 12.90}
+}
+
+def get_maintenance_coefficient(efficiency):
+    """
+    根据矿机效率返回维护成本调整系数
+    效率越低（数值越大），维护系数越高
+    """
+    if efficiency <= 15.0:
+        return 1.0  # 高效机型
+    elif efficiency <= 20.0:
+        return 1.3  # 中效机型
+    else:
+        return 1.6  # 低效机型
+
+def calculate_adjusted_maintenance_cost(hardware_cost, base_percent, efficiency):
+    """
+    计算调整后的维护成本
+    """
+    coefficient = get_maintenance_coefficient(efficiency)
+    return hardware_cost * (base_percent / 100) * coefficient
+
+
+def get_maintenance_coefficients(efficiency):
+    """
+    get_maintenance_coefficient的数组版本
+    :param efficiency: 矿机效率数组（W/TH）
+    :return: 维护成本调整系数数组
+    """
+    efficiency = np.asarray(efficiency, dtype=np.float64)
+    return np.where(efficiency <= 15.0, 1.0, np.where(efficiency <= 20.0, 1.3, 1.6))
+
+
+def get_fixed_costs(hardware_cost, maintenance_percent, depreciation_percent, efficiency=None):
+    """
+    与页面一致地计算年度维护成本和折旧：维护成本按效率系数调整，年度金额取整后参与计算
+    :param hardware_cost: 硬件成本（美元），标量或数组
+    :param maintenance_percent: 基础维护成本比例（%），为None时不计算维护成本
+    :param depreciation_percent: 年度硬件折旧比例（%），为None时不计算折旧
+    :param efficiency: 矿机效率（W/TH），为None时不按效率调整维护成本
+    :return: (年度维护成本, 年度折旧)
+    """
+    hardware_cost = np.asarray(hardware_cost, dtype=np.float64)
+    maintenance = depreciation = None
+    if maintenance_percent is not None:
+        coefficient = get_maintenance_coefficients(efficiency) if efficiency is not None else 1.0
+        maintenance = np.trunc(hardware_cost * (np.asarray(maintenance_percent) / 100) * coefficient)
+    if depreciation_percent is not None:
+        depreciation = np.trunc(hardware_cost * (np.asarray(depreciation_percent) / 100))
+    return maintenance, depreciation
+
+
+def get_catalog_arrays(models=None):
+    """
+    将矿机参数转换为按列存放的数组，便于批量计算
+    :param models: 矿机型号列表，为None时使用全部型号
+    :return: (型号列表, 以参数名为键的numpy数组字典)
+    """
+    names = list(MINER_MODELS.keys()) if models is None else list(models)
+    unknown = [name for name in names if name not in MINER_MODELS]
+    if unknown:
+        raise KeyError(f"未知的矿机型号: {', '.join(unknown)}")
+    columns = {
+        key: np.array([MINER_MODELS[name][key] for name in names], dtype=np.float64)
+        for key in ('hashrate', 'power', 'cost', 'efficiency', 'cost_per_th')
+    }
+    return names, columns
+
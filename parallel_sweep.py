@@ -0,0 +1,226 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from btc_mining_calculator import RESULT_FIELDS, BTCMiningCalculator
+from miner_catalog import get_catalog_arrays
+from results_store import expand_sweep_params
+
+# 少于该数量的场景直接在当前进程计算，进程池的启动和调度开销不值得
+DEFAULT_MIN_PARALLEL_SIZE = 200_000
+
+# 单个任务的最大场景数，任务数至少为进程数的4倍以平衡负载
+DEFAULT_MAX_CHUNK_SIZE = 1_000_000
+
+
+class SharedArrays:
+    """
+    将多个float64数组放入同一块共享内存，子进程按描述信息挂载后得到只读视图，无需逐任务pickle
+    """
+
+    def __init__(self, arrays):
+        arrays = {name: np.asarray(array, dtype=np.float64) for name, array in arrays.items()}
+        self._allocate({name: array.shape for name, array in arrays.items()})
+        for name, array in arrays.items():
+            self.view(name)[...] = array
+
+    @classmethod
+    def zeros(cls, shapes):
+        """
+        按形状直接在共享内存中分配并原地置零，不经过父进程中的中间数组
+        :param shapes: 名称到形状的字典
+        """
+        shared = cls.__new__(cls)
+        shared._allocate(shapes)
+        np.frombuffer(shared.shm.buf, dtype=np.uint8).fill(0)
+        return shared
+
+    def _allocate(self, shapes):
+        self.layout = {}
+        offset = 0
+        for name, shape in shapes.items():
+            shape = tuple(shape)
+            self.layout[name] = (offset, shape)
+            offset += int(np.prod(shape)) * np.dtype(np.float64).itemsize
+        self.shm = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+
+    def view(self, name):
+        offset, shape = self.layout[name]
+        return np.ndarray(shape, dtype=np.float64, buffer=self.shm.buf, offset=offset)
+
+    @property
+    def descriptor(self):
+        return self.shm.name, self.layout
+
+    @staticmethod
+    def attach(descriptor, writable=False):
+        """
+        在子进程中挂载共享内存
+        :return: (SharedMemory, 名称到数组视图的字典)
+        """
+        name, layout = descriptor
+        # 子进程与父进程共用同一个resource_tracker，共享内存由创建方close()时释放
+        shm = shared_memory.SharedMemory(name=name)
+        views = {}
+        for key, (offset, shape) in layout.items():
+            view = np.ndarray(shape, dtype=np.float64, buffer=shm.buf, offset=offset)
+            view.flags.writeable = writable
+            views[key] = view
+        return shm, views
+
+    def close(self):
+        self.shm.close()
+        self.shm.unlink()
+
+
+# 子进程状态，由_init_worker设置，每个子进程只挂载一次
+_worker_state = {}
+
+
+def _init_worker(inputs_descriptor, outputs_descriptors, job):
+    _worker_state['inputs'] = SharedArrays.attach(inputs_descriptor)
+    # 每个输出字段一块共享内存
+    attached = [SharedArrays.attach(descriptor, writable=True) for descriptor in outputs_descriptors]
+    _worker_state['outputs'] = ([shm for shm, _ in attached],
+                                {name: view for _, views in attached for name, view in views.items()})
+    _worker_state['job'] = job
+    _worker_state['calculator'] = BTCMiningCalculator()
+
+
+def _evaluate_range(start, stop):
+    """
+    计算扁平下标[start, stop)的场景，结果直接写入共享输出数组的对应位置
+    """
+    _, inputs = _worker_state['inputs']
+    _, outputs = _worker_state['outputs']
+    _compute_range(_worker_state['calculator'], inputs, outputs, _worker_state['job'], start, stop)
+    return start, stop
+
+
+def _compute_range(calculator, inputs, outputs, job, start, stop):
+    snapshot = {'btc_price': float(inputs['__snapshot__'][0]), 'network_difficulty': float(inputs['__snapshot__'][1])}
+    if job['kind'] == 'grid':
+        axis_names = job['axis_names']
+        shape = job['shape']
+        indices = np.unravel_index(np.arange(start, stop), shape)
+        coordinates = {
+            name: (index if name == 'model' else inputs[f"axis:{name}"][index])
+            for name, index in zip(axis_names, indices)
+        }
+        model_columns = {key[len('model:'):]: value for key, value in inputs.items() if key.startswith('model:')}
+        params = expand_sweep_params(coordinates, job['fixed'], model_columns or None)
+    else:
+        params = dict(job['fixed'])
+        for name in job['array_params']:
+            params[name] = inputs[f"param:{name}"][start:stop]
+    result = calculator.calculate_roi_batch(snapshot=snapshot, **params)
+    for field in job['fields']:
+        outputs[field][start:stop] = result[field]
+
+
+class ParallelSweepExecutor:
+    """
+    多进程批量计算
+
+    市场快照、矿机参数和场景数组放入共享内存，由各子进程只读挂载；各任务按扁平下标范围划分，
+    结果直接写入共享输出数组的固定位置，因此合并结果与任务完成顺序无关。
+    场景数少于min_parallel_size或只有一个进程时在当前进程计算。
+    """
+
+    def __init__(self, max_workers=None, min_parallel_size=DEFAULT_MIN_PARALLEL_SIZE,
+                 max_chunk_size=DEFAULT_MAX_CHUNK_SIZE, calculator=None):
+        """
+        :param max_workers: 进程数，为None时使用CPU核数
+        :param min_parallel_size: 使用进程池的最小场景数
+        :param max_chunk_size: 单个任务的最大场景数
+        :param calculator: 当前进程计算时使用的BTCMiningCalculator实例
+        """
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.min_parallel_size = min_parallel_size
+        self.max_chunk_size = max_chunk_size
+        self.calculator = calculator or BTCMiningCalculator()
+
+    def evaluate(self, snapshot, fields=None, **params):
+        """
+        计算一组场景，参数含义同calculate_roi_batch，数组参数长度需一致
+        :param snapshot: 市场数据快照
+        :param fields: 返回的结果字段，为None时返回全部字段
+        :return: 字段名到数组的字典
+        """
+        params = self._resolve_block_reward(params)
+        array_params = {name: np.asarray(value, dtype=np.float64) for name, value in params.items()
+                        if np.ndim(value) > 0}
+        fixed = {name: value for name, value in params.items() if name not in array_params}
+        sizes = {value.shape[0] for value in array_params.values()}
+        if len(sizes) > 1:
+            raise ValueError("数组参数的长度不一致")
+        size = sizes.pop() if sizes else 1
+        inputs = {f"param:{name}": value for name, value in array_params.items()}
+        job = {'kind': 'scenarios', 'array_params': list(array_params), 'fixed': fixed}
+        return self._run(snapshot, inputs, job, size, (size,), fields)
+
+    def evaluate_grid(self, axes, snapshot, fields=None, **fixed):
+        """
+        计算参数网格，轴的含义同results_store.run_grid_sweep
+        :param axes: 轴名称到取值列表的有序字典
+        :param snapshot: 市场数据快照
+        :param fields: 返回的结果字段
+        :param fixed: 固定参数
+        :return: 字段名到数组的字典，数组形状为各轴长度
+        """
+        fixed = self._resolve_block_reward(fixed)
+        shape = tuple(len(values) for values in axes.values())
+        inputs = {}
+        for name, values in axes.items():
+            if name == 'model':
+                _, columns = get_catalog_arrays(list(values))
+                inputs.update({f"model:{key}": value for key, value in columns.items()})
+            else:
+                inputs[f"axis:{name}"] = np.asarray(values, dtype=np.float64)
+        job = {'kind': 'grid', 'axis_names': list(axes), 'shape': shape, 'fixed': fixed}
+        return self._run(snapshot, inputs, job, int(np.prod(shape)), shape, fields)
+
+    def _resolve_block_reward(self, params):
+        # 子进程中的计算器使用默认区块奖励，这里显式传入当前计算器的值
+        params = dict(params)
+        if params.get('block_reward') is None:
+            params['block_reward'] = self.calculator.block_reward
+        return params
+
+    def _chunks(self, size):
+        chunk_size = max(1, min(self.max_chunk_size, -(-size // (self.max_workers * 4))))
+        return [(start, min(start + chunk_size, size)) for start in range(0, size, chunk_size)]
+
+    def _run(self, snapshot, inputs, job, size, shape, fields):
+        job['fields'] = list(fields or RESULT_FIELDS)
+        inputs['__snapshot__'] = np.array([snapshot['btc_price'], snapshot['network_difficulty']], dtype=np.float64)
+
+        if self.max_workers <= 1 or size < self.min_parallel_size:
+            outputs = {field: np.empty(size, dtype=np.float64) for field in job['fields']}
+            _compute_range(self.calculator, inputs, outputs, job, 0, size)
+            return {field: values.reshape(shape) for field, values in outputs.items()}
+
+        # 输出按字段分别放入共享内存并原地置零；计算完成后逐字段复制到普通数组并立即释放该字段的共享内存，
+        # 峰值内存约为全部输出加一个字段，而不是在父进程中另建一份再复制
+        shared_inputs = SharedArrays(inputs)
+        shared_outputs = {}
+        try:
+            for field in job['fields']:
+                shared_outputs[field] = SharedArrays.zeros({field: (size,)})
+            descriptors = [shared.descriptor for shared in shared_outputs.values()]
+            with ProcessPoolExecutor(max_workers=self.max_workers, initializer=_init_worker,
+                                     initargs=(shared_inputs.descriptor, descriptors, job)) as pool:
+                chunks = self._chunks(size)
+                for _ in pool.map(_evaluate_range, *zip(*chunks)):
+                    pass
+            results = {}
+            for field in job['fields']:
+                results[field] = shared_outputs[field].view(field).copy().reshape(shape)
+                shared_outputs.pop(field).close()
+            return results
+        finally:
+            shared_inputs.close()
+            for shared in shared_outputs.values():
+                shared.close()
@@ -0,0 +1,205 @@
+import math
+from dataclasses import dataclass
+
+import numpy as np
+
+# 当前区块补贴（BTC），calculator.block_reward中超出补贴的部分视为平均交易费
+BLOCK_SUBSIDY = 3.125
+BLOCKS_PER_DAY = 144
+
+# 默认矿池算力（TH/s），PPLNS的运气波动取决于矿池整体的出块数
+DEFAULT_POOL_HASHRATE_TH = 100e6
+
+# 区块补贴和交易费各自的分配方式：pps为按份额固定支付（无波动），pplns为按矿池实际出块分配，
+# solo为只有自己挖到区块时才有收入，none为不分配
+SHARE_MODES = ('pps', 'pplns', 'solo', 'none')
+
+
+@dataclass(slots=True)
+class PayoutScheme:
+    """
+    矿池收益分配方式
+    """
+    name: str
+    pool_fee_percent: float
+    subsidy_mode: str
+    tx_fee_mode: str
+
+    def __post_init__(self):
+        for mode in (self.subsidy_mode, self.tx_fee_mode):
+            if mode not in SHARE_MODES:
+                raise ValueError(f"未知的分配方式: {mode}")
+
+
+PAYOUT_SCHEMES = {
+    'FPPS': PayoutScheme('FPPS', 2.5, 'pps', 'pps'),
+    'PPS+': PayoutScheme('PPS+', 2.5, 'pps', 'pplns'),
+    'PPS': PayoutScheme('PPS', 2.5, 'pps', 'none'),
+    'PPLNS': PayoutScheme('PPLNS', 1.0, 'pplns', 'pplns'),
+    'SOLO': PayoutScheme('SOLO', 2.0, 'solo', 'solo')
+}
+
+
+def _get_scheme(scheme):
+    if isinstance(scheme, PayoutScheme):
+        return scheme
+    if scheme not in PAYOUT_SCHEMES:
+        raise KeyError(f"未知的收益分配方式: {scheme}")
+    return PAYOUT_SCHEMES[scheme]
+
+
+def split_block_reward(block_reward, subsidy=BLOCK_SUBSIDY):
+    """
+    :return: (区块补贴, 平均每块交易费)
+    """
+    return subsidy, max(block_reward - subsidy, 0.0)
+
+
+def scheme_roi_params(scheme, block_reward, subsidy=BLOCK_SUBSIDY):
+    """
+    换算为calculate_roi / calculate_roi_batch可用的block_reward和pool_fee_percent，使期望收益一致
+    :param scheme: PayoutScheme或PAYOUT_SCHEMES中的名称
+    :param block_reward: 含交易费的平均区块奖励（BTC）
+    :return: {'block_reward': 参与分配的期望区块奖励, 'pool_fee_percent': 矿池费率}
+    """
+    scheme = _get_scheme(scheme)
+    subsidy, tx_fees = split_block_reward(block_reward, subsidy)
+    paid = (subsidy if scheme.subsidy_mode != 'none' else 0.0) + (tx_fees if scheme.tx_fee_mode != 'none' else 0.0)
+    return {'block_reward': paid, 'pool_fee_percent': scheme.pool_fee_percent}
+
+
+def _expected_blocks(hashrate_th, network_difficulty, days):
+    network_hashrate_th = network_difficulty * 2**32 / 600 / 1e12
+    return np.asarray(hashrate_th, dtype=np.float64) / network_hashrate_th * BLOCKS_PER_DAY * days
+
+
+def _components(scheme, block_reward, subsidy):
+    """
+    按分配方式归并区块奖励：返回{分配方式: 该方式下分配的每块奖励}
+    """
+    subsidy, tx_fees = split_block_reward(block_reward, subsidy)
+    parts = {}
+    for mode, amount in ((scheme.subsidy_mode, subsidy), (scheme.tx_fee_mode, tx_fees)):
+        if mode != 'none':
+            parts[mode] = parts.get(mode, 0.0) + amount
+    return parts
+
+
+def payout_distribution(hashrate_th, scheme, network_difficulty, btc_price, block_reward, days=30,
+                        pool_hashrate_th=DEFAULT_POOL_HASHRATE_TH, annual_utilization_rate=100.0,
+                        subsidy=BLOCK_SUBSIDY):
+    """
+    解析计算一段时间内收益的期望和波动
+
+    出块数服从泊松分布：solo的方差来自自己的出块数，PPLNS来自矿池的出块数（按算力占比分配，
+    不考虑PPLNS窗口的平滑作用），PPS部分没有波动。
+    :param hashrate_th: 算力（TH/s），可为数组
+    :param scheme: PayoutScheme或PAYOUT_SCHEMES中的名称
+    :param network_difficulty: 网络难度
+    :param btc_price: BTC价格（美元）
+    :param block_reward: 含交易费的平均区块奖励（BTC）
+    :param days: 统计周期（天）
+    :param pool_hashrate_th: 矿池算力（TH/s）
+    :param annual_utilization_rate: 年利用率（%）
+    :param subsidy: 区块补贴（BTC）
+    :return: 字典，expected_btc、std_btc、expected_usd、std_usd、cv（变异系数）和prob_zero（周期内收益为0的概率）
+    """
+    scheme = _get_scheme(scheme)
+    effective_th = np.asarray(hashrate_th, dtype=np.float64) * annual_utilization_rate / 100
+    pool_th = np.maximum(pool_hashrate_th, effective_th)
+    own_blocks = _expected_blocks(effective_th, network_difficulty, days)
+    pool_blocks = _expected_blocks(pool_th, network_difficulty, days)
+    keep = 1 - scheme.pool_fee_percent / 100
+
+    expected = np.zeros(own_blocks.shape)
+    variance = np.zeros(own_blocks.shape)
+    prob_zero = np.ones(own_blocks.shape)
+    for mode, reward in _components(scheme, block_reward, subsidy).items():
+        amount = reward * keep
+        expected = expected + own_blocks * amount
+        if mode == 'pplns':
+            share = effective_th / pool_th
+            variance = variance + pool_blocks * (share * amount) ** 2
+            prob_zero = prob_zero * np.exp(-pool_blocks)
+        elif mode == 'solo':
+            variance = variance + own_blocks * amount ** 2
+            prob_zero = prob_zero * np.exp(-own_blocks)
+        else:
+            prob_zero = prob_zero * (own_blocks <= 0)
+
+    std = np.sqrt(variance)
+    cv = np.full(expected.shape, np.nan)
+    np.divide(std, expected, out=cv, where=expected > 0)
+    return {
+        'expected_btc': expected,
+        'std_btc': std,
+        'expected_usd': expected * btc_price,
+        'std_usd': std * btc_price,
+        'cv': cv,
+        'prob_zero': prob_zero
+    }
+
+
+def simulate_payouts(hashrate_th, scheme, network_difficulty, btc_price, block_reward, days=30,
+                     pool_hashrate_th=DEFAULT_POOL_HASHRATE_TH, annual_utilization_rate=100.0,
+                     subsidy=BLOCK_SUBSIDY, samples=10000, percentiles=(5, 25, 50, 75, 95), seed=None,
+                     chunk_size=2_000_000):
+    """
+    批量模拟一段时间内的收益分布，全部算力水平一次抽样（按(算力数, 样本数)的数组分块）
+    :param samples: 每个算力水平的模拟次数
+    :param percentiles: 返回的分位数
+    :param seed: 随机数种子
+    :param chunk_size: 每块最多抽样的数量，限制内存占用
+    :return: 字典，percentiles为(算力数, 分位数个数)的美元收益分位数，另含mean_usd、std_usd和prob_zero；
+             其余参数同payout_distribution
+    """
+    scheme = _get_scheme(scheme)
+    rng = np.random.default_rng(seed)
+    effective_th = np.atleast_1d(np.asarray(hashrate_th, dtype=np.float64)) * annual_utilization_rate / 100
+    pool_th = np.maximum(pool_hashrate_th, effective_th)
+    own_blocks = _expected_blocks(effective_th, network_difficulty, days)
+    pool_blocks = _expected_blocks(pool_th, network_difficulty, days)
+    keep = 1 - scheme.pool_fee_percent / 100
+    components = _components(scheme, block_reward, subsidy)
+
+    levels = len(effective_th)
+    result = {
+        'percentiles': np.empty((levels, len(percentiles))),
+        'mean_usd': np.empty(levels),
+        'std_usd': np.empty(levels),
+        'prob_zero': np.empty(levels)
+    }
+    rows_per_chunk = max(1, chunk_size // samples)
+    for start in range(0, levels, rows_per_chunk):
+        stop = min(start + rows_per_chunk, levels)
+        payout = np.zeros((stop - start, samples))
+        # 同一次模拟中PPLNS部分和solo部分共用同一组出块数，避免重复抽样
+        pool_draws = own_draws = None
+        for mode, reward in components.items():
+            amount = reward * keep
+            if mode == 'pplns':
+                if pool_draws is None:
+                    pool_draws = rng.poisson(pool_blocks[start:stop, None], (stop - start, samples))
+                payout += pool_draws * (effective_th[start:stop] / pool_th[start:stop])[:, None] * amount
+            elif mode == 'solo':
+                if own_draws is None:
+                    own_draws = rng.poisson(own_blocks[start:stop, None], (stop - start, samples))
+                payout += own_draws * amount
+            else:
+                payout += own_blocks[start:stop, None] * amount
+        payout *= btc_price
+        result['percentiles'][start:stop] = np.percentile(payout, percentiles, axis=1).T
+        result['mean_usd'][start:stop] = payout.mean(axis=1)
+        result['std_usd'][start:stop] = payout.std(axis=1)
+        result['prob_zero'][start:stop] = (payout == 0).mean(axis=1)
+    return result
+
+
+def days_until_first_block(hashrate_th, network_difficulty, probability=0.5, annual_utilization_rate=100.0):
+    """
+    solo挖矿时以给定概率至少挖到一个区块所需的天数
+    """
+    blocks_per_day = _expected_blocks(np.asarray(hashrate_th, dtype=np.float64) * annual_utilization_rate / 100,
+                                      network_difficulty, 1)
+    with np.errstate(divide='ignore'):
+        return -math.log(1 - probability) / blocks_per_day
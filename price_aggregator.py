@@ -0,0 +1,249 @@
+import json
+import os
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+import requests
+
+# 稳定币按1:1锚定美元处理，可在FXRates中覆盖
+STABLECOIN_PEGS = {'USDT': 'USD', 'USDC': 'USD', 'FDUSD': 'USD', 'DAI': 'USD'}
+
+DEFAULT_FX_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'fx_rates.json')
+
+
+def _parse_binance(data, quote):
+    return float(data['price'])
+
+
+def _parse_okx(data, quote):
+    return float(data['data'][0]['last'])
+
+
+def _parse_coingecko(data, quote):
+    return float(data['bitcoin'][quote.lower()])
+
+
+def _parse_kraken(data, quote):
+    # Kraken的交易对名称不固定（如XXBTZUSD），取第一个结果
+    ticker = next(iter(data['result'].values()))
+    return float(ticker['c'][0])
+
+
+# 价格来源配置：url中的{quote}替换为报价币种，quotes为该来源直接支持的报价币种（第一个为默认）
+PRICE_SOURCES = {
+    'binance': {
+        'url': "https://api.binance.com/api/v3/ticker/price?symbol=BTC{quote}",
+        'quotes': ['USDT', 'USDC', 'FDUSD', 'EUR', 'TRY', 'BRL', 'JPY'],
+        'parse': _parse_binance
+    },
+    'coingecko': {
+        'url': "https://api.coingecko.com/api/v3/simple/price?ids=bitcoin&vs_currencies={quote_lower}",
+        'quotes': ['USD', 'EUR', 'CNY', 'JPY', 'GBP', 'HKD', 'KRW', 'AUD', 'CAD', 'CHF', 'SGD'],
+        'parse': _parse_coingecko
+    },
+    'okx': {
+        'url': "https://www.okx.com/api/v5/market/ticker?instId=BTC-{quote}",
+        'quotes': ['USDT', 'USDC', 'EUR'],
+        'parse': _parse_okx
+    },
+    'kraken': {
+        'url': "https://api.kraken.com/0/public/Ticker?pair=XBT{quote}",
+        'quotes': ['USD', 'EUR', 'GBP', 'CAD', 'JPY', 'CHF', 'AUD'],
+        'parse': _parse_kraken
+    }
+}
+
+
+class FXRates:
+    """
+    法币汇率，以美元为基准，缓存到本地文件，过期后重新获取
+    """
+
+    def __init__(self, cache_path=DEFAULT_FX_CACHE_PATH, ttl_seconds=12 * 3600,
+                 api_url="https://open.er-api.com/v6/latest/USD", pegs=None, timeout=10):
+        self.cache_path = cache_path
+        self.ttl_seconds = ttl_seconds
+        self.api_url = api_url
+        self.pegs = dict(STABLECOIN_PEGS if pegs is None else pegs)
+        self.timeout = timeout
+        self._rates = None
+        self._fetched_at = None
+        self._lock = threading.Lock()
+
+    def _load_cache(self):
+        try:
+            with open(self.cache_path, encoding='utf-8') as f:
+                cached = json.load(f)
+            return cached['rates'], float(cached['fetched_at'])
+        except (OSError, ValueError, KeyError):
+            return None, None
+
+    def _save_cache(self):
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            with open(self.cache_path, 'w', encoding='utf-8') as f:
+                json.dump({'rates': self._rates, 'fetched_at': self._fetched_at}, f)
+        except OSError as e:
+            print(f"汇率缓存写入失败: {e}")
+
+    def get_rates(self):
+        """
+        获取每1美元可兑换的各币种数量
+        :return: 币种到汇率的字典，无法获取时返回None
+        """
+        with self._lock:
+            if self._rates is None:
+                self._rates, self._fetched_at = self._load_cache()
+            if self._rates is not None and time.time() - self._fetched_at <= self.ttl_seconds:
+                return self._rates
+            try:
+                response = requests.get(self.api_url, timeout=self.timeout)
+                if response.status_code == 200:
+                    data = response.json()
+                    self._rates = {k.upper(): float(v) for k, v in data['rates'].items()}
+                    self._rates['USD'] = 1.0
+                    self._fetched_at = time.time()
+                    self._save_cache()
+                else:
+                    print(f"汇率API状态码: {response.status_code}")
+            except Exception as e:
+                print(f"获取汇率时出错: {e}")
+            # 获取失败时继续使用过期的缓存
+            return self._rates
+
+    def convert(self, amount, from_currency, to_currency):
+        """
+        币种换算，稳定币按锚定币种处理
+        :return: 换算后的金额，缺少汇率时返回None
+        """
+        source = self.pegs.get(from_currency.upper(), from_currency.upper())
+        target = self.pegs.get(to_currency.upper(), to_currency.upper())
+        if source == target:
+            return amount
+        rates = self.get_rates()
+        if not rates or source not in rates or target not in rates:
+            return None
+        return amount / rates[source] * rates[target]
+
+
+@dataclass(slots=True)
+class PriceQuote:
+    source: str
+    quote_currency: str
+    raw_price: float
+    price: float
+    weight: float
+    accepted: bool = True
+
+
+@dataclass(slots=True)
+class AggregatedPrice:
+    """
+    聚合后的BTC价格
+    """
+    price: float
+    currency: str
+    median: float
+    quotes: list = field(default_factory=list)
+
+    @property
+    def accepted_sources(self):
+        return [q.source for q in self.quotes if q.accepted]
+
+    @property
+    def rejected_sources(self):
+        return [q.source for q in self.quotes if not q.accepted]
+
+
+def reject_outliers(prices, threshold=3.0, min_tolerance=0.001):
+    """
+    基于中位数绝对偏差（MAD）剔除异常报价
+    :param prices: 报价列表
+    :param threshold: 偏离中位数超过threshold倍标准化MAD视为异常
+    :param min_tolerance: 最小容忍的相对偏差，避免报价高度一致时MAD接近0而误剔除
+    :return: (中位数, 与prices对应的是否保留列表)
+    """
+    median = statistics.median(prices)
+    if len(prices) < 3:
+        return median, [True] * len(prices)
+    mad = statistics.median(abs(p - median) for p in prices)
+    # 1.4826使MAD在正态分布下与标准差一致
+    limit = max(threshold * 1.4826 * mad, min_tolerance * abs(median))
+    return median, [abs(p - median) <= limit for p in prices]
+
+
+class PriceAggregator:
+    """
+    并行向所有配置的来源请求BTC价格，换算到目标币种后剔除异常值，按来源权重加权平均
+    """
+
+    def __init__(self, sources=None, weights=None, fx_rates=None, timeout=10, threshold=3.0, min_tolerance=0.001):
+        """
+        :param sources: 使用的来源名称列表，为None时使用PRICE_SOURCES中的全部来源
+        :param weights: 来源权重，如{'binance': 2.0}，未配置的来源权重为1.0，权重为0表示只参与异常判断
+        :param fx_rates: FXRates实例，为None时新建
+        :param timeout: 单个请求的超时时间（秒）
+        :param threshold: 异常值判定的MAD倍数
+        :param min_tolerance: 最小容忍的相对偏差
+        """
+        self.sources = list(PRICE_SOURCES) if sources is None else list(sources)
+        unknown = [name for name in self.sources if name not in PRICE_SOURCES]
+        if unknown:
+            raise KeyError(f"未知的价格来源: {', '.join(unknown)}")
+        self.weights = dict(weights or {})
+        self.fx_rates = fx_rates or FXRates()
+        self.timeout = timeout
+        self.threshold = threshold
+        self.min_tolerance = min_tolerance
+
+    def _fetch(self, name, currency):
+        config = PRICE_SOURCES[name]
+        quote = currency if currency in config['quotes'] else config['quotes'][0]
+        url = config['url'].format(quote=quote, quote_lower=quote.lower())
+        try:
+            response = requests.get(url, timeout=self.timeout)
+            if response.status_code != 200:
+                print(f"{name} API状态码: {response.status_code}")
+                return None
+            return quote, config['parse'](response.json(), quote)
+        except Exception as e:
+            print(f"{name} API错误: {e}")
+            return None
+
+    def get_price(self, currency='USD'):
+        """
+        获取聚合后的BTC价格
+        :param currency: 目标报价币种，如USD、EUR、CNY、USDT
+        :return: AggregatedPrice，所有来源均失败时返回None
+        """
+        currency = currency.upper()
+        with ThreadPoolExecutor(max_workers=max(len(self.sources), 1)) as pool:
+            fetched = list(pool.map(lambda name: self._fetch(name, currency), self.sources))
+
+        quotes = []
+        for name, item in zip(self.sources, fetched):
+            if item is None:
+                continue
+            quote_currency, raw_price = item
+            price = self.fx_rates.convert(raw_price, quote_currency, currency)
+            if price is None:
+                print(f"缺少{quote_currency}到{currency}的汇率，忽略{name}的报价")
+                continue
+            quotes.append(PriceQuote(name, quote_currency, raw_price, price, float(self.weights.get(name, 1.0))))
+        if not quotes:
+            print("所有价格来源都失败了")
+            return None
+
+        median, keep = reject_outliers([q.price for q in quotes], self.threshold, self.min_tolerance)
+        for quote, accepted in zip(quotes, keep):
+            quote.accepted = accepted
+        accepted = [q for q in quotes if q.accepted]
+        total_weight = sum(q.weight for q in accepted)
+        if total_weight > 0:
+            price = sum(q.price * q.weight for q in accepted) / total_weight
+        else:
+            price = statistics.median(q.price for q in accepted)
+        return AggregatedPrice(price=price, currency=currency, median=median, quotes=quotes)
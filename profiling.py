@@ -0,0 +1,196 @@
+import contextlib
+import contextvars
+import cProfile
+import functools
+import io
+import json
+import os
+import pstats
+import threading
+import time
+
+# 设置该环境变量即开启性能分析：trace只记录各阶段耗时（Chrome trace），pstats同时启用cProfile，
+# 其他非空值（如1）两者都输出
+PROFILE_ENV_VAR = 'BTC_CALC_PROFILE'
+PROFILE_DIR_ENV_VAR = 'BTC_CALC_PROFILE_DIR'
+DEFAULT_PROFILE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.profiles')
+
+_active = contextvars.ContextVar('btc_calc_profiler', default=None)
+
+
+def profile_mode_from_env():
+    """
+    :return: 环境变量指定的模式（trace、pstats或both），未开启时返回None
+    """
+    value = os.environ.get(PROFILE_ENV_VAR, '').strip().lower()
+    if value in ('', '0', 'false', 'off'):
+        return None
+    return value if value in ('trace', 'pstats') else 'both'
+
+
+class Profiler:
+    """
+    记录各阶段的耗时区间，可导出为Chrome trace JSON（chrome://tracing或Perfetto打开，按嵌套显示为火焰图），
+    mode为pstats或both时同时用cProfile记录函数级耗时
+    """
+
+    def __init__(self, mode='both'):
+        self.mode = mode
+        self.events = []
+        self._origin_ns = time.perf_counter_ns()
+        self._wall_start = time.time()
+        self._profile = cProfile.Profile() if mode in ('pstats', 'both') else None
+        self._lock = threading.Lock()
+        self._phase = None
+
+    @contextlib.contextmanager
+    def span(self, name, **args):
+        """
+        记录一个阶段，可嵌套
+        :param name: 阶段名称
+        :param args: 附加信息，写入trace事件的args
+        """
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            end = time.perf_counter_ns()
+            event = {
+                'name': name,
+                'ph': 'X',
+                'ts': (start - self._origin_ns) / 1000,
+                'dur': (end - start) / 1000,
+                'pid': os.getpid(),
+                'tid': threading.get_ident(),
+                'args': args
+            }
+            with self._lock:
+                self.events.append(event)
+
+    def start(self):
+        """
+        在当前线程（上下文）中启用该分析器，之后模块级的span、phase和profiled都记录到这里
+        """
+        previous = _active.get()
+        if previous is not None and previous is not self:
+            # 上一次运行被中断（如页面rerun）而没有stop时，先结束它
+            previous.stop()
+        _active.set(self)
+        if self._profile is not None:
+            self._profile.enable()
+        return self
+
+    def stop(self):
+        self.end_phase()
+        if self._profile is not None:
+            self._profile.disable()
+        if _active.get() is self:
+            _active.set(None)
+
+    @contextlib.contextmanager
+    def activate(self):
+        self.start()
+        try:
+            yield self
+        finally:
+            self.stop()
+
+    def phase(self, name):
+        """
+        开始一个顺序阶段并结束上一个阶段，适合按顺序执行、不便用with包裹的页面代码
+        """
+        self.end_phase()
+        self._phase = self.span(name)
+        self._phase.__enter__()
+
+    def end_phase(self):
+        if self._phase is not None:
+            phase, self._phase = self._phase, None
+            phase.__exit__(None, None, None)
+
+    def summary(self):
+        """
+        按阶段汇总耗时
+        :return: [(阶段名称, 次数, 总耗时毫秒)]，按总耗时降序
+        """
+        totals = {}
+        for event in self.events:
+            count, total = totals.get(event['name'], (0, 0.0))
+            totals[event['name']] = (count + 1, total + event['dur'] / 1000)
+        return sorted(((name, count, total) for name, (count, total) in totals.items()),
+                      key=lambda item: item[2], reverse=True)
+
+    def to_chrome_trace(self):
+        return {'traceEvents': list(self.events), 'displayTimeUnit': 'ms',
+                'otherData': {'start_time': self._wall_start}}
+
+    def pstats_text(self, limit=30):
+        """
+        cProfile结果按累计耗时排序的文本，未启用cProfile时返回None
+        """
+        if self._profile is None:
+            return None
+        stream = io.StringIO()
+        pstats.Stats(self._profile, stream=stream).sort_stats('cumulative').print_stats(limit)
+        return stream.getvalue()
+
+    def dump(self, directory=None, prefix='profile'):
+        """
+        写出分析结果
+        :param directory: 输出目录，为None时使用环境变量BTC_CALC_PROFILE_DIR或.profiles
+        :param prefix: 文件名前缀，实际文件名追加时间戳
+        :return: 写出的文件路径列表
+        """
+        directory = directory or os.environ.get(PROFILE_DIR_ENV_VAR) or DEFAULT_PROFILE_DIR
+        os.makedirs(directory, exist_ok=True)
+        stem = os.path.join(directory, f"{prefix}-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}")
+        paths = []
+        with open(f"{stem}.trace.json", 'w', encoding='utf-8') as f:
+            json.dump(self.to_chrome_trace(), f)
+        paths.append(f"{stem}.trace.json")
+        if self._profile is not None:
+            self._profile.dump_stats(f"{stem}.pstats")
+            paths.append(f"{stem}.pstats")
+        return paths
+
+
+def get_profiler():
+    """
+    :return: 当前上下文中启用的Profiler，未启用时返回None
+    """
+    return _active.get()
+
+
+def span(name, **args):
+    """
+    在当前启用的分析器中记录一个阶段，未启用时不做任何事
+    """
+    profiler = _active.get()
+    if profiler is None:
+        return contextlib.nullcontext()
+    return profiler.span(name, **args)
+
+
+def phase(name):
+    """
+    在当前启用的分析器中开始一个顺序阶段（见Profiler.phase），未启用时不做任何事
+    """
+    profiler = _active.get()
+    if profiler is not None:
+        profiler.phase(name)
+
+
+def profiled(name):
+    """
+    装饰器，函数每次调用记录为一个阶段
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            profiler = _active.get()
+            if profiler is None:
+                return func(*args, **kwargs)
+            with profiler.span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,255 @@
+import json
+import os
+
+import numpy as np
+
+from miner_catalog import get_catalog_arrays, get_fixed_costs
+
+INDEX_FILE = 'index.json'
+
+# 默认写入的结果字段，其余字段可通过fields参数指定（见btc_mining_calculator.RESULT_FIELDS）
+DEFAULT_FIELDS = ['daily_revenue_usd', 'daily_total_cost_usd', 'daily_profit_usd', 'roi_days', 'annual_profit_usd']
+
+DEFAULT_CHUNK_SIZE = 1_000_000
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.ipc
+    except ImportError:
+        raise RuntimeError("Arrow格式需要安装pyarrow: pip install pyarrow")
+    return pyarrow
+
+
+class SweepStore:
+    """
+    网格扫描结果的磁盘存储
+
+    目录结构：index.json记录各轴的名称和取值、字段列表和格式；
+    npy格式每个字段一个扁平的.npy文件（按轴的C顺序展开），以内存映射方式分块写入和零拷贝读取；
+    arrow格式为单个Arrow IPC文件，每块一个RecordBatch，包含轴坐标列和字段列。
+    """
+
+    def __init__(self, path, axes, fields, fmt, mode):
+        self.path = path
+        self.axes = axes
+        self.fields = list(fields)
+        self.format = fmt
+        self.mode = mode
+        self.shape = tuple(len(values) for values in axes.values())
+        self.size = int(np.prod(self.shape)) if self.shape else 1
+        self._arrays = {}
+        self._arrow_sink = None
+        self._arrow_writer = None
+        self._arrow_table = None
+        self.rows_written = 0
+
+    @classmethod
+    def create(cls, path, axes, fields=None, fmt='npy'):
+        """
+        创建存储
+        :param path: 存储目录
+        :param axes: 有序字典，轴名称到取值列表，如{'model': [...], 'electricity_cost_kwh': [...]}
+        :param fields: 结果字段列表，为None时使用DEFAULT_FIELDS
+        :param fmt: npy或arrow
+        """
+        if fmt not in ('npy', 'arrow'):
+            raise ValueError(f"不支持的存储格式: {fmt}")
+        axes = {name: [v.item() if isinstance(v, np.generic) else v for v in values] for name, values in axes.items()}
+        fields = list(fields or DEFAULT_FIELDS)
+        os.makedirs(path, exist_ok=True)
+        store = cls(path, axes, fields, fmt, 'w')
+        index = {
+            'format': fmt,
+            'dtype': 'float64',
+            'axes': [{'name': name, 'values': values} for name, values in axes.items()],
+            'shape': list(store.shape),
+            'fields': fields
+        }
+        with open(os.path.join(path, INDEX_FILE), 'w', encoding='utf-8') as f:
+            json.dump(index, f, ensure_ascii=False, indent=2)
+        if fmt == 'npy':
+            for field in fields:
+                store._arrays[field] = np.lib.format.open_memmap(
+                    os.path.join(path, f"{field}.npy"), mode='w+', dtype=np.float64, shape=(store.size,))
+        return store
+
+    @classmethod
+    def open(cls, path):
+        """
+        以只读方式打开存储，数据通过内存映射按需读取
+        """
+        with open(os.path.join(path, INDEX_FILE), encoding='utf-8') as f:
+            index = json.load(f)
+        axes = {axis['name']: axis['values'] for axis in index['axes']}
+        store = cls(path, axes, index['fields'], index['format'], 'r')
+        if store.format == 'npy':
+            for field in store.fields:
+                store._arrays[field] = np.load(os.path.join(path, f"{field}.npy"), mmap_mode='r')
+        else:
+            pa = _require_pyarrow()
+            source = pa.memory_map(os.path.join(path, 'results.arrow'), 'r')
+            store._arrow_table = pa.ipc.open_file(source).read_all()
+        return store
+
+    def grid_coordinates(self, start, stop):
+        """
+        扁平下标[start, stop)对应的各轴坐标
+        :return: 轴名称到坐标数组的字典
+        """
+        flat = np.arange(start, stop)
+        indices = np.unravel_index(flat, self.shape) if self.shape else ()
+        coordinates = {}
+        for (name, values), index in zip(self.axes.items(), indices):
+            coordinates[name] = np.asarray(values)[index]
+        return coordinates
+
+    def iter_chunks(self, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        按扁平下标分块，产出(start, stop, 坐标字典)
+        """
+        for start in range(0, self.size, chunk_size):
+            stop = min(start + chunk_size, self.size)
+            yield start, stop, self.grid_coordinates(start, stop)
+
+    def write(self, start, stop, results):
+        """
+        写入扁平下标[start, stop)的结果；arrow格式要求按顺序写入
+        :param results: 字段名到数组的字典，需包含全部字段
+        """
+        if self.mode != 'w':
+            raise RuntimeError("存储以只读方式打开")
+        if self.format == 'npy':
+            for field in self.fields:
+                self._arrays[field][start:stop] = results[field]
+        else:
+            if start != self.rows_written:
+                raise ValueError("arrow格式只能按顺序写入")
+            pa = _require_pyarrow()
+            columns = {name: values for name, values in self.grid_coordinates(start, stop).items()}
+            columns.update({field: np.asarray(results[field], dtype=np.float64) for field in self.fields})
+            batch = pa.RecordBatch.from_pydict(columns)
+            if self._arrow_writer is None:
+                self._arrow_sink = pa.OSFile(os.path.join(self.path, 'results.arrow'), 'wb')
+                self._arrow_writer = pa.ipc.new_file(self._arrow_sink, batch.schema)
+            self._arrow_writer.write_batch(batch)
+        self.rows_written = max(self.rows_written, stop)
+
+    def close(self):
+        if self.mode == 'w':
+            for array in self._arrays.values():
+                array.flush()
+            self._arrays = {}
+        if self._arrow_writer is not None:
+            self._arrow_writer.close()
+            self._arrow_sink.close()
+            self._arrow_writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __getitem__(self, field):
+        """
+        读取字段，按轴形状排列。npy格式返回只读内存映射数组（零拷贝）；arrow格式只有一个RecordBatch时零拷贝，
+        多个RecordBatch（结果行数超过写入时的chunk_size）时需拼接，会把整个字段复制到内存，
+        大规模扫描请使用npy格式，或用iter_field_chunks逐块零拷贝读取
+        """
+        if field not in self.fields:
+            raise KeyError(f"未知的字段: {field}")
+        if self.format == 'npy':
+            return self._arrays[field].reshape(self.shape)
+        column = self._arrow_table.column(field)
+        if column.num_chunks == 1:
+            return column.chunk(0).to_numpy(zero_copy_only=True).reshape(self.shape)
+        return column.to_numpy().reshape(self.shape)
+
+    def iter_field_chunks(self, field):
+        """
+        逐块零拷贝读取字段，arrow格式每个RecordBatch一块，npy格式整个字段一块
+        :return: 产出(start, stop, 扁平数组)的生成器，数组为内存映射的只读视图
+        """
+        if field not in self.fields:
+            raise KeyError(f"未知的字段: {field}")
+        if self.format == 'npy':
+            yield 0, self.size, self._arrays[field]
+            return
+        start = 0
+        for chunk in self._arrow_table.column(field).chunks:
+            values = chunk.to_numpy(zero_copy_only=True)
+            yield start, start + len(values), values
+            start += len(values)
+
+    def axis_index(self, name, value):
+        """
+        查询某轴上取值的下标
+        """
+        return list(self.axes[name]).index(value)
+
+    def select(self, field, **axis_values):
+        """
+        按轴取值切片，如store.select('daily_profit_usd', model='Antminer S21 pro')
+        """
+        index = tuple(
+            self.axis_index(name, axis_values[name]) if name in axis_values else slice(None)
+            for name in self.axes
+        )
+        return self[field][index]
+
+
+def expand_sweep_params(coordinates, fixed, model_columns=None):
+    """
+    将坐标和固定参数组合成calculate_roi_batch的参数，model轴展开为矿机参数，
+    maintenance_percent/depreciation_percent按页面的方式换算为年度金额
+    :param coordinates: 轴名称到坐标数组的字典
+    :param fixed: 固定参数
+    :param model_columns: 已展开的矿机参数数组（见get_catalog_arrays），此时model坐标为其中的下标
+    """
+    params = dict(fixed)
+    params.update(coordinates)
+    efficiency = None
+    if 'model' in params:
+        models = params.pop('model')
+        if model_columns is None:
+            unique_names, models = np.unique(models, return_inverse=True)
+            _, model_columns = get_catalog_arrays(unique_names.tolist())
+        models = np.asarray(models, dtype=np.int64)
+        params['hashrate_th'] = model_columns['hashrate'][models]
+        params['power_watts'] = model_columns['power'][models]
+        params['hardware_cost'] = model_columns['cost'][models]
+        efficiency = model_columns['efficiency'][models]
+    maintenance_percent = params.pop('maintenance_percent', None)
+    depreciation_percent = params.pop('depreciation_percent', None)
+    maintenance, depreciation = get_fixed_costs(params['hardware_cost'], maintenance_percent, depreciation_percent,
+                                                efficiency)
+    if maintenance is not None:
+        params['maintenance_cost_yearly'] = maintenance
+    if depreciation is not None:
+        params['hardware_depreciation_yearly'] = depreciation
+    return params
+
+
+def run_grid_sweep(calculator, path, axes, snapshot, fields=None, fmt='npy', chunk_size=DEFAULT_CHUNK_SIZE,
+                   **fixed):
+    """
+    对参数网格做批量计算，结果逐块直接写入磁盘，内存占用只与chunk_size有关
+    :param calculator: BTCMiningCalculator实例
+    :param path: 存储目录
+    :param axes: 轴名称到取值列表的有序字典；轴名称为calculate_roi_batch的参数名，
+                 或model（矿机型号）、maintenance_percent、depreciation_percent
+    :param snapshot: 市场数据快照
+    :param fields: 写入的结果字段
+    :param fmt: npy或arrow
+    :param chunk_size: 每块的网格点数
+    :param fixed: 不参与扫描的固定参数
+    :return: 只读打开的SweepStore
+    """
+    with SweepStore.create(path, axes, fields, fmt) as store:
+        for start, stop, coordinates in store.iter_chunks(chunk_size):
+            params = expand_sweep_params(coordinates, fixed)
+            result = calculator.calculate_roi_batch(snapshot=snapshot, **params)
+            store.write(start, stop, result)
+    return SweepStore.open(path)
@@ -0,0 +1,368 @@
+import argparse
+import io
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+import numpy as np
+import pandas as pd
+
+from batch_cli import chunk_to_params, evaluate_chunk, load_snapshot, to_json_lines
+from btc_mining_calculator import BTCMiningCalculator
+from miner_catalog import get_catalog_arrays, get_fixed_costs
+
+# 每批计算的行数，请求体按行流式读取，每满一批计算并输出一次
+DEFAULT_BATCH_SIZE = 10_000
+
+# 排名时按升序排列的指标，其余指标按降序
+ASCENDING_METRICS = {'roi_days', 'daily_total_cost_usd', 'daily_power_cost_usd'}
+
+
+class MarketSnapshotHolder:
+    """
+    在多个请求间共享的市场数据快照
+
+    过期后只由一个线程刷新，外部API的请求不持有锁：已有旧快照时在后台刷新，其余请求直接使用旧快照；
+    还没有快照时，并发请求等待同一次获取。刷新失败后按指数退避，退避期间不再重试。
+    """
+
+    def __init__(self, calculator, ttl_seconds=300, snapshot=None, retry_backoff_seconds=5.0,
+                 max_retry_backoff_seconds=300.0):
+        """
+        :param calculator: BTCMiningCalculator实例
+        :param ttl_seconds: 快照的有效期（秒），为None时永不过期
+        :param snapshot: 初始快照
+        :param retry_backoff_seconds: 首次刷新失败后的重试间隔（秒），之后每次失败加倍
+        :param max_retry_backoff_seconds: 重试间隔的上限（秒）
+        """
+        self.calculator = calculator
+        self.ttl_seconds = ttl_seconds
+        self.retry_backoff_seconds = retry_backoff_seconds
+        self.max_retry_backoff_seconds = max_retry_backoff_seconds
+        self._snapshot = snapshot
+        self._fetched_at = time.monotonic() if snapshot is not None else None
+        self._retry_at = None
+        self._failures = 0
+        self._refreshing = False
+        self._condition = threading.Condition()
+
+    def _needs_refresh(self, now):
+        if self._retry_at is not None and now < self._retry_at:
+            return False
+        if self._fetched_at is None:
+            return True
+        return self.ttl_seconds is not None and now - self._fetched_at > self.ttl_seconds
+
+    def get(self):
+        """
+        获取当前快照，过期时刷新；刷新期间或刷新失败时继续使用旧快照
+        :return: 市场数据快照，从未成功获取时返回None
+        """
+        with self._condition:
+            if self._refreshing or not self._needs_refresh(time.monotonic()):
+                # 没有旧快照可用时等待正在进行的获取
+                while self._refreshing and self._snapshot is None:
+                    self._condition.wait()
+                return self._snapshot
+            self._refreshing = True
+            stale = self._snapshot
+
+        if stale is not None:
+            threading.Thread(target=self._refresh, daemon=True).start()
+            return stale
+        self._refresh()
+        with self._condition:
+            return self._snapshot
+
+    def _refresh(self):
+        snapshot = None
+        try:
+            snapshot = self.calculator.get_market_snapshot()
+        finally:
+            with self._condition:
+                now = time.monotonic()
+                if snapshot is not None:
+                    self._snapshot = snapshot
+                    self._fetched_at = now
+                    self._retry_at = None
+                    self._failures = 0
+                else:
+                    self._failures += 1
+                    self._retry_at = now + min(self.retry_backoff_seconds * 2 ** (self._failures - 1),
+                                               self.max_retry_backoff_seconds)
+                self._refreshing = False
+                self._condition.notify_all()
+
+
+def rank_catalog(calculator, snapshot, electricity_cost_kwh, pool_fee_percent=2.0, maintenance_percent=6.0,
+                 depreciation_percent=20.0, annual_utilization_rate=100.0, block_reward=None,
+                 metric='daily_profit_usd', models=None, top=None):
+    """
+    按指定指标对矿机型号排名，维护成本与折旧的计算方式与页面一致
+    :param calculator: BTCMiningCalculator实例
+    :param snapshot: 市场数据快照
+    :param electricity_cost_kwh: 每千瓦时电费（美元）
+    :param pool_fee_percent: 矿池手续费百分比
+    :param maintenance_percent: 基础维护成本比例（%），按效率系数调整
+    :param depreciation_percent: 年度硬件折旧比例（%）
+    :param annual_utilization_rate: 年利用率（%）
+    :param block_reward: 区块奖励（BTC）
+    :param metric: 排名依据的结果字段
+    :param models: 参与排名的矿机型号列表，为None时使用全部型号
+    :param top: 只返回前N名
+    :return: 按名次排列的字典列表
+    """
+    names, columns = get_catalog_arrays(models)
+    maintenance, depreciation = get_fixed_costs(columns['cost'], maintenance_percent, depreciation_percent,
+                                                columns['efficiency'])
+    result = calculator.calculate_roi_batch(
+        columns['hashrate'], columns['power'], electricity_cost_kwh, columns['cost'],
+        pool_fee_percent=pool_fee_percent,
+        maintenance_cost_yearly=maintenance,
+        hardware_depreciation_yearly=depreciation,
+        block_reward=block_reward,
+        annual_utilization_rate=annual_utilization_rate,
+        snapshot=snapshot
+    )
+    if metric not in result:
+        raise ValueError(f"未知的排名指标: {metric}")
+    values = result[metric]
+    order = np.argsort(values if metric in ASCENDING_METRICS else -values, kind='stable')
+    if top is not None:
+        order = order[:top]
+    ranking = []
+    for rank, i in enumerate(order, start=1):
+        row = {'rank': rank, 'model': names[i], 'hashrate_th': columns['hashrate'][i],
+               'power_watts': columns['power'][i], 'hardware_cost': columns['cost'][i]}
+        row.update({key: float(value[i]) for key, value in result.items()})
+        ranking.append(row)
+    return ranking
+
+
+def _json_default(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"无法序列化的类型: {type(value)}")
+
+
+def _dumps(record):
+    # 无法回本时roi_days为inf，JSON中以null表示
+    clean = {k: (None if isinstance(v, float) and not np.isfinite(v) else v) for k, v in record.items()}
+    return json.dumps(clean, ensure_ascii=False, default=_json_default)
+
+
+def _failing_line(batch, line_nos):
+    """
+    定位出错批次中第一个无法解析的行
+    :param batch: 出错批次的各行
+    :param line_nos: 各行在请求体中的行号
+    :return: 第一个无法解析为JSON对象的行号；各行都能解析时（如缺少必需列）返回批次第一行的行号
+    """
+    for line, line_no in zip(batch, line_nos):
+        try:
+            if not isinstance(json.loads(line), dict):
+                return line_no
+        except ValueError:
+            return line_no
+    return line_nos[0] if line_nos else None
+
+
+class ROIRequestHandler(BaseHTTPRequestHandler):
+    """
+    POST /roi         NDJSON场景 -> NDJSON计算结果
+    POST /break-even  NDJSON场景 -> NDJSON盈亏平衡电价
+    POST /rank        JSON参数   -> NDJSON矿机排名
+    GET  /snapshot    当前使用的市场数据快照
+
+    /roi和/break-even出错时，已输出的批次结果保留，最后一行为{"error": ..., "line": 行号}，
+    行号为出错批次中第一个无法解析的行，整批校验失败（如缺少必需列）时为该批次的第一行。
+    """
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+    def do_GET(self):
+        if urlparse(self.path).path != '/snapshot':
+            self._send_json(404, {'error': 'not found'})
+            return
+        snapshot = self.server.snapshot_holder.get()
+        if snapshot is None:
+            self._send_json(503, {'error': '无法获取市场数据'})
+        else:
+            self._send_json(200, snapshot)
+
+    def do_POST(self):
+        path = urlparse(self.path).path
+        if path not in ('/roi', '/break-even', '/rank'):
+            # 读完请求体，否则keep-alive连接上剩余的请求体会被当作下一个请求解析
+            self._discard_body()
+            self._send_json(404, {'error': 'not found'})
+            return
+        snapshot = self.server.snapshot_holder.get()
+        if snapshot is None:
+            self._discard_body()
+            self._send_json(503, {'error': '无法获取市场数据'})
+            return
+
+        if path == '/rank':
+            try:
+                params = json.loads(b''.join(self._iter_body_lines()) or b'{}')
+                ranking = rank_catalog(self.server.calculator, snapshot, **params)
+            except (ValueError, KeyError, TypeError) as e:
+                self._send_json(400, {'error': str(e)})
+                return
+            self._start_stream()
+            self._write_chunk(''.join(_dumps(row) + '\n' for row in ranking).encode('utf-8'))
+            self._end_stream()
+            return
+
+        self._start_stream()
+        lines = self._iter_body_lines()
+        batch = []
+        batch_line_nos = []
+        line_no = 0
+        try:
+            for line in lines:
+                line_no += 1
+                if not line.strip():
+                    continue
+                batch.append(line if line.endswith(b'\n') else line + b'\n')
+                batch_line_nos.append(line_no)
+                if len(batch) >= self.server.batch_size:
+                    self._write_chunk(self._evaluate(path, batch, snapshot))
+                    batch = []
+                    batch_line_nos = []
+            if batch:
+                self._write_chunk(self._evaluate(path, batch, snapshot))
+        except (ValueError, KeyError, TypeError) as e:
+            # 响应头已发出，错误以最后一行的形式返回；继续读完请求体，避免剩余内容被当作下一个请求
+            self._write_chunk((_dumps({'error': str(e), 'line': _failing_line(batch, batch_line_nos)}) + '\n')
+                              .encode('utf-8'))
+            for _ in lines:
+                pass
+        self._end_stream()
+
+    def _evaluate(self, path, lines, snapshot):
+        calculator = self.server.calculator
+        # 整批交给pandas的C解析器，比逐行json.loads快得多
+        chunk = pd.read_json(io.BytesIO(b''.join(lines)), lines=True)
+        if path == '/roi':
+            output = evaluate_chunk(calculator, chunk, snapshot)
+            return to_json_lines(output).encode('utf-8')
+        # 盈亏平衡电价与电费和硬件成本无关，这两列可以省略
+        params = chunk_to_params(calculator, chunk.assign(
+            **{c: 0.0 for c in ('electricity_cost_kwh', 'hardware_cost') if c not in chunk.columns}))
+        params.pop('electricity_cost_kwh')
+        params.pop('hardware_cost')
+        break_even = calculator.calculate_break_even_batch(snapshot=snapshot, **params)
+        output = chunk.reset_index(drop=True)
+        output['break_even_electricity_cost_kwh'] = break_even
+        return to_json_lines(output).encode('utf-8')
+
+    def _iter_body_lines(self):
+        """
+        按行读取请求体，支持Content-Length和chunked两种传输方式
+        """
+        if self.headers.get('Transfer-Encoding', '').lower() == 'chunked':
+            pending = b''
+            while True:
+                size = int(self.rfile.readline().split(b';')[0].strip(), 16)
+                if size == 0:
+                    # 读取可能存在的trailer直到空行
+                    while self.rfile.readline().strip():
+                        pass
+                    break
+                pending += self.rfile.read(size)
+                self.rfile.readline()
+                *lines, pending = pending.split(b'\n')
+                for line in lines:
+                    yield line
+            if pending:
+                yield pending
+            return
+
+        remaining = int(self.headers.get('Content-Length') or 0)
+        while remaining > 0:
+            line = self.rfile.readline(min(remaining, 1 << 20))
+            if not line:
+                break
+            remaining -= len(line)
+            yield line
+
+    def _discard_body(self):
+        for _ in self._iter_body_lines():
+            pass
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False, default=_json_default).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _start_stream(self):
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/x-ndjson; charset=utf-8')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+
+    def _write_chunk(self, data):
+        if data:
+            self.wfile.write(f"{len(data):X}\r\n".encode('ascii') + data + b"\r\n")
+            self.wfile.flush()
+
+    def _end_stream(self):
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+
+
+class ROIServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, calculator=None, snapshot=None, ttl_seconds=300,
+                 batch_size=DEFAULT_BATCH_SIZE, quiet=False):
+        super().__init__(address, ROIRequestHandler)
+        self.calculator = calculator or BTCMiningCalculator()
+        self.snapshot_holder = MarketSnapshotHolder(self.calculator, ttl_seconds, snapshot)
+        self.batch_size = batch_size
+        self.quiet = quiet
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="比特币挖矿收益HTTP服务（NDJSON流式输出）")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--snapshot', help="使用指定的市场快照JSON文件，不再实时获取")
+    parser.add_argument('--ttl', type=float, default=300, help="市场数据快照的有效期（秒）")
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help="每批计算的行数")
+    parser.add_argument('--quiet', action='store_true', help="不输出访问日志")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    snapshot = None
+    ttl = args.ttl
+    if args.snapshot:
+        snapshot = load_snapshot(args.snapshot)
+        ttl = None
+    server = ROIServer((args.host, args.port), snapshot=snapshot, ttl_seconds=ttl,
+                       batch_size=args.batch_size, quiet=args.quiet)
+    # 启动时预热快照，避免第一个请求等待外部API
+    server.snapshot_holder.get()
+    print(f"ROI服务已启动: http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
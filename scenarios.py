@@ -0,0 +1,184 @@
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from btc_mining_calculator import RESULT_FIELDS, record_to_result, results_to_records
+from miner_catalog import get_fixed_costs
+
+# 可在变体中修改的参数（calculate_roi的参数）及其显示名称
+SCENARIO_PARAMS = {
+    'hashrate_th': '算力 (TH/s)',
+    'power_watts': '功耗 (W)',
+    'electricity_cost_kwh': '电费 ($/kWh)',
+    'hardware_cost': '硬件成本 ($)',
+    'pool_fee_percent': '矿池手续费 (%)',
+    'maintenance_cost_yearly': '年度维护成本 ($)',
+    'hardware_depreciation_yearly': '年度折旧 ($)',
+    'block_reward': '区块奖励 (BTC)',
+    'annual_utilization_rate': '年利用率 (%)',
+    'maintenance_percent': '基础维护成本 (%)',
+    'depreciation_percent': '年度折旧 (%)'
+}
+
+# 按页面方式换算维护成本和折旧的参数，不直接传给calculate_roi；efficiency为矿机效率（W/TH），不作为变体参数显示
+FIXED_COST_PARAMS = ('maintenance_percent', 'depreciation_percent', 'efficiency')
+
+# 与calculate_roi一致的默认值，block_reward默认使用计算器的区块奖励
+SCENARIO_DEFAULTS = {
+    'pool_fee_percent': 2.0,
+    'maintenance_cost_yearly': 0.0,
+    'hardware_depreciation_yearly': 0.0,
+    'annual_utilization_rate': 100.0
+}
+
+# 比较时默认关注的结果字段
+DEFAULT_COMPARE_FIELDS = ('daily_revenue_usd', 'daily_total_cost_usd', 'daily_profit_usd', 'monthly_profit_usd',
+                          'annual_profit_usd', 'roi_days')
+
+
+@dataclass(slots=True)
+class ScenarioDiff:
+    """
+    基准场景与各变体的比较结果
+    """
+    baseline_params: dict
+    baseline: object
+    variant_params: dict = field(default_factory=dict)
+    variants: dict = field(default_factory=dict)
+    deltas: dict = field(default_factory=dict)
+    percent_changes: dict = field(default_factory=dict)
+
+    def to_rows(self, fields=DEFAULT_COMPARE_FIELDS):
+        """
+        展开为逐行记录，每个变体每个字段一行
+        :return: [{'variant', 'field', 'baseline', 'value', 'delta', 'percent_change'}]
+        """
+        rows = []
+        for name, result in self.variants.items():
+            for name_field in fields:
+                rows.append({
+                    'variant': name,
+                    'field': name_field,
+                    'baseline': getattr(self.baseline, name_field),
+                    'value': getattr(result, name_field),
+                    'delta': self.deltas[name][name_field],
+                    'percent_change': self.percent_changes[name][name_field]
+                })
+        return rows
+
+
+class ScenarioComparer:
+    """
+    基准场景和多个变体的比较：基准结果按参数和市场快照缓存，变体只指定与基准不同的参数，
+    全部变体在一次calculate_roi_batch中计算
+    """
+
+    def __init__(self, calculator, cache_size=32):
+        """
+        :param calculator: BTCMiningCalculator实例
+        :param cache_size: 缓存的基准场景数量
+        """
+        self.calculator = calculator
+        self.cache_size = cache_size
+        self._baselines = OrderedDict()
+        self.baseline_hits = 0
+        self.baseline_misses = 0
+
+    @staticmethod
+    def _check(params):
+        unknown = [name for name in params if name not in SCENARIO_PARAMS and name not in FIXED_COST_PARAMS]
+        if unknown:
+            raise KeyError(f"未知的场景参数: {', '.join(unknown)}")
+        return dict(params)
+
+    def _normalize(self, params):
+        # 补全默认值，使基准和各变体的参数集合一致
+        params = {**SCENARIO_DEFAULTS, **self._check(params)}
+        if params.get('block_reward') is None:
+            params['block_reward'] = self.calculator.block_reward
+        return params
+
+    @staticmethod
+    def _roi_params(params):
+        # 指定了比例时由（变体的）硬件成本换算年度维护成本和折旧，与页面一致
+        params = dict(params)
+        percents = [params.pop(name, None) for name in FIXED_COST_PARAMS]
+        maintenance, depreciation = get_fixed_costs(params['hardware_cost'], *percents)
+        if maintenance is not None:
+            params['maintenance_cost_yearly'] = float(maintenance)
+        if depreciation is not None:
+            params['hardware_depreciation_yearly'] = float(depreciation)
+        return params
+
+    def _evaluate(self, params_list, snapshot):
+        params_list = [self._roi_params(params) for params in params_list]
+        columns = {
+            name: np.array([params[name] for params in params_list], dtype=np.float64)
+            for name in params_list[0]
+        }
+        result = self.calculator.calculate_roi_batch(snapshot=snapshot, **columns)
+        return [record_to_result(record) for record in results_to_records(result)]
+
+    def baseline(self, params, snapshot):
+        """
+        计算（或从缓存读取）基准场景
+        :param params: calculate_roi的参数字典
+        :param snapshot: 市场数据快照
+        :return: ROIResult
+        """
+        params = self._normalize(params)
+        key = (tuple(sorted(params.items())), float(snapshot['btc_price']), float(snapshot['network_difficulty']))
+        if key in self._baselines:
+            self._baselines.move_to_end(key)
+            self.baseline_hits += 1
+            return self._baselines[key]
+        self.baseline_misses += 1
+        result = self._evaluate([params], snapshot)[0]
+        self._baselines[key] = result
+        if len(self._baselines) > self.cache_size:
+            self._baselines.popitem(last=False)
+        return result
+
+    def _variant(self, baseline_params, overrides):
+        params = {**baseline_params, **self._check(overrides)}
+        for amount, percent in (('maintenance_cost_yearly', 'maintenance_percent'),
+                                ('hardware_depreciation_yearly', 'depreciation_percent')):
+            if amount in overrides and percent not in overrides:
+                params.pop(percent, None)
+        return params
+
+    def compare(self, baseline_params, variants, snapshot=None):
+        """
+        比较基准场景与各变体
+        :param baseline_params: 基准场景的calculate_roi参数，必须包含hashrate_th、power_watts、
+                                electricity_cost_kwh和hardware_cost；指定maintenance_percent/depreciation_percent
+                                （及efficiency）时，基准和各变体的年度维护成本和折旧按各自的硬件成本换算，
+                                变体直接指定maintenance_cost_yearly/hardware_depreciation_yearly时以指定值为准
+        :param variants: 变体名称到参数修改的字典，如{'矿池费-0.5%': {'pool_fee_percent': 1.5}}
+        :param snapshot: 市场数据快照，为None时使用缓存数据获取
+        :return: ScenarioDiff；获取市场数据失败时返回None
+        """
+        if snapshot is None:
+            snapshot = self.calculator.get_market_snapshot(use_cache=True)
+            if snapshot is None:
+                return None
+        baseline_params = self._normalize(baseline_params)
+        baseline = self.baseline(baseline_params, snapshot)
+        diff = ScenarioDiff(baseline_params=baseline_params, baseline=baseline)
+        if not variants:
+            return diff
+
+        variant_params = {name: self._variant(baseline_params, overrides) for name, overrides in variants.items()}
+        results = self._evaluate(list(variant_params.values()), snapshot)
+        base_values = np.array([getattr(baseline, name) for name in RESULT_FIELDS])
+        for (name, params), result in zip(variant_params.items(), results):
+            values = np.array([getattr(result, name_field) for name_field in RESULT_FIELDS])
+            with np.errstate(invalid='ignore', divide='ignore'):
+                delta = values - base_values
+                percent = np.where(base_values != 0, delta / np.abs(base_values) * 100, np.nan)
+            diff.variant_params[name] = params
+            diff.variants[name] = result
+            diff.deltas[name] = dict(zip(RESULT_FIELDS, delta.tolist()))
+            diff.percent_changes[name] = dict(zip(RESULT_FIELDS, percent.tolist()))
+        return diff
@@ -0,0 +1,92 @@
+"""
+ROI服务压测脚本，默认在本机启动一个使用固定快照的服务并测量吞吐量
+
+python scripts/load_test_roi_service.py --rows 100000 --requests 20 --concurrency 4
+python scripts/load_test_roi_service.py --url http://127.0.0.1:8765   # 压测已启动的服务
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from roi_service import ROIServer  # noqa: E402
+
+SNAPSHOT = {'btc_price': 100000.0, 'network_difficulty': 1.2e14}
+
+
+def build_body(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    hashrate = rng.uniform(50, 600, rows)
+    power = rng.uniform(1500, 7500, rows)
+    price = rng.uniform(0.0, 0.12, rows)
+    cost = rng.uniform(500, 15000, rows)
+    lines = (
+        json.dumps({'hashrate_th': h, 'power_watts': p, 'electricity_cost_kwh': e, 'hardware_cost': c})
+        for h, p, e, c in zip(hashrate.tolist(), power.tolist(), price.tolist(), cost.tolist())
+    )
+    return ('\n'.join(lines) + '\n').encode('utf-8')
+
+
+def run_request(url, body):
+    start = time.perf_counter()
+    response = requests.post(url, data=body, stream=True, timeout=300)
+    response.raise_for_status()
+    first_byte = None
+    lines = 0
+    for line in response.iter_lines():
+        if first_byte is None:
+            first_byte = time.perf_counter() - start
+        if line:
+            lines += 1
+    return time.perf_counter() - start, first_byte or 0.0, lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ROI服务压测")
+    parser.add_argument('--url', help="已启动服务的地址，不指定时在本机启动临时服务")
+    parser.add_argument('--endpoint', default='/roi', choices=['/roi', '/break-even'])
+    parser.add_argument('--rows', type=int, default=50_000, help="每个请求的场景行数")
+    parser.add_argument('--requests', type=int, default=20, help="请求总数")
+    parser.add_argument('--concurrency', type=int, default=4, help="并发数")
+    args = parser.parse_args()
+
+    server = None
+    base_url = args.url
+    if base_url is None:
+        server = ROIServer(('127.0.0.1', 0), snapshot=dict(SNAPSHOT), ttl_seconds=None, quiet=True)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    body = build_body(args.rows)
+    url = base_url.rstrip('/') + args.endpoint
+    print(f"压测 {url}: {args.requests} 个请求 x {args.rows} 行, 并发 {args.concurrency}, "
+          f"请求体 {len(body) / 1e6:.1f} MB")
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        results = list(pool.map(lambda _: run_request(url, body), range(args.requests)))
+    elapsed = time.perf_counter() - start
+
+    latencies = np.array([r[0] for r in results])
+    first_bytes = np.array([r[1] for r in results])
+    total_rows = sum(r[2] for r in results)
+    print(f"总耗时: {elapsed:.2f} 秒")
+    print(f"吞吐量: {args.requests / elapsed:.2f} 请求/秒, {total_rows / elapsed:,.0f} 行/秒")
+    print(f"请求延迟: p50 {np.percentile(latencies, 50):.3f}s, p95 {np.percentile(latencies, 95):.3f}s")
+    print(f"首字节延迟: p50 {np.percentile(first_bytes, 50):.3f}s")
+
+    if server is not None:
+        server.shutdown()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
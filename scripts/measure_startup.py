@@ -0,0 +1,84 @@
+"""
+测量页面冷启动耗时：各依赖的导入时间，以及在全新进程中首次运行streamlit_app.py（首次渲染）的耗时
+
+python scripts/measure_startup.py
+python scripts/measure_startup.py --repeat 5 --json startup.json
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+HEAVY_MODULES = ['numpy', 'pandas', 'matplotlib', 'streamlit', 'requests']
+
+# 在子进程中运行，保证每次都是冷启动；市场数据接口替换为固定值，避免网络影响测量
+FIRST_PAINT_CODE = """
+import json, sys, time
+start = time.perf_counter()
+sys.path.insert(0, {root!r})
+from streamlit.testing.v1 import AppTest
+import btc_mining_calculator
+btc_mining_calculator.BTCMiningCalculator.get_btc_price = lambda self, use_cache=False: 100000.0
+btc_mining_calculator.BTCMiningCalculator.get_network_difficulty = lambda self, use_cache=False: 1.2e14
+ready = time.perf_counter()
+at = AppTest.from_file({app!r}, default_timeout=120)
+at.run()
+first_paint = time.perf_counter()
+at.run()
+rerun = time.perf_counter()
+print(json.dumps({{
+    'framework_import_s': ready - start,
+    'first_paint_s': first_paint - ready,
+    'rerun_s': rerun - first_paint,
+    'exceptions': [str(e.value) for e in at.exception],
+    'loaded_modules': [m for m in {heavy!r} if m in sys.modules],
+}}))
+"""
+
+
+def measure_import(module):
+    code = f"import time; t = time.perf_counter(); import {module}; print(time.perf_counter() - t)"
+    output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True, cwd=ROOT)
+    return float(output.stdout.strip().splitlines()[-1])
+
+
+def measure_first_paint():
+    code = FIRST_PAINT_CODE.format(root=os.path.abspath(ROOT),
+                                   app=os.path.join(os.path.abspath(ROOT), 'streamlit_app.py'),
+                                   heavy=HEAVY_MODULES)
+    output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True, cwd=ROOT)
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="测量页面冷启动耗时")
+    parser.add_argument('--repeat', type=int, default=3, help="重复次数，取中位数")
+    parser.add_argument('--json', help="将结果写入JSON文件，便于持续跟踪")
+    args = parser.parse_args()
+
+    report = {'imports': {}, 'first_paint': []}
+    for module in HEAVY_MODULES + ['btc_mining_calculator', 'miner_catalog']:
+        samples = sorted(measure_import(module) for _ in range(args.repeat))
+        report['imports'][module] = samples[len(samples) // 2]
+        print(f"导入 {module:<24} {report['imports'][module] * 1000:8.1f} ms")
+
+    for _ in range(args.repeat):
+        report['first_paint'].append(measure_first_paint())
+    runs = sorted(report['first_paint'], key=lambda r: r['first_paint_s'])
+    median = runs[len(runs) // 2]
+    print(f"首次渲染                     {median['first_paint_s'] * 1000:8.1f} ms")
+    print(f"再次运行(rerun)              {median['rerun_s'] * 1000:8.1f} ms")
+    print(f"首次渲染后已加载的重型模块: {', '.join(median['loaded_modules'])}")
+    if median['exceptions']:
+        print(f"页面异常: {median['exceptions']}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+录制批量计算引擎的基准数据（golden dataset）：固定的市场快照、当前的矿机参数表和参数网格，
+逐个场景用标量calculate_roi_result计算期望结果，按列写入tests/golden/roi_golden.json
+（expected的键为"快照名.字段名"，无法回本的回本天数为null）。
+修改矿机参数表或有意改变计算公式后重新录制，并在提交中说明结果变化的原因。
+
+python scripts/record_golden.py
+"""
+import argparse
+import itertools
+import json
+import math
+import os
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+sys.path.insert(0, ROOT)
+
+import numpy as np
+
+from btc_mining_calculator import RESULT_FIELDS, BTCMiningCalculator
+from miner_catalog import MINER_MODELS
+from results_store import expand_sweep_params
+
+DEFAULT_OUTPUT = os.path.join(ROOT, 'tests', 'golden', 'roi_golden.json')
+
+# 录制时的市场快照：包含高价、低价（部分型号无法回本）和高难度的情形
+SNAPSHOTS = [
+    {'name': 'baseline', 'btc_price': 65000.0, 'network_difficulty': 8.6e13, 'block_reward': 3.16},
+    {'name': 'bear', 'btc_price': 28000.0, 'network_difficulty': 7.2e13, 'block_reward': 3.125},
+    {'name': 'bull_high_difficulty', 'btc_price': 118500.0, 'network_difficulty': 1.27e14, 'block_reward': 3.2}
+]
+
+# 参数网格，轴名称与results_store.run_grid_sweep一致，场景按各轴的C顺序排列
+AXES = {
+    'model': list(MINER_MODELS),
+    'electricity_cost_kwh': [0.03, 0.06, 0.1],
+    'annual_utilization_rate': [100.0, 85.0],
+    'maintenance_percent': [0.0, 5.0]
+}
+
+FIXED = {'pool_fee_percent': 2.0, 'depreciation_percent': 20.0}
+
+INPUT_NAMES = ('hashrate_th', 'power_watts', 'electricity_cost_kwh', 'hardware_cost', 'pool_fee_percent',
+               'maintenance_cost_yearly', 'hardware_depreciation_yearly', 'annual_utilization_rate')
+
+
+def _json_value(value):
+    # JSON中没有inf，无法回本的回本天数记为null
+    value = float(value)
+    return value if math.isfinite(value) else None
+
+
+def scalar_result(calculator, snapshot, inputs):
+    """
+    离线运行标量路径：预先写入价格和难度缓存，使用缓存计算
+    """
+    calculator._btc_price_cache = snapshot['btc_price']
+    calculator._network_difficulty_cache = snapshot['network_difficulty']
+    return calculator.calculate_roi_result(block_reward=snapshot['block_reward'], use_cache=True, **inputs)
+
+
+def grid_cases():
+    """
+    :return: 网格各点的calculate_roi参数列表（按C顺序）
+    """
+    points = list(itertools.product(*AXES.values()))
+    coordinates = {name: np.array([point[i] for point in points], dtype=object if name == 'model' else np.float64)
+                   for i, name in enumerate(AXES)}
+    params = expand_sweep_params(coordinates, FIXED)
+    return [{name: float(np.broadcast_to(params[name], (len(points),))[i]) for name in INPUT_NAMES}
+            for i in range(len(points))]
+
+
+def _write(golden, f):
+    # 数组各占一行，文件较小且diff仍然可读
+    f.write('{\n')
+    for i, (key, value) in enumerate(golden.items()):
+        f.write(f' {json.dumps(key)}: ')
+        if isinstance(value, dict) and key in ('inputs', 'expected'):
+            f.write('{\n')
+            for j, (name, column) in enumerate(value.items()):
+                separator = ',' if j < len(value) - 1 else ''
+                f.write(f'  {json.dumps(name)}: {json.dumps(column, ensure_ascii=False)}{separator}\n')
+            f.write(' }')
+        else:
+            f.write(json.dumps(value, ensure_ascii=False))
+        f.write(',\n' if i < len(golden) - 1 else '\n')
+    f.write('}\n')
+
+
+def record(path=DEFAULT_OUTPUT):
+    """
+    :return: 录制的场景数
+    """
+    calculator = BTCMiningCalculator()
+    inputs = grid_cases()
+    expected = {}
+    for snapshot in SNAPSHOTS:
+        results = [scalar_result(calculator, snapshot, params) for params in inputs]
+        for name in RESULT_FIELDS:
+            expected[f"{snapshot['name']}.{name}"] = [_json_value(getattr(r, name)) for r in results]
+    golden = {
+        'catalog': {name: MINER_MODELS[name] for name in AXES['model']},
+        'snapshots': SNAPSHOTS,
+        'axes': AXES,
+        'fixed': FIXED,
+        'inputs': {name: [params[name] for params in inputs] for name in INPUT_NAMES},
+        'expected': expected
+    }
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        _write(golden, f)
+    return len(inputs) * len(SNAPSHOTS)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="录制批量计算引擎的基准数据")
+    parser.add_argument('--output', default=DEFAULT_OUTPUT, help="输出的JSON文件")
+    args = parser.parse_args()
+    count = record(args.output)
+    print(f"已录制 {count} 个场景: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
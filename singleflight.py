@@ -0,0 +1,57 @@
+import threading
+
+
+class _Call:
+    __slots__ = ('done', 'value', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    合并并发的相同请求：同一个键同时只有一个调用真正执行，其余调用等待它完成并共享结果（或异常）。
+    调用结束后立即移除，不缓存结果，缓存由调用方自行处理。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, func, *args, **kwargs):
+        """
+        执行func(*args, **kwargs)，若相同key的调用正在进行则等待其结果
+        :param key: 可哈希的请求键
+        :return: func的返回值
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.value
+
+        try:
+            call.value = func(*args, **kwargs)
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.value
+
+    def in_flight(self, key):
+        """
+        :return: 该键当前是否有正在进行的调用
+        """
+        with self._lock:
+            return key in self._calls
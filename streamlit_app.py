@@ -1,48 +1,137 @@
 import streamlit as st
 from btc_mining_calculator import BTCMiningCalculator
+from miner_catalog import MINER_MODELS, get_maintenance_coefficient, calculate_adjusted_maintenance_cost
+from dashboard_tables import FrameCache, best_performers, break_even_frame, catalog_frame, comparison_frame, \
+    selection_frame
+from incremental import SENSITIVITY_PRICES, build_dashboard_graph, miner_row
+from profiling import Profiler, phase, profile_mode_from_env
+from scenarios import SCENARIO_PARAMS, ScenarioComparer
+from localization import get_label
+import json
 import time
-import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
-
-# 定义常见矿机型号及其参数
-MINER_MODELS = {
-    "Custom": {"hashrate": 200.0, "power": 3500.0, "cost": 4000.0, "efficiency": 17.50, "cost_per_th": 20.00},
-    "Antminer S23 Hydro": {"hashrate": 580.0, "power": 5510.0, "cost": 14790.0, "efficiency": 9.50, "cost_per_th": 25.50},
-    "Antminer S21 XP Hydro": {"hashrate": 473.0, "power": 5676.0, "cost": 10170.0, "efficiency": 12.00, "cost_per_th": 21.50},
-    "Antminer S21 XP lmm.": {"hashrate": 300.0, "power": 4050.0, "cost": 7368.0, "efficiency": 13.50, "cost_per_th": 24.56},
-    "Antminer S21 pro": {"hashrate": 234.0, "power": 3510.0, "cost": 3744.0, "efficiency": 15.00, "cost_per_th": 16.00},
-    "Antminer S21+": {"hashrate": 216.0, "power": 3564.0, "cost": 3240.0, "efficiency": 16.50, "cost_per_th": 15.00},
-    "Antminer S21 lmm.": {"hashrate": 215.0, "power": 3440.0, "cost": 3333.0, "efficiency": 16.00, "cost_per_th": 15.50},
-    "Antminer S21+ Hydro": {"hashrate": 358.0, "power": 5370.0, "cost": 5370.0, "efficiency": 15.00, "cost_per_th": 15.00},
-    "Antminer S19 XP+ Hyd.": {"hashrate": 279.0, "power": 5301.0, "cost": 2790.0, "efficiency": 19.01, "cost_per_th": 10.00},
-    "Antminer S19k Pro": {"hashrate": 120.0, "power": 2760.0, "cost": 840.0, "efficiency": 23.00, "cost_per_th": 7.00},
-    "Teraflux AH3880": {"hashrate": 450.0, "power": 6525.0, "cost": 4550.0, "efficiency": 14.50, "cost_per_th": 10.11},
-    "SEALMINER A2 Pro Hyd": {"hashrate": 500.0, "power": 7450.0, "cost": 7500.0, "efficiency": 14.90, "cost_per_th": 15.00},
-    "SEALMINER A2 Pro Air": {"hashrate": 255.0, "power": 3790.0, "cost": 4100.0, "efficiency": 14.86, "cost_per_th": 16.08},
-    "Avalon Q": {"hashrate": 90.0, "power": 1674.0, "cost": 1888.0, "efficiency": 18.60, "cost_per_th": 20.98},
-    "Whatsminer M50S": {"hashrate": 126.0, "power": 3348.0, "cost": 1500.0, "efficiency": 26.57, "cost_per_th": 11.90},
-    "Avalon A1566I-261T": {"hashrate": 261.0, "power": 4959.0, "cost": 3367.0, "efficiency": 19.00, "cost_per_th": 12.90}
+
+# pandas和matplotlib导入耗时较长，页面和表格模块都不在模块级导入，只在构建表格或绘图时才导入；
+# 首屏的矿机参数表（st.data_editor）渲染时streamlit会导入pandas，因此首次渲染后pandas仍会被加载
+
+
+def _pandas():
+    import pandas as pd
+    return pd
+
+
+def _pyplot():
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    return plt
+
+
+@st.cache_data
+def build_catalog_selection_frame(selected):
+    """
+    带勾选列的矿机参数表，按选择缓存，同一选择在各次rerun中复用同一个表格
+    :param selected: 选中型号的元组
+    """
+    return selection_frame(catalog_frame(), selected)
+
+
+# 表格显示格式，数值列保持数值类型，由前端按列格式化
+CATALOG_COLUMN_CONFIG = {
+    "选中": st.column_config.CheckboxColumn("选中", help="勾选要进行对比和敏感性分析的矿机"),
+    "Model": st.column_config.TextColumn("Model"),
+    "Hashrate (TH/s)": st.column_config.NumberColumn(format="%.1f"),
+    "Power (W)": st.column_config.NumberColumn(format="%.0f"),
+    "Cost ($)": st.column_config.NumberColumn(format="dollar"),
+    "Efficiency (W/TH)": st.column_config.NumberColumn(format="%.2f"),
+    "维护系数": st.column_config.NumberColumn(format="%.1fx"),
+    "Cost per TH ($/TH)": st.column_config.NumberColumn(format="%.2f")
+}
+
+COMPARISON_COLUMN_CONFIG = {
+    "算力 (TH/s)": st.column_config.NumberColumn(format="%.1f"),
+    "功耗 (W)": st.column_config.NumberColumn(format="%.0f"),
+    "效率 (W/TH)": st.column_config.NumberColumn(format="%.1f"),
+    "维护系数": st.column_config.NumberColumn(format="%.1fx"),
+    "硬件成本 ($)": st.column_config.NumberColumn(format="dollar"),
+    "每日收入 ($)": st.column_config.NumberColumn(format="dollar"),
+    "每日成本 ($)": st.column_config.NumberColumn(format="dollar"),
+    "每日净利润 ($)": st.column_config.NumberColumn(format="dollar"),
+    "月度净利润 ($)": st.column_config.NumberColumn(format="dollar"),
+    "年度净利润 ($)": st.column_config.NumberColumn(format="dollar"),
+    "回本天数": st.column_config.NumberColumn(format="%.1f", help="空白表示无法回本"),
+    "年化回报率 (%)": st.column_config.NumberColumn(format="%.1f%%")
 }
 
-def get_maintenance_coefficient(efficiency):
+BREAK_EVEN_COLUMN_CONFIG = {
+    "Break-even Price ($/kWh)": st.column_config.NumberColumn(format="$%.3f")
+}
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def fetch_market_snapshot():
     """
-    根据矿机效率返回维护成本调整系数
-    效率越低（数值越大），维护系数越高
+    获取市场数据快照，5分钟内的重复计算复用同一份数据，使增量计算只处理真正变化的输入
     """
-    if efficiency <= 15.0:
-        return 1.0  # 高效机型
-    elif efficiency <= 20.0:
-        return 1.3  # 中效机型
-    else:
-        return 1.6  # 低效机型
-
-def calculate_adjusted_maintenance_cost(hardware_cost, base_percent, efficiency):
+    return BTCMiningCalculator().get_market_snapshot()
+
+WHAT_IF_COLUMN_CONFIG = {
+    "基准": st.column_config.NumberColumn(format="%.2f"),
+    "变体": st.column_config.NumberColumn(format="%.2f"),
+    "变化": st.column_config.NumberColumn(format="%+.2f"),
+    "变化率 (%)": st.column_config.NumberColumn(format="%+.1f%%")
+}
+
+# 参数显示名称到参数名
+_SCENARIO_PARAM_BY_LABEL = {label: name for name, label in SCENARIO_PARAMS.items()}
+
+
+@st.fragment
+def render_what_if(baseline_params, snapshot):
     """
-    计算调整后的维护成本
+    假设分析：以当前输入为基准，按表格中的参数修改批量计算各变体并显示差异。
+    作为fragment运行，修改变体只重新运行本区域，不重算整个页面
     """
-    coefficient = get_maintenance_coefficient(efficiency)
-    return hardware_cost * (base_percent / 100) * coefficient
+    pd = _pandas()
+    st.subheader("🔀 假设分析")
+    st.caption("每行修改一个参数，同名变体的多行合并为一个变体；与上方当前结果对比")
+    edited = st.data_editor(
+        pd.DataFrame({
+            "变体名称": ["矿池费 1.5%", "利用率 85%"],
+            "参数": [SCENARIO_PARAMS['pool_fee_percent'], SCENARIO_PARAMS['annual_utilization_rate']],
+            "新值": [1.5, 85.0]
+        }),
+        key="what_if_variants",
+        num_rows="dynamic",
+        column_config={
+            "参数": st.column_config.SelectboxColumn(options=list(SCENARIO_PARAMS.values()), required=True),
+            "新值": st.column_config.NumberColumn(required=True)
+        },
+        use_container_width=True,
+        hide_index=True
+    )
+    variants = {}
+    for name, label, value in edited.dropna().itertuples(index=False):
+        variants.setdefault(str(name), {})[_SCENARIO_PARAM_BY_LABEL[label]] = float(value)
+    if not variants:
+        st.info("💡 在上表中添加变体")
+        return
+
+    diff = st.session_state.scenario_comparer.compare(baseline_params, variants, snapshot)
+    rows = diff.to_rows()
+    st.dataframe(
+        pd.DataFrame({
+            "变体名称": [row['variant'] for row in rows],
+            "指标": [get_label(row['field']) for row in rows],
+            "基准": [row['baseline'] for row in rows],
+            "变体": [row['value'] for row in rows],
+            "变化": [row['delta'] for row in rows],
+            "变化率 (%)": [row['percent_change'] for row in rows]
+        }).replace([float('inf'), float('-inf')], float('nan')),
+        column_config=WHAT_IF_COLUMN_CONFIG,
+        use_container_width=True,
+        hide_index=True
+    )
+
 
 # 设置页面配置
 st.set_page_config(
@@ -51,6 +140,12 @@ st.set_page_config(
     layout="wide"
 )
 
+# 性能分析：侧边栏开关或环境变量BTC_CALC_PROFILE开启，记录本次运行各阶段的耗时
+profile_enabled = st.sidebar.toggle("⏱️ 性能分析", value=profile_mode_from_env() is not None,
+                                    help="记录各阶段耗时，并写出Chrome trace和cProfile文件")
+profiler = Profiler(profile_mode_from_env() or 'both').start() if profile_enabled else None
+phase("页面: 说明")
+
 # 添加标题和说明
 st.title("⛏️ 比特币挖矿收益计算器")
 st.markdown("""
@@ -103,6 +198,7 @@ with st.expander("点击查看详细计算公式", expanded=False):
     - 未考虑运营风险和其他额外成本
     """)
 
+phase("页面: 矿机参数表")
 # 展示矿机参数表
 st.markdown("### 📊 Miner Models Comparison")
 st.markdown("勾选要进行敏感性分析的矿机型号：")
@@ -111,58 +207,39 @@ st.markdown("勾选要进行敏感性分析的矿机型号：")
 if 'selected_miners_for_analysis' not in st.session_state:
     st.session_state.selected_miners_for_analysis = ["Antminer S21 pro", "Antminer S21+", "Custom"]  # 默认选择几个
 
-# 创建带有选择列的表格
-col_table, col_controls = st.columns([4, 1])
+# 矿机参数表带勾选列，用data_editor一次渲染，型号增多时不必为每个型号创建一个checkbox
+if 'catalog_editor_version' not in st.session_state:
+    st.session_state.catalog_editor_version = 0
+    st.session_state.catalog_editor_selection = tuple(st.session_state.selected_miners_for_analysis)
 
-with col_table:
-    # 为每个矿机创建选择框
-    miner_selection = {}
-    for name in MINER_MODELS.keys():
-        miner_selection[name] = st.checkbox(
-            name, 
-            value=name in st.session_state.selected_miners_for_analysis,
-            key=f"select_{name}"
-        )
-    
-    # 更新session state
-    st.session_state.selected_miners_for_analysis = [name for name, selected in miner_selection.items() if selected]
+
+def _set_selection(names):
+    # 快速选择按钮：更换data_editor的key，使表格按新的选择重新初始化
+    st.session_state.selected_miners_for_analysis = list(names)
+    st.session_state.catalog_editor_selection = tuple(names)
+    st.session_state.catalog_editor_version += 1
+
+
+col_table, col_controls = st.columns([4, 1])
 
 with col_controls:
     st.markdown("**快速选择：**")
-    if st.button("🔘 全选", key="select_all"):
-        st.session_state.selected_miners_for_analysis = list(MINER_MODELS.keys())
-        st.rerun()
-    
-    if st.button("🔲 清空", key="clear_all"):
-        st.session_state.selected_miners_for_analysis = []
-        st.rerun()
-    
-    if st.button("⚡ 高效型", key="select_efficient"):
-        st.session_state.selected_miners_for_analysis = ["Antminer S23 Hydro", "Antminer S21 XP Hydro", "Antminer S21+ Hydro"]
-        st.rerun()
-
-# 显示矿机参数对比表
-st.markdown("#### 矿机参数对比表")
-miner_param_df = []
-for name, params in MINER_MODELS.items():
-    status = "✅ 已选中" if name in st.session_state.selected_miners_for_analysis else "⬜ 未选中"
-    maintenance_coef = get_maintenance_coefficient(params["efficiency"])
-    miner_param_df.append({
-        "状态": status,
-        "Model": name,
-        "Hashrate (TH/s)": f"{params['hashrate']:.1f}",
-        "Power (W)": f"{params['power']:.0f}",
-        "Cost ($)": f"{params['cost']:.0f}",
-        "Efficiency (W/TH)": f"{params['efficiency']:.2f}",
-        "维护系数": f"{maintenance_coef:.1f}x",
-        "Cost per TH ($/TH)": f"{params['cost_per_th']:.2f}"
-    })
-miner_param_df = pd.DataFrame(miner_param_df)
-st.dataframe(
-    miner_param_df.style.format(precision=2),
-    use_container_width=True,
-    hide_index=True
-)
+    st.button("🔘 全选", key="select_all", on_click=_set_selection, args=(list(MINER_MODELS.keys()),))
+    st.button("🔲 清空", key="clear_all", on_click=_set_selection, args=([],))
+    st.button("⚡ 高效型", key="select_efficient", on_click=_set_selection,
+              args=(["Antminer S23 Hydro", "Antminer S21 XP Hydro", "Antminer S21+ Hydro"],))
+
+with col_table:
+    st.markdown("#### 矿机参数对比表")
+    edited_catalog = st.data_editor(
+        build_catalog_selection_frame(st.session_state.catalog_editor_selection),
+        key=f"catalog_editor_{st.session_state.catalog_editor_version}",
+        column_config=CATALOG_COLUMN_CONFIG,
+        disabled=[column for column in CATALOG_COLUMN_CONFIG if column != "选中"],
+        use_container_width=True,
+        hide_index=True
+    )
+    st.session_state.selected_miners_for_analysis = edited_catalog.index[edited_catalog["选中"]].tolist()
 
 # 显示选中矿机统计
 selected_count = len(st.session_state.selected_miners_for_analysis)
@@ -173,6 +250,7 @@ else:
 
 st.markdown("---")
 
+phase("页面: 输入参数")
 # 创建两列布局
 col1, col2 = st.columns(2)
 
@@ -358,22 +436,49 @@ with col1:
         
         calculate_button = st.form_submit_button("计算收益")
 
-# 如果点击了计算按钮
+# 点击计算按钮后持续显示结果，之后修改参数或勾选矿机只增量重算受影响的部分
 if calculate_button:
+    st.session_state.show_results = True
+
+if 'dashboard_graph' not in st.session_state:
+    st.session_state.dashboard_graph = build_dashboard_graph()
+    st.session_state.scenario_comparer = ScenarioComparer(BTCMiningCalculator())
+    st.session_state.comparison_frame_cache = FrameCache(comparison_frame)
+    st.session_state.break_even_frame_cache = FrameCache(
+        lambda names, sweeps: break_even_frame(names, SENSITIVITY_PRICES,
+                                               [sweep['daily_profit_usd'] for sweep in sweeps]))
+
+if st.session_state.get('show_results'):
     with st.spinner('正在获取实时数据并计算...'):
-        calculator = BTCMiningCalculator()
-        result = calculator.calculate_roi(
-            hashrate_th=hashrate,
-            power_watts=power,
-            electricity_cost_kwh=electricity_cost,
-            hardware_cost=hardware_cost,
-            pool_fee_percent=pool_fee,
-            maintenance_cost_yearly=int(maintenance_cost),
-            hardware_depreciation_yearly=int(depreciation),
-            block_reward=block_reward,
-            annual_utilization_rate=annual_utilization_rate
-        )
+        phase("数据获取")
+        snapshot = fetch_market_snapshot()
+        if snapshot is None:
+            # 获取失败时不缓存，下次重新获取
+            fetch_market_snapshot.clear()
+        result = None
+        if snapshot is not None:
+            phase("计算: 主结果/对比/敏感性")
+            graph_inputs = {
+                'snapshot': snapshot,
+                'block_reward': block_reward,
+                'pool_fee_percent': pool_fee,
+                'annual_utilization_rate': annual_utilization_rate,
+                'electricity_cost_kwh': electricity_cost,
+                'maintenance_percent': maintenance_cost_percent,
+                'depreciation_percent': depreciation_percent
+            }
+            headline_row = miner_row(miner_model, {
+                'hashrate': hashrate, 'power': power, 'cost': hardware_cost,
+                'efficiency': selected_miner['efficiency']
+            })
+            analysis_rows = {
+                name: miner_row(name, MINER_MODELS[name]) for name in st.session_state.selected_miners_for_analysis
+            }
+            graph_results = st.session_state.dashboard_graph.evaluate_many(
+                ['comparison', 'sweep'], [headline_row, *analysis_rows.values()], graph_inputs)
+            result = graph_results['comparison'][headline_row]
         
+        phase("渲染: 主结果")
         if result:
             # 显示结果
             with col2:
@@ -385,19 +490,19 @@ if calculate_button:
                 with market_col1:
                     st.metric(
                         "BTC当前价格",
-                        f"${result['BTC当前价格']:,.2f}"
+                        f"${result.btc_price:,.2f}"
                     )
                 
                 with market_col2:
                     st.metric(
                         "当前网络难度",
-                        f"{result['网络难度']:,.2e}"
+                        f"{result.network_difficulty:,.2e}"
                     )
                 
                 with market_col3:
                     st.metric(
                         "年利用率",
-                        f"{result['年利用率']:.1f}%"
+                        f"{result.annual_utilization_rate:.1f}%"
                     )
                 
                 # 创建三列显示每日数据
@@ -406,20 +511,20 @@ if calculate_button:
                 with daily_col1:
                     st.metric(
                         "每日BTC收益(实际)",
-                        f"{result['每日BTC收益(含矿池费)']:.2e} BTC",
-                        delta=f"满载: {result['每日BTC收益(满载)']:.2e} BTC"
+                        f"{result.daily_btc_actual:.2e} BTC",
+                        delta=f"满载: {result.daily_btc_full:.2e} BTC"
                     )
                 
                 with daily_col2:
                     st.metric(
                         "每日收入",
-                        f"${result['每日收入(USD)']:,.2f}"
+                        f"${result.daily_revenue_usd:,.2f}"
                     )
                 
                 with daily_col3:
                     st.metric(
                         "每日总成本",
-                        f"${result['每日总成本(USD)']:,.2f}"
+                        f"${result.daily_total_cost_usd:,.2f}"
                     )
                 
                 # 创建成本明细
@@ -429,20 +534,20 @@ if calculate_button:
                 with cost_col1:
                     st.metric(
                         "每日电费(实际)",
-                        f"${result['每日电费(USD)']:,.2f}",
-                        delta=f"满载: ${result['每日电费(满载)']:,.2f}"
+                        f"${result.daily_power_cost_usd:,.2f}",
+                        delta=f"满载: ${result.daily_power_cost_full_usd:,.2f}"
                     )
                 
                 with cost_col2:
                     st.metric(
                         "每日维护成本",
-                        f"${result['每日维护成本(USD)']:,.2f}"
+                        f"${result.daily_maintenance_cost_usd:,.2f}"
                     )
                 
                 with cost_col3:
                     st.metric(
                         "每日折旧",
-                        f"${result['每日折旧(USD)']:,.2f}"
+                        f"${result.daily_depreciation_usd:,.2f}"
                     )
                 
                 # 创建三列显示利润数据
@@ -452,24 +557,24 @@ if calculate_button:
                 with profit_col1:
                     st.metric(
                         "每日净利润",
-                        f"${result['每日净利润(USD)']:,.2f}"
+                        f"${result.daily_profit_usd:,.2f}"
                     )
                 
                 with profit_col2:
                     st.metric(
                         "月度净利润",
-                        f"${result['月度净利润(USD)']:,.2f}"
+                        f"${result.monthly_profit_usd:,.2f}"
                     )
                 
                 with profit_col3:
                     st.metric(
                         "年度净利润",
-                        f"${result['年度净利润(USD)']:,.2f}"
+                        f"${result.annual_profit_usd:,.2f}"
                     )
                 
                 # ROI分析
                 st.subheader("📊 投资回报分析")
-                roi_days = result['预计回本天数']
+                roi_days = result.roi_days
                 if roi_days != float('inf'):
                     st.success(f"预计回本天数: {roi_days:.1f}天 (约{roi_days/365:.1f}年)")
                     
@@ -481,6 +586,22 @@ if calculate_button:
                     st.error("⚠️ 警告：当前配置下无法盈利！")
                     st.text("建议：降低成本或选择更高效的矿机")
 
+            phase("假设分析")
+            st.markdown("---")
+            render_what_if({
+                'hashrate_th': hashrate,
+                'power_watts': power,
+                'electricity_cost_kwh': electricity_cost,
+                'hardware_cost': hardware_cost,
+                'pool_fee_percent': pool_fee,
+                'maintenance_percent': maintenance_cost_percent,
+                'depreciation_percent': depreciation_percent,
+                'efficiency': selected_miner['efficiency'],
+                'block_reward': block_reward,
+                'annual_utilization_rate': annual_utilization_rate
+            }, snapshot)
+
+            phase("渲染: 对比表")
             # 选中矿机对比分析
             st.markdown("---")
             st.subheader("🔍 选中矿机对比分析")
@@ -488,113 +609,45 @@ if calculate_button:
             if st.session_state.selected_miners_for_analysis:
                 st.markdown(f"基于当前参数设置，对比 {len(st.session_state.selected_miners_for_analysis)} 个选中矿机的收益表现：")
                 
-                # 计算所有选中矿机的数据
-                comparison_data = []
-                for miner_name in st.session_state.selected_miners_for_analysis:
-                    miner_specs = MINER_MODELS[miner_name]
-                    
-                    # 计算该矿机的维护成本和折旧
-                    miner_maintenance_cost = calculate_adjusted_maintenance_cost(miner_specs["cost"], maintenance_cost_percent, miner_specs["efficiency"])
-                    miner_depreciation = miner_specs["cost"] * (depreciation_percent / 100)
-                    
-                    # 计算收益
-                    miner_result = calculator.calculate_roi(
-                        hashrate_th=miner_specs["hashrate"],
-                        power_watts=miner_specs["power"],
-                        electricity_cost_kwh=electricity_cost,
-                        hardware_cost=miner_specs["cost"],
-                        pool_fee_percent=pool_fee,
-                        maintenance_cost_yearly=int(miner_maintenance_cost),
-                        hardware_depreciation_yearly=int(miner_depreciation),
-                        block_reward=block_reward,
-                        annual_utilization_rate=annual_utilization_rate,
-                        use_cache=True
-                    )
-                    
-                    if miner_result:
-                        roi_days = miner_result['预计回本天数']
-                        annual_return = (365 / roi_days) * 100 if roi_days != float('inf') and roi_days > 0 else 0
-                        maintenance_coef = get_maintenance_coefficient(miner_specs["efficiency"])
-                        
-                        comparison_data.append({
-                            "矿机型号": miner_name,
-                            "算力 (TH/s)": f"{miner_specs['hashrate']:.1f}",
-                            "功耗 (W)": f"{miner_specs['power']:.0f}",
-                            "效率 (W/TH)": f"{miner_specs['efficiency']:.1f}",
-                            "维护系数": f"{maintenance_coef:.1f}x",
-                            "硬件成本 ($)": f"{miner_specs['cost']:,.0f}",
-                            "每日收入 ($)": f"{miner_result['每日收入(USD)']:,.2f}",
-                            "每日成本 ($)": f"{miner_result['每日总成本(USD)']:,.2f}",
-                            "每日净利润 ($)": f"{miner_result['每日净利润(USD)']:,.2f}",
-                            "月度净利润 ($)": f"{miner_result['月度净利润(USD)']:,.2f}",
-                            "年度净利润 ($)": f"{miner_result['年度净利润(USD)']:,.0f}",
-                            "回本天数": f"{roi_days:.1f}" if roi_days != float('inf') else "无法回本",
-                            "年化回报率 (%)": f"{annual_return:.1f}%"
-                        })
-                
-                if comparison_data:
-                    comparison_df = pd.DataFrame(comparison_data)
-                    st.dataframe(comparison_df, use_container_width=True, hide_index=True)
+                # 对比表只在选中的型号或其结果对象变化时重建，数值格式由column_config在前端完成
+                selected_names = st.session_state.selected_miners_for_analysis
+                comparison_df = st.session_state.comparison_frame_cache.get(
+                    selected_names, [graph_results['comparison'][analysis_rows[name]] for name in selected_names])
+
+                if not comparison_df.empty:
+                    st.dataframe(comparison_df, column_config=COMPARISON_COLUMN_CONFIG,
+                                 use_container_width=True, hide_index=True)
                     
                     # 添加最佳表现统计
                     st.markdown("#### 🏆 最佳表现矿机")
+                    best = best_performers(comparison_df)
+                    col_best1, col_best2, col_best3, col_best4 = st.columns(4)
                     
-                    # 找出各项指标的最佳矿机
-                    numeric_data = []
-                    for data in comparison_data:
-                        numeric_data.append({
-                            "矿机型号": data["矿机型号"],
-                            "每日净利润": float(data["每日净利润 ($)"].replace('$', '').replace(',', '')),
-                            "年度净利润": float(data["年度净利润 ($)"].replace('$', '').replace(',', '')),
-                            "回本天数": float(data["回本天数"]) if data["回本天数"] != "无法回本" else float('inf'),
-                            "年化回报率": float(data["年化回报率 (%)"].replace('%', ''))
-                        })
+                    with col_best1:
+                        name, value = best["最高日净利润"]
+                        st.metric("最高日净利润", f"${value:,.2f}", delta=name)
                     
-                    if numeric_data:
-                        best_daily_profit = max(numeric_data, key=lambda x: x["每日净利润"])
-                        best_annual_profit = max(numeric_data, key=lambda x: x["年度净利润"])
-                        best_roi = min([x for x in numeric_data if x["回本天数"] != float('inf')], 
-                                      key=lambda x: x["回本天数"], default=None)
-                        best_return_rate = max(numeric_data, key=lambda x: x["年化回报率"])
-                        
-                        col_best1, col_best2, col_best3, col_best4 = st.columns(4)
-                        
-                        with col_best1:
-                            st.metric(
-                                "最高日净利润",
-                                f"${best_daily_profit['每日净利润']:,.2f}",
-                                delta=best_daily_profit['矿机型号']
-                            )
-                        
-                        with col_best2:
-                            st.metric(
-                                "最高年净利润", 
-                                f"${best_annual_profit['年度净利润']:,.0f}",
-                                delta=best_annual_profit['矿机型号']
-                            )
-                        
-                        with col_best3:
-                            if best_roi:
-                                st.metric(
-                                    "最快回本",
-                                    f"{best_roi['回本天数']:.1f}天",
-                                    delta=best_roi['矿机型号']
-                                )
-                            else:
-                                st.metric("最快回本", "暂无可盈利矿机", delta="")
-                        
-                        with col_best4:
-                            st.metric(
-                                "最高年化回报",
-                                f"{best_return_rate['年化回报率']:.1f}%",
-                                delta=best_return_rate['矿机型号']
-                            )
+                    with col_best2:
+                        name, value = best["最高年净利润"]
+                        st.metric("最高年净利润", f"${value:,.0f}", delta=name)
+                    
+                    with col_best3:
+                        if best["最快回本"]:
+                            name, value = best["最快回本"]
+                            st.metric("最快回本", f"{value:.1f}天", delta=name)
+                        else:
+                            st.metric("最快回本", "暂无可盈利矿机", delta="")
+                    
+                    with col_best4:
+                        name, value = best["最高年化回报"]
+                        st.metric("最高年化回报", f"{value:.1f}%", delta=name)
                 
                 else:
                     st.warning("⚠️ 无法计算选中矿机的收益数据，请检查网络连接")
             else:
                 st.info("💡 请先在上方选择要对比的矿机型号")
 
+            phase("渲染: 敏感性图表")
             # 电价敏感性分析
             st.markdown("---")
             st.subheader(f"⚡ 电价敏感性分析")
@@ -610,47 +663,26 @@ if calculate_button:
                     selected_list = "、".join(st.session_state.selected_miners_for_analysis)
                     st.info(f"正在分析：{selected_list}")
 
-                # 创建电价点（0到0.1美元，步长0.01）
-                electricity_prices = [round(i/100, 3) for i in range(11)]  # [0.00, 0.01, 0.02, ..., 0.10]
-
                 # 创建选中矿机的结果数据
+                pd = _pandas()
                 all_miners_data = {}
                 
-                # 只计算选中的矿机型号数据
+                # 只取选中矿机的数据，各电价点已在计算图中批量算好
                 for miner_name in st.session_state.selected_miners_for_analysis:
-                    miner_specs = MINER_MODELS[miner_name]
-                    data = []
-                    for price in electricity_prices:
-                        # 计算该矿机的维护成本和折旧
-                        miner_maintenance_cost = calculate_adjusted_maintenance_cost(miner_specs["cost"], maintenance_cost_percent, miner_specs["efficiency"])
-                        miner_depreciation = miner_specs["cost"] * (depreciation_percent / 100)
-                        
-                        sensitivity_result = calculator.calculate_roi(
-                            hashrate_th=miner_specs["hashrate"],
-                            power_watts=miner_specs["power"],
-                            electricity_cost_kwh=price,
-                            hardware_cost=miner_specs["cost"],
-                            pool_fee_percent=pool_fee,
-                            maintenance_cost_yearly=int(miner_maintenance_cost),
-                            hardware_depreciation_yearly=int(miner_depreciation),
-                            block_reward=block_reward,
-                            annual_utilization_rate=annual_utilization_rate,
-                            use_cache=True
-                        )
-                        if sensitivity_result:
-                            data.append({
-                                "Electricity Price ($/kWh)": float(price),
-                                "Daily Profit ($)": float(sensitivity_result["每日净利润(USD)"]),
-                                "Monthly Profit ($)": float(sensitivity_result["月度净利润(USD)"]),
-                                "Annual Profit ($)": float(sensitivity_result["年度净利润(USD)"]),
-                                "ROI Days": sensitivity_result["预计回本天数"] if sensitivity_result["预计回本天数"] != float('inf') else None
-                            })
-                    if data:
-                        all_miners_data[miner_name] = pd.DataFrame(data)
+                    sweep = graph_results['sweep'][analysis_rows[miner_name]]
+                    all_miners_data[miner_name] = pd.DataFrame({
+                        "Electricity Price ($/kWh)": sweep['electricity_cost_kwh'],
+                        "Daily Profit ($)": sweep['daily_profit_usd'],
+                        "Monthly Profit ($)": sweep['monthly_profit_usd'],
+                        "Annual Profit ($)": sweep['annual_profit_usd'],
+                        # 无法回本的点不参与绘图
+                        "ROI Days": pd.Series(sweep['roi_days']).replace(float('inf'), float('nan'))
+                    })
 
                 if all_miners_data:
                     # --------- 日收益对比图 ---------
                     st.markdown("#### 📈 Profitability Analysis (Daily Profit)")
+                    plt = _pyplot()
                     plt.style.use('dark_background')
                     fig, ax = plt.subplots(figsize=(12, 6))  # 调整图表大小
                     colors = ['#00BFFF', '#FF69B4', '#32CD32', '#FFD700', '#FF4500', '#9370DB', '#8B4513', '#20B2AA', '#DC143C', '#4682B4', '#A0522D', '#2E8B57', '#B8860B', '#C71585', '#556B2F', '#8A2BE2']
@@ -763,36 +795,24 @@ if calculate_button:
                     st.pyplot(fig3)
                     plt.close()
 
+                    phase("盈亏平衡")
                     # --------- 盈亏平衡点 ---------
                     st.markdown("#### 📊 Break-even Analysis")
-                    break_even_data = []
-                    for miner_name, df in all_miners_data.items():
-                        break_even_price = None
-                        for i in range(len(df)-1):
-                            if df.iloc[i]["Daily Profit ($)"] >= 0 and df.iloc[i+1]["Daily Profit ($)"] < 0:
-                                break_even_price = df.iloc[i]["Electricity Price ($/kWh)"]
-                                break
-                        
-                        if break_even_price is not None:
-                            break_even_data.append({
-                                "Miner Model": miner_name,
-                                "Break-even Price ($/kWh)": f"${break_even_price:.3f}",
-                                "Status": f"Break-even at ${break_even_price:.3f}/kWh"
-                            })
-                            st.info(f"🔵 {miner_name}: Break-even at ${break_even_price:.3f}/kWh")
+                    selected_names = list(all_miners_data)
+                    break_even_df = st.session_state.break_even_frame_cache.get(
+                        selected_names, [graph_results['sweep'][analysis_rows[name]] for name in selected_names])
+                    for miner_name, price, status in break_even_df.itertuples(index=False):
+                        if status == "Break-even in range":
+                            st.info(f"🔵 {miner_name}: Break-even at ${price:.3f}/kWh")
+                        elif status == "Not profitable in range":
+                            st.error(f"🔴 {miner_name}: Not profitable in the given range")
                         else:
-                            break_even_data.append({
-                                "Miner Model": miner_name,
-                                "Break-even Price ($/kWh)": ">$0.100",
-                                "Status": "Always profitable in 0-0.1 $/kWh range"
-                            })
                             st.success(f"🟢 {miner_name}: Always profitable in the given range")
                     
                     # 显示盈亏平衡点汇总表
-                    if break_even_data:
-                        st.markdown("##### 盈亏平衡点汇总")
-                        break_even_df = pd.DataFrame(break_even_data)
-                        st.dataframe(break_even_df, use_container_width=True, hide_index=True)
+                    st.markdown("##### 盈亏平衡点汇总")
+                    st.dataframe(break_even_df, column_config=BREAK_EVEN_COLUMN_CONFIG,
+                                 use_container_width=True, hide_index=True)
                 
                 elif st.session_state.selected_miners_for_analysis:
                     st.error("选中的矿机数据计算失败，请检查网络连接或稍后重试")
@@ -800,6 +820,7 @@ if calculate_button:
         else:
             st.error("无法获取必要的数据，请稍后重试。")
 
+phase("页面: 注意事项")
 # 添加说明信息
 st.markdown("""
 ---
@@ -817,4 +838,19 @@ st.markdown("""
 """)
 
 # 添加更新时间
-st.sidebar.write("最后更新时间:", time.strftime("%Y-%m-%d %H:%M:%S")) 
\ No newline at end of file
+st.sidebar.write("最后更新时间:", time.strftime("%Y-%m-%d %H:%M:%S"))
+
+if profiler is not None:
+    profiler.stop()
+    profile_summary = profiler.summary()
+    with st.sidebar.expander("各阶段耗时", expanded=True):
+        st.dataframe(
+            {"阶段": [name for name, _, _ in profile_summary],
+             "次数": [count for _, count, _ in profile_summary],
+             "耗时 (ms)": [round(total, 1) for _, _, total in profile_summary]},
+            hide_index=True
+        )
+        profile_paths = profiler.dump(prefix='dashboard')
+        st.caption("已写出: " + ", ".join(profile_paths))
+        st.download_button("下载Chrome trace", data=json.dumps(profiler.to_chrome_trace()),
+                           file_name="dashboard.trace.json", mime="application/json")
@@ -0,0 +1,42 @@
+import numpy as np
+
+from btc_mining_calculator import RESULT_FIELDS
+
+# 各计算路径之间允许的相对误差：批量路径只改变了运算顺序，差异应在浮点舍入范围内
+RTOL = 1e-9
+# 美元和BTC金额的绝对误差下限，避免利润接近0时相对误差失去意义
+ATOL = 1e-9
+
+
+def offline_scalar(calculator, snapshot, block_reward, **params):
+    """
+    不访问网络运行标量路径：预先写入价格和难度缓存，使用缓存计算
+    :return: ROIResult
+    """
+    calculator._btc_price_cache = float(snapshot['btc_price'])
+    calculator._network_difficulty_cache = float(snapshot['network_difficulty'])
+    return calculator.calculate_roi_result(block_reward=block_reward, use_cache=True, **params)
+
+
+def scalar_columns(results):
+    """
+    将ROIResult列表转换为与calculate_roi_batch结果相同的字段到数组的字典
+    """
+    return {name: np.array([getattr(r, name) for r in results], dtype=np.float64) for name in RESULT_FIELDS}
+
+
+def assert_results_close(actual, expected, fields=RESULT_FIELDS, label=''):
+    """
+    逐字段比较两组结果；回本天数只在利润明显不为0时比较数值，无法回本（inf）的位置必须一致
+    """
+    profit = np.ravel(expected['daily_profit_usd'])
+    for name in fields:
+        a = np.ravel(np.asarray(actual[name], dtype=np.float64))
+        e = np.ravel(np.asarray(expected[name], dtype=np.float64))
+        assert a.shape == e.shape, f"{label}{name}: 形状不一致 {a.shape} != {e.shape}"
+        if name == 'roi_days':
+            np.testing.assert_array_equal(np.isinf(a), np.isinf(e), err_msg=f"{label}{name}: 能否回本不一致")
+            clear = np.isfinite(e) & (np.abs(profit) > ATOL * 1e3)
+            np.testing.assert_allclose(a[clear], e[clear], rtol=RTOL * 1e3, err_msg=f"{label}{name}")
+        else:
+            np.testing.assert_allclose(a, e, rtol=RTOL, atol=ATOL, err_msg=f"{label}{name}")
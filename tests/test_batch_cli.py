@@ -0,0 +1,45 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from batch_cli import main, run_batch
+from btc_mining_calculator import BTCMiningCalculator
+
+SNAPSHOT = {'btc_price': 65000.0, 'network_difficulty': 8.6e13}
+
+
+def test_csv_and_jsonl_outputs_keep_full_precision(tmp_path):
+    pd.DataFrame({
+        'hashrate_th': [1.0, 200.0],
+        'power_watts': [30.0, 3500.0],
+        'electricity_cost_kwh': [0.06, 0.5],
+        'hardware_cost': [100.0, 4000.0]
+    }).to_csv(tmp_path / 'scenarios.csv', index=False)
+    run_batch(str(tmp_path / 'scenarios.csv'), str(tmp_path / 'out.csv'), SNAPSHOT)
+    run_batch(str(tmp_path / 'scenarios.csv'), str(tmp_path / 'out.jsonl'), SNAPSHOT)
+
+    csv = pd.read_csv(tmp_path / 'out.csv', float_precision='round_trip')
+    with open(tmp_path / 'out.jsonl', encoding='utf-8') as f:
+        records = [json.loads(line) for line in f]
+    assert records[0]['daily_btc_full'] == csv['daily_btc_full'][0]
+    assert records[0]['daily_btc_full'] < 1e-6
+    # 无法回本时CSV中为inf，JSON Lines中为null
+    assert np.isinf(csv['roi_days'][1]) and records[1]['roi_days'] is None
+    for name in csv.columns:
+        expected = csv[name].astype(object).where(np.isfinite(csv[name]), None).tolist()
+        assert [record[name] for record in records] == expected, name
+
+
+def test_explicit_zero_price_overrides_live_price(tmp_path, monkeypatch):
+    monkeypatch.setattr(BTCMiningCalculator, 'get_market_snapshot',
+                        lambda self, use_cache=False: pytest.fail("不应获取实时市场数据"))
+    pd.DataFrame({'hashrate_th': [200.0], 'power_watts': [3500.0], 'electricity_cost_kwh': [0.05],
+                  'hardware_cost': [4000.0]}).to_csv(tmp_path / 'scenarios.csv', index=False)
+    assert main([str(tmp_path / 'scenarios.csv'), str(tmp_path / 'out.csv'), '--btc-price', '0',
+                 '--difficulty', '8.6e13', '--save-snapshot', str(tmp_path / 'snapshot.json')]) == 0
+    with open(tmp_path / 'snapshot.json', encoding='utf-8') as f:
+        assert json.load(f)['btc_price'] == 0.0
+    output = pd.read_csv(tmp_path / 'out.csv')
+    assert output['daily_revenue_usd'][0] == 0.0 and np.isinf(output['roi_days'][0])
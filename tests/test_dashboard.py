@@ -0,0 +1,42 @@
+import os
+
+import numpy as np
+import pytest
+
+import btc_mining_calculator
+from dashboard_tables import FrameCache
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'streamlit_app.py')
+
+
+def test_frame_cache_reuses_identical_inputs_and_rebuilds_on_new_arrays():
+    builds = []
+    cache = FrameCache(lambda names, sweeps: builds.append((names, sweeps)) or len(builds))
+    sweep = {'daily_profit_usd': np.arange(11.0)}
+    assert cache.get(['A'], [sweep]) == 1
+    assert cache.get(['A'], [sweep]) == 1
+    # 重算后的行是新的字典对象，内容是数组，不能按值比较
+    assert cache.get(['A'], [{'daily_profit_usd': np.arange(11.0)}]) == 2
+    assert len(builds) == 2
+
+
+@pytest.fixture
+def offline_market(monkeypatch):
+    monkeypatch.setattr(btc_mining_calculator.BTCMiningCalculator, 'get_btc_price',
+                        lambda self, use_cache=False: 100000.0)
+    monkeypatch.setattr(btc_mining_calculator.BTCMiningCalculator, 'get_network_difficulty',
+                        lambda self, use_cache=False: 1.2e14)
+
+
+def _submit(app):
+    next(b for b in app.button if b.label == '计算收益').click().run()
+    assert not app.exception, [e.value for e in app.exception]
+
+
+def test_dashboard_resubmits_after_input_change(offline_market):
+    testing = pytest.importorskip('streamlit.testing.v1')
+    app = testing.AppTest.from_file(APP_PATH, default_timeout=120).run()
+    _submit(app)
+    next(n for n in app.number_input if n.label == '矿池手续费 (%)').set_value(1.0)
+    _submit(app)
+    assert app.session_state.dashboard_graph.last_recomputed['sweep'] > 0
@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+
+from difficulty_forecast import (RETARGET_INTERVAL, DifficultyForecast, ExponentialGrowth, LinearGrowth,
+                                 estimate_next_retarget, get_difficulty_forecast, stub_block_timings)
+
+DIFFICULTY = 8.6e13
+EPOCH_START = 850 * RETARGET_INTERVAL
+
+
+def _epoch(block_seconds, blocks=RETARGET_INTERVAL // 2):
+    heights = np.arange(EPOCH_START - 10, EPOCH_START + blocks + 1)
+    timestamps = 1.7e9 + (heights - heights[0]) * float(block_seconds)
+    return heights, timestamps
+
+
+def test_retarget_at_mid_epoch():
+    # 出块时间500秒，算力比难度对应的高20%
+    heights, timestamps = _epoch(500)
+    retarget = estimate_next_retarget(heights, timestamps, DIFFICULTY)
+    assert retarget['epoch_start_height'] == EPOCH_START
+    assert retarget['remaining_blocks'] == RETARGET_INTERVAL // 2
+    assert retarget['avg_block_seconds'] == pytest.approx(500)
+    assert retarget['days_to_retarget'] == pytest.approx(RETARGET_INTERVAL // 2 * 500 / 86400)
+    assert retarget['adjustment'] == pytest.approx(1.2)
+    assert retarget['next_difficulty'] == pytest.approx(DIFFICULTY * 1.2)
+
+
+@pytest.mark.parametrize('block_seconds, adjustment', [(60, 4.0), (6000, 0.25)])
+def test_retarget_is_clamped_to_four_times(block_seconds, adjustment):
+    heights, timestamps = _epoch(block_seconds)
+    retarget = estimate_next_retarget(heights, timestamps, DIFFICULTY)
+    assert retarget['adjustment'] == adjustment
+    assert retarget['next_difficulty'] == DIFFICULTY * adjustment
+
+
+def test_stub_timings_assume_target_block_time():
+    heights, timestamps = stub_block_timings(EPOCH_START + 100, 1.7e9)
+    retarget = estimate_next_retarget(heights, timestamps, DIFFICULTY)
+    assert heights[0] == EPOCH_START
+    assert retarget['adjustment'] == 1.0
+    assert retarget['remaining_blocks'] == RETARGET_INTERVAL - 100
+
+
+@pytest.mark.parametrize('model', [ExponentialGrowth(3.0), LinearGrowth(3.0)])
+def test_growth_model_accumulates_its_own_factor(model):
+    assert model.factor(0) == pytest.approx(1.0)
+    assert model.factor(30) == pytest.approx(1.03)
+    # days_to_accumulate是factor积分的反函数
+    start, work = 45.0, 14.0
+    duration = model.days_to_accumulate(start, work)
+    days = np.linspace(start, start + duration, 100001)
+    assert np.trapezoid(model.factor(days), days) == pytest.approx(work, rel=1e-9)
+    assert duration < work
+
+
+@pytest.mark.parametrize('model', [ExponentialGrowth(0.0), LinearGrowth(0.0)])
+def test_zero_growth_keeps_difficulty(model):
+    heights, timestamps = _epoch(600)
+    forecast = DifficultyForecast(DIFFICULTY, heights, timestamps, model, horizon_days=365)
+    np.testing.assert_allclose(forecast.epoch_difficulties, DIFFICULTY)
+    np.testing.assert_allclose(np.diff(forecast.epoch_start_days[1:]), 14.0)
+
+
+def test_exponential_growth_raises_difficulty_each_epoch():
+    heights, timestamps = _epoch(600)
+    forecast = DifficultyForecast(DIFFICULTY, heights, timestamps, ExponentialGrowth(2.0), horizon_days=365)
+    assert forecast.difficulty_on_day(0) == DIFFICULTY
+    assert np.all(np.diff(forecast.epoch_difficulties[1:]) > 0)
+    # 一年约增长1.02^12倍
+    assert forecast.difficulty_on_day(364) / DIFFICULTY == pytest.approx(1.02 ** 12, rel=0.05)
+    assert len(forecast.daily_difficulty()) == 365
+
+
+def test_forecast_is_cached_and_rejects_unknown_growth_model():
+    first = get_difficulty_forecast(DIFFICULTY, tip_height=EPOCH_START + 10)
+    assert get_difficulty_forecast(DIFFICULTY, tip_height=EPOCH_START + 10) is first
+    assert get_difficulty_forecast(DIFFICULTY, tip_height=EPOCH_START + 20) is not first
+    with pytest.raises(ValueError):
+        get_difficulty_forecast(DIFFICULTY, growth='quadratic')
@@ -0,0 +1,107 @@
+import itertools
+import json
+import os
+
+import numpy as np
+import pytest
+
+from btc_mining_calculator import RESULT_FIELDS, BTCMiningCalculator
+from incremental import build_dashboard_graph, miner_row
+from miner_catalog import MINER_MODELS
+from parallel_sweep import ParallelSweepExecutor
+from results_store import run_grid_sweep
+from roi_assertions import assert_results_close, offline_scalar, scalar_columns
+
+# 由scripts/record_golden.py录制，修改矿机参数表或计算公式后需重新录制
+GOLDEN_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'golden', 'roi_golden.json')
+
+with open(GOLDEN_PATH, encoding='utf-8') as _f:
+    GOLDEN = json.load(_f)
+
+SNAPSHOTS = {snapshot['name']: snapshot for snapshot in GOLDEN['snapshots']}
+
+
+def _inputs():
+    return {name: np.array(values, dtype=np.float64) for name, values in GOLDEN['inputs'].items()}
+
+
+def _expected(snapshot_name):
+    # 录制文件中无法回本的回本天数为null
+    return {name: np.array([np.inf if v is None else v for v in GOLDEN['expected'][f"{snapshot_name}.{name}"]],
+                           dtype=np.float64)
+            for name in RESULT_FIELDS}
+
+
+def test_catalog_matches_recording():
+    changed = [name for name, specs in GOLDEN['catalog'].items() if MINER_MODELS.get(name) != specs]
+    assert not changed, f"矿机参数与录制时不一致，请运行scripts/record_golden.py重新录制: {changed}"
+
+
+@pytest.mark.parametrize('snapshot_name', SNAPSHOTS)
+def test_scalar_matches_golden(snapshot_name):
+    snapshot = SNAPSHOTS[snapshot_name]
+    calculator = BTCMiningCalculator()
+    inputs = _inputs()
+    results = [offline_scalar(calculator, snapshot, snapshot['block_reward'],
+                              **{name: float(values[i]) for name, values in inputs.items()})
+               for i in range(len(inputs['hashrate_th']))]
+    assert_results_close(scalar_columns(results), _expected(snapshot_name), label=f"{snapshot_name} 标量: ")
+
+
+@pytest.mark.parametrize('snapshot_name', SNAPSHOTS)
+def test_batch_matches_golden(snapshot_name):
+    snapshot = SNAPSHOTS[snapshot_name]
+    result = BTCMiningCalculator().calculate_roi_batch(block_reward=snapshot['block_reward'], snapshot=snapshot,
+                                                       **_inputs())
+    assert_results_close(result, _expected(snapshot_name), label=f"{snapshot_name} 批量: ")
+
+
+@pytest.mark.parametrize('snapshot_name', SNAPSHOTS)
+def test_parallel_matches_golden(snapshot_name):
+    snapshot = SNAPSHOTS[snapshot_name]
+    # 强制使用进程池和多个任务块，覆盖共享内存和结果合并
+    executor = ParallelSweepExecutor(max_workers=2, min_parallel_size=1, max_chunk_size=50)
+    result = executor.evaluate(snapshot, block_reward=snapshot['block_reward'], **_inputs())
+    assert_results_close(result, _expected(snapshot_name), label=f"{snapshot_name} 多进程: ")
+
+
+@pytest.mark.parametrize('snapshot_name', SNAPSHOTS)
+def test_grid_paths_match_golden(snapshot_name, tmp_path):
+    snapshot = SNAPSHOTS[snapshot_name]
+    fixed = dict(GOLDEN['fixed'], block_reward=snapshot['block_reward'])
+    expected = _expected(snapshot_name)
+
+    grid = ParallelSweepExecutor(max_workers=1).evaluate_grid(GOLDEN['axes'], snapshot, **fixed)
+    assert_results_close(grid, expected, label=f"{snapshot_name} 网格: ")
+
+    store = run_grid_sweep(BTCMiningCalculator(), str(tmp_path / 'sweep'), GOLDEN['axes'], snapshot,
+                           fields=list(RESULT_FIELDS), chunk_size=37, **fixed)
+    with store:
+        assert_results_close({name: store[name] for name in RESULT_FIELDS}, expected,
+                             label=f"{snapshot_name} 网格落盘: ")
+
+
+@pytest.mark.parametrize('snapshot_name', SNAPSHOTS)
+def test_incremental_graph_matches_golden(snapshot_name):
+    snapshot = SNAPSHOTS[snapshot_name]
+    axes = GOLDEN['axes']
+    expected = _expected(snapshot_name)
+    graph = build_dashboard_graph()
+    rows = [miner_row(name, MINER_MODELS[name]) for name in axes['model']]
+    # 录制顺序中model为第一个轴，其余轴的每个组合对应一组步长为组合数的场景
+    others = [name for name in axes if name != 'model']
+    for offset, combination in enumerate(itertools.product(*(axes[name] for name in others))):
+        params = dict(zip(others, combination))
+        results = graph.evaluate('comparison', rows, {
+            'snapshot': snapshot,
+            'block_reward': snapshot['block_reward'],
+            'pool_fee_percent': GOLDEN['fixed']['pool_fee_percent'],
+            'annual_utilization_rate': params['annual_utilization_rate'],
+            'electricity_cost_kwh': params['electricity_cost_kwh'],
+            'maintenance_percent': params['maintenance_percent'],
+            'depreciation_percent': GOLDEN['fixed']['depreciation_percent']
+        })
+        stride = len(expected['roi_days']) // len(rows)
+        assert_results_close(scalar_columns([results[row] for row in rows]),
+                             {name: values[offset::stride] for name, values in expected.items()},
+                             label=f"{snapshot_name} 计算图 {params}: ")
@@ -0,0 +1,23 @@
+import numpy as np
+import pytest
+
+from hosting import HostingContract, contract_arrays, effective_rate
+
+
+@pytest.mark.parametrize('fleet_kw, graduated_rate, volume_rate', [
+    (35.0, 0.07, 0.07),
+    (175.0, 0.07, 0.07),
+    (1000.0, 0.065, 0.06)
+])
+def test_first_tier_starting_above_zero_bills_power_below_it_at_first_rate(fleet_kw, graduated_rate, volume_rate):
+    tiers = [(100, 0.07), (500, 0.06)]
+    arrays = contract_arrays([HostingContract('graduated', tiers, 'graduated'), HostingContract('volume', tiers)])
+    rate = effective_rate(np.array([fleet_kw]), arrays['tier_starts'], arrays['tier_rates'], arrays['graduated'])
+    np.testing.assert_allclose(rate[0], [graduated_rate, volume_rate])
+
+
+def test_graduated_rate_with_padded_tiers():
+    arrays = contract_arrays([HostingContract('one tier', [(0, 0.05)], 'graduated'),
+                              HostingContract('three tiers', [(0, 0.08), (100, 0.07), (300, 0.06)], 'graduated')])
+    rate = effective_rate(np.array([400.0]), arrays['tier_starts'], arrays['tier_rates'], arrays['graduated'])
+    np.testing.assert_allclose(rate[0], [0.05, (100 * 0.08 + 200 * 0.07 + 100 * 0.06) / 400])
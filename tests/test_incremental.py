@@ -0,0 +1,52 @@
+from incremental import IncrementalGraph, build_dashboard_graph, miner_row
+from miner_catalog import MINER_MODELS
+
+SNAPSHOT = {'btc_price': 65000.0, 'network_difficulty': 8.6e13}
+INPUTS = {'snapshot': SNAPSHOT, 'block_reward': 3.125, 'pool_fee_percent': 2.0, 'annual_utilization_rate': 100.0,
+          'electricity_cost_kwh': 0.05, 'maintenance_percent': 6.0, 'depreciation_percent': 20.0}
+
+
+def _counting_graph(max_rows):
+    calls = []
+    graph = IncrementalGraph(max_rows)
+    graph.add_stage('double', ['scale'], lambda rows, params, upstream: calls.extend(rows) or
+                    [row * 2 * params['scale'] for row in rows])
+    graph.add_stage('plus', [], lambda rows, params, upstream: [v + 1 for v in upstream['double']],
+                    upstream=['double'])
+    return graph, calls
+
+
+def test_stage_cache_keeps_most_recently_used_rows():
+    graph, calls = _counting_graph(max_rows=3)
+    assert graph.evaluate('plus', [1, 2, 3], {'scale': 1}) == {1: 3, 2: 5, 3: 7}
+    graph.evaluate('plus', [1], {'scale': 1})
+    # 缓存已满，加入4时淘汰最久未使用的2
+    graph.evaluate('plus', [4], {'scale': 1})
+    assert all(len(cache) == 3 for cache in graph._cache.values())
+    calls.clear()
+    assert graph.evaluate('plus', [1, 3, 2], {'scale': 1}) == {1: 3, 3: 7, 2: 5}
+    assert calls == [2]
+    assert graph.last_recomputed == {'double': 1, 'plus': 1}
+
+
+def test_single_evaluation_larger_than_limit_keeps_its_rows():
+    graph, calls = _counting_graph(max_rows=2)
+    rows = list(range(5))
+    graph.evaluate('plus', rows, {'scale': 1})
+    calls.clear()
+    assert graph.evaluate('plus', rows, {'scale': 1}) == {row: row * 2 + 1 for row in rows}
+    assert calls == []
+    graph.evaluate('plus', [9], {'scale': 1})
+    assert all(len(cache) == 2 for cache in graph._cache.values())
+
+
+def test_dashboard_graph_stays_bounded_when_custom_row_keeps_changing():
+    graph = build_dashboard_graph(max_rows=20)
+    catalog = [miner_row(name, specs) for name, specs in MINER_MODELS.items()]
+    for cost in range(100):
+        custom = miner_row('Custom', dict(MINER_MODELS['Custom'], cost=4000.0 + cost))
+        graph.evaluate_many(['comparison', 'sweep'], [custom, *catalog], INPUTS)
+    assert max(len(cache) for cache in graph._cache.values()) == 20
+    # 目录中的型号一直在使用，不会被淘汰
+    graph.evaluate_many(['comparison', 'sweep'], catalog, INPUTS)
+    assert sum(graph.last_recomputed.values()) == 0
@@ -0,0 +1,54 @@
+import math
+
+import numpy as np
+import pytest
+
+from btc_mining_calculator import BTCMiningCalculator
+from lifecycle import DAYS_PER_YEAR, LifecycleModel, compare_used_vs_new
+
+SNAPSHOT = {'btc_price': 100000.0, 'network_difficulty': 8.6e13}
+MODELS = ['Antminer S21 pro', 'Antminer S19k Pro', 'Whatsminer M50S']
+
+
+def test_weibull_survival_at_scale_parameter():
+    model = LifecycleModel(failure_rate_percent_yearly=10.0, failure_shape=1.5)
+    # S(t) = exp(-(t/η)^β)，第一年故障概率为10%时 η = (-ln 0.9)^(-1/β) 年
+    scale_days = (-math.log(0.9)) ** (-1 / 1.5) * DAYS_PER_YEAR
+    assert model.survival(scale_days) == pytest.approx(math.exp(-1), rel=1e-12)
+    assert model.survival(DAYS_PER_YEAR) == pytest.approx(0.9, rel=1e-12)
+    assert model.survival(0) == 1.0
+    assert np.all(np.diff(model.survival(np.arange(0, 3000, 100))) < 0)
+
+
+def test_without_failures_or_decay_matches_batch_roi():
+    model = LifecycleModel(hashrate_decay_percent_yearly=0.0, failure_rate_percent_yearly=0.0,
+                           service_life_years=10.0)
+    calculator = BTCMiningCalculator()
+    params = dict(hashrate_th=[234.0, 120.0], power_watts=[3510.0, 2760.0], electricity_cost_kwh=0.05,
+                  pool_fee_percent=2.0, maintenance_cost_yearly=[224.0, 80.0], block_reward=3.125,
+                  annual_utilization_rate=90.0, snapshot=SNAPSHOT)
+    lifecycle = calculator.calculate_lifecycle_batch(purchase_price=[3744.0, 840.0], horizon_days=400,
+                                                     lifecycle=model, **params)
+    batch = calculator.calculate_roi_batch(hardware_cost=[3744.0, 840.0], **params)
+    days = np.arange(1, 401)
+    np.testing.assert_allclose(lifecycle['cumulative_profit_usd'], batch['daily_profit_usd'][:, None] * days,
+                               rtol=1e-12)
+    # 不计残值时回本天数为按天向上取整的roi_days
+    np.testing.assert_array_equal(lifecycle['payback_days'], np.ceil(batch['roi_days']))
+
+
+def test_cheap_used_unit_beats_new_unit():
+    calculator = BTCMiningCalculator()
+    model = LifecycleModel(resale_floor_percent=0.0)
+    kwargs = dict(models=MODELS, lifecycle=model, horizon_days=2 * DAYS_PER_YEAR, used_age_years=2.0,
+                  block_reward=3.125)
+    names, cheap = compare_used_vs_new(calculator, SNAPSHOT, 0.05, used_price_percent=10.0, **kwargs)
+    assert names == MODELS
+    assert np.all(cheap['new']['total_profit_usd'] > 0)
+    assert np.all(cheap['used']['roi_percent'] > cheap['new']['roi_percent'])
+    assert np.all(cheap['used']['payback_days'] < cheap['new']['payback_days'])
+
+    # 二手机与新机同价时，算力衰减和故障率使二手机更差
+    _, same_price = compare_used_vs_new(calculator, SNAPSHOT, 0.05, used_price_percent=100.0, **kwargs)
+    assert np.all(same_price['used']['net_return_usd'] < same_price['new']['net_return_usd'])
+    np.testing.assert_array_equal(same_price['new']['net_return_usd'], cheap['new']['net_return_usd'])
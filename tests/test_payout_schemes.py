@@ -0,0 +1,87 @@
+import math
+
+import numpy as np
+import pytest
+
+from btc_mining_calculator import BTCMiningCalculator
+from payout_schemes import (PAYOUT_SCHEMES, PayoutScheme, days_until_first_block, payout_distribution,
+                            scheme_roi_params, simulate_payouts)
+
+DIFFICULTY = 8.6e13
+BTC_PRICE = 65000.0
+BLOCK_REWARD = 3.125 + 0.2
+POOL_TH = 2e6
+# 自己挖矿30天的期望出块数约为0.7和2.1，泊松分布的波动和收益为0的概率都明显
+HASHRATES = np.array([1e5, 3e5])
+NETWORK_TH = DIFFICULTY * 2**32 / 600 / 1e12
+
+
+def _blocks(hashrate_th, days=30):
+    return hashrate_th / NETWORK_TH * 144 * days
+
+
+def test_solo_distribution_matches_poisson():
+    keep = 1 - PAYOUT_SCHEMES['SOLO'].pool_fee_percent / 100
+    result = payout_distribution(HASHRATES, 'SOLO', DIFFICULTY, BTC_PRICE, BLOCK_REWARD, days=30)
+    blocks = _blocks(HASHRATES)
+    np.testing.assert_allclose(result['expected_btc'], blocks * BLOCK_REWARD * keep, rtol=1e-12)
+    np.testing.assert_allclose(result['std_btc'], np.sqrt(blocks) * BLOCK_REWARD * keep, rtol=1e-12)
+    np.testing.assert_allclose(result['prob_zero'], np.exp(-blocks), rtol=1e-12)
+    np.testing.assert_allclose(result['expected_usd'], result['expected_btc'] * BTC_PRICE, rtol=1e-12)
+
+
+def test_pplns_distribution_matches_poisson_of_pool_blocks():
+    keep = 1 - PAYOUT_SCHEMES['PPLNS'].pool_fee_percent / 100
+    result = payout_distribution(HASHRATES, 'PPLNS', DIFFICULTY, BTC_PRICE, BLOCK_REWARD, days=30,
+                                 pool_hashrate_th=POOL_TH)
+    pool_blocks = _blocks(POOL_TH)
+    share = HASHRATES / POOL_TH
+    np.testing.assert_allclose(result['expected_btc'], _blocks(HASHRATES) * BLOCK_REWARD * keep, rtol=1e-12)
+    np.testing.assert_allclose(result['std_btc'], np.sqrt(pool_blocks) * share * BLOCK_REWARD * keep, rtol=1e-12)
+    np.testing.assert_allclose(result['prob_zero'], np.exp(-pool_blocks), rtol=1e-12)
+
+
+@pytest.mark.parametrize('scheme', ['SOLO', 'PPLNS', 'PPS+'])
+def test_simulation_matches_analytic_values(scheme):
+    analytic = payout_distribution(HASHRATES, scheme, DIFFICULTY, BTC_PRICE, BLOCK_REWARD, days=30,
+                                   pool_hashrate_th=POOL_TH)
+    # chunk_size小于samples时每块只有一个算力水平，分块循环执行多次
+    kwargs = dict(days=30, pool_hashrate_th=POOL_TH, samples=40000, seed=7, chunk_size=10000)
+    simulated = simulate_payouts(HASHRATES, scheme, DIFFICULTY, BTC_PRICE, BLOCK_REWARD, **kwargs)
+    np.testing.assert_allclose(simulated['mean_usd'], analytic['expected_usd'], rtol=0.03)
+    np.testing.assert_allclose(simulated['std_usd'], analytic['std_usd'], rtol=0.03)
+    np.testing.assert_allclose(simulated['prob_zero'], analytic['prob_zero'], atol=0.01)
+    assert np.all(np.diff(simulated['percentiles'], axis=1) >= 0)
+
+    again = simulate_payouts(HASHRATES, scheme, DIFFICULTY, BTC_PRICE, BLOCK_REWARD, **kwargs)
+    np.testing.assert_array_equal(again['percentiles'], simulated['percentiles'])
+
+
+def test_fpps_expected_revenue_matches_batch_roi():
+    params = scheme_roi_params('FPPS', BLOCK_REWARD)
+    assert params == {'block_reward': BLOCK_REWARD, 'pool_fee_percent': 2.5}
+    batch = BTCMiningCalculator().calculate_roi_batch(
+        HASHRATES, 3500.0, 0.05, 4000.0, annual_utilization_rate=80.0,
+        snapshot={'btc_price': BTC_PRICE, 'network_difficulty': DIFFICULTY}, **params)
+    result = payout_distribution(HASHRATES, 'FPPS', DIFFICULTY, BTC_PRICE, BLOCK_REWARD, days=30,
+                                 annual_utilization_rate=80.0)
+    np.testing.assert_allclose(result['expected_usd'], batch['daily_revenue_usd'] * 30, rtol=1e-12)
+    np.testing.assert_array_equal(result['std_usd'], 0.0)
+    np.testing.assert_array_equal(result['prob_zero'], 0.0)
+
+
+def test_pps_excludes_transaction_fees():
+    assert scheme_roi_params('PPS', BLOCK_REWARD)['block_reward'] == 3.125
+
+
+def test_days_until_first_block():
+    days = days_until_first_block(HASHRATES, DIFFICULTY, probability=0.5)
+    np.testing.assert_allclose(np.exp(-_blocks(HASHRATES, days)), 0.5, rtol=1e-12)
+    assert math.isinf(days_until_first_block(0.0, DIFFICULTY))
+
+
+def test_unknown_share_mode_is_rejected():
+    with pytest.raises(ValueError):
+        PayoutScheme('x', 1, 'bogus', 'pps')
+    with pytest.raises(KeyError):
+        payout_distribution(HASHRATES, 'bogus', DIFFICULTY, BTC_PRICE, BLOCK_REWARD)
@@ -0,0 +1,112 @@
+import json
+import os
+import time
+
+import pytest
+import requests
+
+from price_aggregator import FXRates, PriceAggregator, reject_outliers
+
+# 各来源在USD/USDT报价下返回的数据格式
+RESPONSES = {
+    'api.binance.com': lambda price: {'price': str(price)},
+    'api.coingecko.com': lambda price: {'bitcoin': {'usd': price}},
+    'www.okx.com': lambda price: {'data': [{'last': str(price)}]},
+    'api.kraken.com': lambda price: {'result': {'XXBTZUSD': {'c': [str(price), '1']}}}
+}
+
+
+class _Response:
+    def __init__(self, status_code, payload=None):
+        self.status_code = status_code
+        self.payload = payload
+
+    def json(self):
+        return self.payload
+
+
+def _fake_market(monkeypatch, prices):
+    """
+    按主机名返回预设价格，价格为None的来源返回500；记录请求过的URL
+    """
+    requested = []
+
+    def get(url, timeout=None):
+        requested.append(url)
+        host = url.split('/')[2]
+        if host not in prices:
+            raise AssertionError(f"意外的请求: {url}")
+        if prices[host] is None:
+            return _Response(500)
+        if callable(prices[host]):
+            return prices[host]()
+        return _Response(200, RESPONSES[host](prices[host]))
+
+    monkeypatch.setattr(requests, 'get', get)
+    return requested
+
+
+@pytest.fixture
+def fx_rates(tmp_path):
+    return FXRates(cache_path=str(tmp_path / '.cache' / 'fx_rates.json'))
+
+
+def test_outlier_rejected_when_mad_is_zero():
+    median, keep = reject_outliers([65000.0, 65000.0, 65000.0, 70000.0])
+    assert median == 65000.0
+    assert keep == [True, True, True, False]
+    # 在最小容忍偏差以内的报价保留
+    assert reject_outliers([65000.0, 65000.0, 65000.0, 65030.0])[1] == [True] * 4
+
+
+def test_aggregator_drops_outlier_with_identical_quotes(monkeypatch, fx_rates):
+    _fake_market(monkeypatch, {'api.binance.com': 65000.0, 'api.coingecko.com': 65000.0,
+                               'www.okx.com': 65000.0, 'api.kraken.com': 90000.0})
+    result = PriceAggregator(fx_rates=fx_rates).get_price('USD')
+    assert result.price == 65000.0 and result.median == 65000.0
+    assert result.rejected_sources == ['kraken']
+
+
+def test_weighted_price_when_one_source_fails(monkeypatch, fx_rates):
+    _fake_market(monkeypatch, {'api.binance.com': 65000.0, 'api.coingecko.com': None,
+                               'www.okx.com': 65020.0, 'api.kraken.com': 65010.0})
+    aggregator = PriceAggregator(weights={'binance': 2.0, 'kraken': 0.0}, fx_rates=fx_rates)
+    result = aggregator.get_price('USD')
+    assert [q.source for q in result.quotes] == ['binance', 'okx', 'kraken']
+    assert result.accepted_sources == ['binance', 'okx', 'kraken']
+    assert result.median == 65010.0
+    # 权重为0的来源只参与异常判断
+    assert result.price == pytest.approx((65000.0 * 2 + 65020.0) / 3)
+
+
+def test_all_sources_failing_returns_none(monkeypatch, fx_rates):
+    _fake_market(monkeypatch, {host: None for host in RESPONSES})
+    assert PriceAggregator(fx_rates=fx_rates).get_price('USD') is None
+
+
+def test_fx_cache_is_used_until_it_expires(monkeypatch, fx_rates):
+    path = fx_rates.cache_path
+    fx_rates.ttl_seconds = 60
+    fetched = {'rates': {'USD': 1, 'EUR': 0.9}, 'result': 'success'}
+    requested = _fake_market(monkeypatch, {'open.er-api.com': lambda: _Response(200, fetched)})
+
+    # 缓存未过期时不请求汇率API
+    os.makedirs(os.path.dirname(path))
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'rates': {'USD': 1.0, 'EUR': 0.8}, 'fetched_at': time.time() - 30}, f)
+    assert fx_rates.convert(100.0, 'USD', 'EUR') == pytest.approx(80.0)
+    assert requested == []
+
+    # 过期后重新获取并写回缓存文件
+    fx_rates._fetched_at -= 60
+    assert fx_rates.convert(100.0, 'USDT', 'EUR') == pytest.approx(90.0)
+    assert len(requested) == 1
+    with open(path, encoding='utf-8') as f:
+        assert json.load(f)['rates']['EUR'] == 0.9
+
+    # 再次过期且API失败时继续使用过期的汇率
+    fx_rates._fetched_at -= 120
+    requested.clear()
+    monkeypatch.setattr(requests, 'get', lambda url, timeout=None: requested.append(url) or _Response(503))
+    assert fx_rates.convert(100.0, 'USD', 'EUR') == pytest.approx(90.0)
+    assert len(requested) == 1
@@ -0,0 +1,94 @@
+import numpy as np
+import pytest
+from hypothesis import HealthCheck, given, settings
+from hypothesis import strategies as st
+
+from btc_mining_calculator import BTCMiningCalculator
+from parallel_sweep import ParallelSweepExecutor
+from roi_assertions import ATOL, RTOL, assert_results_close, offline_scalar, scalar_columns
+
+
+def _finite(low, high):
+    return st.floats(min_value=low, max_value=high, allow_nan=False, allow_infinity=False)
+
+
+snapshots = st.fixed_dictionaries({
+    'btc_price': _finite(1000.0, 500000.0),
+    'network_difficulty': _finite(1e12, 5e14)
+})
+
+scenarios = st.fixed_dictionaries({
+    'hashrate_th': _finite(0.1, 2000.0),
+    'power_watts': _finite(10.0, 12000.0),
+    'electricity_cost_kwh': _finite(0.0, 0.3),
+    'hardware_cost': _finite(0.0, 30000.0),
+    'pool_fee_percent': _finite(0.0, 10.0),
+    'maintenance_cost_yearly': _finite(0.0, 5000.0),
+    'hardware_depreciation_yearly': _finite(0.0, 10000.0),
+    'annual_utilization_rate': _finite(1.0, 100.0)
+})
+
+block_rewards = _finite(0.5, 6.25)
+
+
+def _columns(scenario_list):
+    return {name: np.array([s[name] for s in scenario_list], dtype=np.float64) for name in scenario_list[0]}
+
+
+@pytest.fixture(scope='module')
+def parallel_executor():
+    # 强制使用进程池，每块最多3个场景，保证多个任务块
+    return ParallelSweepExecutor(max_workers=2, min_parallel_size=1, max_chunk_size=3)
+
+
+@settings(max_examples=100, deadline=None)
+@given(snapshot=snapshots, block_reward=block_rewards, scenario_list=st.lists(scenarios, min_size=1, max_size=20))
+def test_batch_matches_scalar(snapshot, block_reward, scenario_list):
+    calculator = BTCMiningCalculator()
+    scalar = scalar_columns([offline_scalar(calculator, snapshot, block_reward, **s) for s in scenario_list])
+    batch = calculator.calculate_roi_batch(block_reward=block_reward, snapshot=snapshot, **_columns(scenario_list))
+    assert_results_close(batch, scalar, label="批量 vs 标量: ")
+
+
+@settings(max_examples=15, deadline=None, suppress_health_check=[HealthCheck.function_scoped_fixture])
+@given(snapshot=snapshots, block_reward=block_rewards, scenario_list=st.lists(scenarios, min_size=1, max_size=20))
+def test_parallel_matches_batch(parallel_executor, snapshot, block_reward, scenario_list):
+    columns = _columns(scenario_list)
+    batch = BTCMiningCalculator().calculate_roi_batch(block_reward=block_reward, snapshot=snapshot, **columns)
+    parallel = parallel_executor.evaluate(snapshot, block_reward=block_reward, **columns)
+    assert_results_close(parallel, batch, label="多进程 vs 批量: ")
+
+
+@settings(max_examples=100, deadline=None)
+@given(snapshot=snapshots, block_reward=block_rewards, scenario=scenarios,
+       prices=st.lists(_finite(0.0, 0.5), min_size=2, max_size=10))
+def test_profit_non_increasing_in_electricity_cost(snapshot, block_reward, scenario, prices):
+    prices = np.sort(np.array(prices))
+    params = dict(scenario, electricity_cost_kwh=prices)
+    result = BTCMiningCalculator().calculate_roi_batch(block_reward=block_reward, snapshot=snapshot, **params)
+    profit = result['daily_profit_usd']
+    assert np.all(np.diff(profit) <= ATOL + RTOL * np.abs(profit[:-1]))
+
+
+@settings(max_examples=100, deadline=None)
+@given(snapshot=snapshots, block_reward=block_rewards, scenario=scenarios, factor=_finite(0.1, 10.0))
+def test_revenue_proportional_to_hashrate(snapshot, block_reward, scenario, factor):
+    calculator = BTCMiningCalculator()
+    base = calculator.calculate_roi_batch(block_reward=block_reward, snapshot=snapshot, **scenario)
+    scaled = calculator.calculate_roi_batch(block_reward=block_reward, snapshot=snapshot,
+                                            **dict(scenario, hashrate_th=scenario['hashrate_th'] * factor))
+    np.testing.assert_allclose(scaled['daily_revenue_usd'], base['daily_revenue_usd'] * factor, rtol=RTOL, atol=ATOL)
+
+
+@settings(max_examples=100, deadline=None)
+@given(snapshot=snapshots, block_reward=block_rewards, scenario_list=st.lists(scenarios, min_size=1, max_size=20))
+def test_roi_days_consistent_with_profit(snapshot, block_reward, scenario_list):
+    result = BTCMiningCalculator().calculate_roi_batch(block_reward=block_reward, snapshot=snapshot,
+                                                       **_columns(scenario_list))
+    profit, roi_days = result['daily_profit_usd'], result['roi_days']
+    cost = _columns(scenario_list)['hardware_cost']
+    np.testing.assert_array_equal(np.isfinite(roi_days), profit > 0)
+    profitable = profit > 0
+    np.testing.assert_allclose(roi_days[profitable] * profit[profitable], cost[profitable], rtol=RTOL, atol=ATOL)
+    np.testing.assert_allclose(result['daily_profit_usd'],
+                               result['daily_revenue_usd'] - result['daily_total_cost_usd'], rtol=RTOL, atol=ATOL)
@@ -0,0 +1,30 @@
+import numpy as np
+import pytest
+
+from btc_mining_calculator import BTCMiningCalculator
+from results_store import run_grid_sweep
+
+SNAPSHOT = {'btc_price': 65000.0, 'network_difficulty': 8.6e13}
+
+AXES = {
+    'model': ['Antminer S21 pro', 'Antminer S21+', 'Custom'],
+    'electricity_cost_kwh': [0.03, 0.05, 0.07, 0.09],
+    'annual_utilization_rate': [100.0, 90.0, 80.0]
+}
+
+
+@pytest.mark.parametrize('fmt', ['npy', 'arrow'])
+def test_iter_field_chunks_are_zero_copy_views_matching_full_field(fmt, tmp_path):
+    if fmt == 'arrow':
+        pytest.importorskip('pyarrow')
+    store = run_grid_sweep(BTCMiningCalculator(), str(tmp_path / fmt), AXES, SNAPSHOT, fmt=fmt, chunk_size=10)
+    with store:
+        full = np.asarray(store['daily_profit_usd']).ravel()
+        chunks = list(store.iter_field_chunks('daily_profit_usd'))
+        assert chunks[-1][1] == full.size
+        for start, stop, values in chunks:
+            # 视图直接引用内存映射的文件，不拥有自己的数据
+            assert not values.flags.owndata and not values.flags.writeable
+            np.testing.assert_array_equal(values, full[start:stop])
+        if fmt == 'arrow':
+            assert [stop - start for start, stop, _ in chunks] == [10, 10, 10, 6]
@@ -0,0 +1,168 @@
+import json
+import re
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import requests
+
+from btc_mining_calculator import BTCMiningCalculator
+from incremental import build_dashboard_graph, miner_row
+from miner_catalog import MINER_MODELS
+from roi_service import MarketSnapshotHolder, ROIServer, rank_catalog
+
+SNAPSHOT = {'btc_price': 65000.0, 'network_difficulty': 8.6e13}
+
+SCENARIOS = ('{"hashrate_th": 1, "power_watts": 30, "electricity_cost_kwh": 0.06, "hardware_cost": 100}\n'
+             '{"hashrate_th": 200, "power_watts": 3500, "electricity_cost_kwh": 0.5, "hardware_cost": 4000}\n')
+
+
+@pytest.fixture
+def service():
+    server = ROIServer(('127.0.0.1', 0), snapshot=dict(SNAPSHOT), ttl_seconds=None, quiet=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def _lines(response):
+    assert response.status_code == 200
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+def test_roi_and_break_even_stream_full_precision(service):
+    expected = BTCMiningCalculator().calculate_roi_batch(
+        hashrate_th=[1.0, 200.0], power_watts=[30.0, 3500.0], electricity_cost_kwh=[0.06, 0.5],
+        hardware_cost=[100.0, 4000.0], snapshot=SNAPSHOT)
+    rows = _lines(requests.post(f"{service}/roi", data=SCENARIOS))
+    assert [row['daily_btc_full'] for row in rows] == expected['daily_btc_full'].tolist()
+    assert rows[1]['roi_days'] is None
+
+    break_even = BTCMiningCalculator().calculate_break_even_batch(
+        hashrate_th=[1.0, 200.0], power_watts=[30.0, 3500.0], snapshot=SNAPSHOT)
+    rows = _lines(requests.post(f"{service}/break-even", data=SCENARIOS))
+    assert [row['break_even_electricity_cost_kwh'] for row in rows] == break_even.tolist()
+
+
+def test_rank_catalog_matches_dashboard_graph():
+    ranking = rank_catalog(BTCMiningCalculator(), SNAPSHOT, 0.06, pool_fee_percent=2.0, maintenance_percent=6.0,
+                           depreciation_percent=20.0, annual_utilization_rate=75.0, block_reward=3.125)
+    rows = {name: miner_row(name, specs) for name, specs in MINER_MODELS.items()}
+    results = build_dashboard_graph().evaluate('comparison', list(rows.values()), {
+        'snapshot': SNAPSHOT, 'block_reward': 3.125, 'pool_fee_percent': 2.0, 'annual_utilization_rate': 75.0,
+        'electricity_cost_kwh': 0.06, 'maintenance_percent': 6.0, 'depreciation_percent': 20.0
+    })
+    for row in ranking:
+        page = results[rows[row['model']]]
+        assert row['maintenance_cost_yearly_usd'] == page.maintenance_cost_yearly_usd
+        assert row['hardware_depreciation_yearly_usd'] == page.hardware_depreciation_yearly_usd
+        assert row['daily_profit_usd'] == pytest.approx(page.daily_profit_usd, rel=1e-12)
+
+
+class _BlockingMarket:
+    """
+    get_market_snapshot阻塞到release()，按顺序返回预设的结果，记录调用次数
+    """
+
+    def __init__(self, *results):
+        self.results = list(results)
+        self.calls = 0
+        self.started = threading.Event()
+        self.released = threading.Event()
+
+    def release(self):
+        self.released.set()
+
+    def get_market_snapshot(self):
+        self.calls += 1
+        self.started.set()
+        assert self.released.wait(5)
+        return self.results.pop(0)
+
+
+def test_snapshot_refresh_does_not_block_readers_of_stale_snapshot():
+    fresh = {'btc_price': 70000.0, 'network_difficulty': 8.6e13}
+    market = _BlockingMarket(fresh)
+    holder = MarketSnapshotHolder(market, ttl_seconds=0, snapshot=dict(SNAPSHOT))
+    time.sleep(0.01)
+
+    # 第一个过期请求发起后台刷新，刷新期间所有请求立即得到旧快照
+    assert holder.get() == SNAPSHOT
+    assert market.started.wait(5)
+    assert [holder.get() for _ in range(5)] == [SNAPSHOT] * 5
+    assert market.calls == 1
+
+    market.release()
+    deadline = time.monotonic() + 5
+    while holder._refreshing and time.monotonic() < deadline:
+        time.sleep(0.01)
+    holder.ttl_seconds = None
+    assert holder.get() == fresh
+
+
+def test_failed_refresh_backs_off_and_keeps_stale_snapshot():
+    market = _BlockingMarket(None, None)
+    market.release()
+    holder = MarketSnapshotHolder(market, ttl_seconds=0, snapshot=dict(SNAPSHOT), retry_backoff_seconds=60)
+    time.sleep(0.01)
+    assert holder.get() == SNAPSHOT
+    deadline = time.monotonic() + 5
+    while holder._refreshing and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    # 退避期间不再请求外部API
+    assert [holder.get() for _ in range(10)] == [SNAPSHOT] * 10
+    assert market.calls == 1
+
+
+def test_concurrent_first_fetch_is_shared():
+    market = _BlockingMarket(dict(SNAPSHOT))
+    holder = MarketSnapshotHolder(market)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        futures = [pool.submit(holder.get) for _ in range(8)]
+        assert market.started.wait(5)
+        time.sleep(0.05)
+        market.release()
+        assert [f.result(5) for f in futures] == [SNAPSHOT] * 8
+    assert market.calls == 1
+
+
+def _post(path, body):
+    return (f"POST {path} HTTP/1.1\r\nHost: localhost\r\nContent-Length: {len(body)}\r\n\r\n{body}").encode()
+
+
+def test_unknown_path_drains_body_on_keep_alive_connection(service):
+    host, port = service.rsplit('/', 1)[1].split(':')
+    with socket.create_connection((host, int(port)), timeout=5) as sock:
+        # 两个请求连续发送在同一连接上，第二个请求必须被正常解析
+        sock.sendall(_post('/unknown', SCENARIOS) + _post('/snapshot-missing', ''))
+        data = b''
+        while data.count(b'HTTP/1.1 ') < 2:
+            chunk = sock.recv(65536)
+            if not chunk:
+                break
+            data += chunk
+    assert re.findall(rb'HTTP/1\.1 (\d+)', data) == [b'404', b'404']
+
+
+
+def test_roi_parse_error_drains_body_and_reports_failing_line(service):
+    host, port = service.rsplit('/', 1)[1].split(':')
+    lines = SCENARIOS.splitlines()
+    body = '\n'.join([lines[0], '{"hashrate_th": 1, "power_watts":', lines[1], lines[0]]) + '\n'
+    with socket.create_connection((host, int(port)), timeout=5) as sock:
+        sock.sendall(_post('/roi', body) + b"GET /snapshot HTTP/1.1\r\nHost: localhost\r\n\r\n")
+        data = b''
+        while b'network_difficulty' not in data:
+            chunk = sock.recv(65536)
+            if not chunk:
+                break
+            data += chunk
+    assert re.findall(rb'HTTP/1\.1 (\d+)', data) == [b'200', b'200']
+    error = json.loads(re.search(rb'\{"error".*\}', data).group())
+    assert error['line'] == 2
+    assert json.loads(data[data.rindex(b'\r\n\r\n') + 4:]) == SNAPSHOT
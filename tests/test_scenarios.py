@@ -0,0 +1,92 @@
+import math
+
+import pytest
+
+from btc_mining_calculator import BTCMiningCalculator
+from incremental import build_dashboard_graph, miner_row
+from miner_catalog import MINER_MODELS
+from roi_assertions import offline_scalar
+from scenarios import ScenarioComparer
+
+SNAPSHOT = {'btc_price': 65000.0, 'network_difficulty': 8.6e13}
+MODEL = 'Antminer S21 pro'
+SPECS = MINER_MODELS[MODEL]
+
+BASELINE = {
+    'hashrate_th': SPECS['hashrate'],
+    'power_watts': SPECS['power'],
+    'electricity_cost_kwh': 0.05,
+    'hardware_cost': SPECS['cost'],
+    'pool_fee_percent': 2.0,
+    'block_reward': 3.125,
+    'annual_utilization_rate': 90.0
+}
+
+
+def test_variant_deltas_and_percent_changes():
+    calculator = BTCMiningCalculator()
+    diff = ScenarioComparer(calculator).compare(BASELINE, {
+        '电费+0.01': {'electricity_cost_kwh': 0.06},
+        '利用率与手续费': {'annual_utilization_rate': 80.0, 'pool_fee_percent': 1.0}
+    }, SNAPSHOT)
+    scalar = offline_scalar(calculator, SNAPSHOT, **BASELINE)
+    assert diff.baseline.daily_profit_usd == pytest.approx(scalar.daily_profit_usd, rel=1e-12)
+    for name, overrides in (('电费+0.01', {'electricity_cost_kwh': 0.06}),
+                            ('利用率与手续费', {'annual_utilization_rate': 80.0, 'pool_fee_percent': 1.0})):
+        expected = offline_scalar(calculator, SNAPSHOT, **{**BASELINE, **overrides})
+        assert diff.variants[name].daily_profit_usd == pytest.approx(expected.daily_profit_usd, rel=1e-12)
+        delta = expected.daily_profit_usd - diff.baseline.daily_profit_usd
+        assert diff.deltas[name]['daily_profit_usd'] == pytest.approx(delta, rel=1e-9)
+        assert diff.percent_changes[name]['daily_profit_usd'] == pytest.approx(
+            delta / abs(diff.baseline.daily_profit_usd) * 100, rel=1e-9)
+
+    rows = diff.to_rows(fields=('daily_profit_usd',))
+    assert [row['variant'] for row in rows] == ['电费+0.01', '利用率与手续费']
+    assert rows[0]['delta'] == diff.deltas['电费+0.01']['daily_profit_usd']
+
+
+def test_percent_change_is_nan_when_baseline_is_zero():
+    diff = ScenarioComparer(BTCMiningCalculator()).compare(BASELINE, {'折旧': {'hardware_depreciation_yearly': 365.0}},
+                                                           SNAPSHOT)
+    assert diff.deltas['折旧']['daily_depreciation_usd'] == pytest.approx(1.0)
+    assert math.isnan(diff.percent_changes['折旧']['daily_depreciation_usd'])
+
+
+def test_baseline_cache_hits_and_lru_eviction():
+    comparer = ScenarioComparer(BTCMiningCalculator(), cache_size=2)
+    cheap, pricey = dict(BASELINE, electricity_cost_kwh=0.04), dict(BASELINE, electricity_cost_kwh=0.08)
+    first = comparer.baseline(BASELINE, SNAPSHOT)
+    comparer.baseline(cheap, SNAPSHOT)
+    # 补全默认值后相同的参数命中缓存
+    assert comparer.baseline(dict(BASELINE, maintenance_cost_yearly=0.0), SNAPSHOT) is first
+    assert (comparer.baseline_hits, comparer.baseline_misses) == (1, 2)
+
+    # 缓存已满，最久未使用的cheap被淘汰，BASELINE刚被使用而保留
+    comparer.baseline(pricey, SNAPSHOT)
+    assert comparer.baseline(BASELINE, SNAPSHOT) is first
+    comparer.baseline(cheap, SNAPSHOT)
+    assert (comparer.baseline_hits, comparer.baseline_misses) == (2, 4)
+
+    # 市场快照不同时不命中
+    comparer.baseline(BASELINE, dict(SNAPSHOT, btc_price=70000.0))
+    assert comparer.baseline_misses == 5
+
+
+def test_hardware_cost_variant_rederives_fixed_costs_like_the_page():
+    baseline = dict(BASELINE, maintenance_percent=6.0, depreciation_percent=20.0, efficiency=SPECS['efficiency'])
+    diff = ScenarioComparer(BTCMiningCalculator()).compare(baseline, {
+        '涨价': {'hardware_cost': 5000.0},
+        '固定维护': {'hardware_cost': 5000.0, 'maintenance_cost_yearly': 100.0}
+    }, SNAPSHOT)
+
+    graph = build_dashboard_graph()
+    inputs = {'snapshot': SNAPSHOT, 'block_reward': 3.125, 'pool_fee_percent': 2.0, 'annual_utilization_rate': 90.0,
+              'electricity_cost_kwh': 0.05, 'maintenance_percent': 6.0, 'depreciation_percent': 20.0}
+    for result, cost in ((diff.baseline, SPECS['cost']), (diff.variants['涨价'], 5000.0)):
+        page = graph.evaluate('comparison', [miner_row(MODEL, dict(SPECS, cost=cost))], inputs)
+        assert result == next(iter(page.values()))
+
+    assert diff.deltas['涨价']['daily_maintenance_cost_usd'] > 0
+    assert diff.deltas['涨价']['daily_depreciation_usd'] > 0
+    assert diff.variants['固定维护'].maintenance_cost_yearly_usd == 100.0
+    assert diff.variants['固定维护'].hardware_depreciation_yearly_usd == 1000.0
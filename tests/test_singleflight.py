@@ -0,0 +1,126 @@
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from btc_mining_calculator import BTCMiningCalculator
+from singleflight import SingleFlight
+
+CALLERS = 16
+STUB_DELAY_SECONDS = 0.3
+
+
+class SlowMarketStub(ThreadingHTTPServer):
+    """
+    本地的慢速行情接口：/price返回Binance格式的价格，/difficulty返回难度文本，记录每个路径的请求次数
+    """
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), _StubHandler)
+        self.counts = {}
+        self.counts_lock = threading.Lock()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        with self.server.counts_lock:
+            self.server.counts[self.path] = self.server.counts.get(self.path, 0) + 1
+        time.sleep(STUB_DELAY_SECONDS)
+        if self.path == '/price':
+            body = json.dumps({'symbol': 'BTCUSDT', 'price': '65000.00'}).encode()
+        else:
+            body = b'86000000000000.0'
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def stub():
+    server = SlowMarketStub()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _calculator(stub):
+    calculator = BTCMiningCalculator()
+    calculator.binance_api_url = f"{stub.url}/price"
+    calculator.coingecko_api_url = f"{stub.url}/coingecko"
+    calculator.okx_api_url = f"{stub.url}/okx"
+    calculator.difficulty_api_url = f"{stub.url}/difficulty"
+    return calculator
+
+
+def _call_concurrently(func, count=CALLERS):
+    barrier = threading.Barrier(count)
+
+    def run(_):
+        barrier.wait()
+        return func()
+
+    with ThreadPoolExecutor(max_workers=count) as pool:
+        return list(pool.map(run, range(count)))
+
+
+def test_concurrent_price_requests_share_one_upstream_call(stub):
+    # 每个调用方使用独立的计算器实例，模拟多个Streamlit会话
+    calculators = [_calculator(stub) for _ in range(CALLERS)]
+    prices = _call_concurrently(lambda: calculators.pop().get_btc_price())
+    assert prices == [65000.0] * CALLERS
+    assert stub.counts == {'/price': 1}
+
+
+def test_concurrent_difficulty_requests_share_one_upstream_call(stub):
+    calculator = _calculator(stub)
+    difficulties = _call_concurrently(calculator.get_network_difficulty)
+    assert difficulties == [86000000000000.0] * CALLERS
+    assert stub.counts == {'/difficulty': 1}
+
+
+def test_sequential_requests_are_not_coalesced(stub):
+    calculator = _calculator(stub)
+    calculator.get_network_difficulty()
+    calculator.get_network_difficulty()
+    assert stub.counts == {'/difficulty': 2}
+
+
+def test_waiters_receive_leader_exception():
+    flight = SingleFlight()
+    started = threading.Event()
+    calls = []
+
+    def failing():
+        calls.append(1)
+        started.set()
+        time.sleep(STUB_DELAY_SECONDS)
+        raise ValueError("upstream failed")
+
+    def call():
+        try:
+            flight.do('key', failing)
+        except ValueError as e:
+            return str(e)
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        leader = pool.submit(call)
+        started.wait()
+        followers = [pool.submit(call) for _ in range(3)]
+        results = [leader.result()] + [f.result() for f in followers]
+    assert results == ["upstream failed"] * 4
+    assert len(calls) == 1
+    assert not flight.in_flight('key')
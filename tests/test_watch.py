@@ -0,0 +1,105 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+from btc_mining_calculator import BTCMiningCalculator
+from watch import FileSink, FleetConfig, FleetWatcher, price_url_source
+
+MODEL = 'Antminer S21 pro'
+DIFFICULTY = 1.2e14
+
+
+class _StubMarket:
+    """
+    按顺序返回预设的BTC价格，None表示获取失败
+    """
+
+    def __init__(self, prices):
+        self.prices = list(prices)
+
+    def __call__(self):
+        price = self.prices.pop(0)
+        return None if price is None else {'btc_price': price, 'network_difficulty': DIFFICULTY}
+
+
+def _watcher(prices, **kwargs):
+    # 电价0.06时约4万美元跌破盈亏平衡，约7万美元回本天数超过720天
+    fleet = FleetConfig({MODEL: 10}, electricity_cost_kwh=0.06, block_reward=3.125, payback_limit_days=720)
+    alerts = []
+    watcher = FleetWatcher(BTCMiningCalculator(), fleet, sinks=[alerts.append], source=_StubMarket(prices),
+                           **kwargs)
+    return watcher, alerts
+
+
+def test_alerts_once_per_crossing_and_on_recovery():
+    prices = [100000, 60000, 61000, 59000, 30000, 29000, 31000, 100000, 150000, 100000]
+    expected = [[], ['payback_exceeded'], [], [], ['below_break_even'], [], [],
+                ['above_break_even', 'payback_recovered'], [], []]
+    watcher, alerts = _watcher(prices)
+    for kinds in expected:
+        assert [alert.kind for alert in watcher.poll_once()] == kinds
+    assert [alert.kind for alert in alerts] == ['payback_exceeded', 'below_break_even',
+                                                'above_break_even', 'payback_recovered']
+    assert watcher.evaluations == len(prices)
+    below = alerts[1]
+    assert below.model == MODEL and below.btc_price == 30000 and below.daily_profit_usd < 0
+    assert below.fleet_daily_profit_usd == pytest.approx(below.daily_profit_usd * 10)
+
+
+def test_small_moves_are_not_recomputed():
+    # 0.3%的变化低于0.5%的阈值，即使累计变化超过阈值也以上次计算时的价格为基准
+    watcher, alerts = _watcher([100000, 100300, 100450, 100600, None, 100600])
+    watcher.poll_once()
+    assert watcher.last_recomputed['comparison'] == 1
+    for _ in range(2):
+        assert watcher.poll_once() == []
+        assert watcher.last_recomputed == {}
+    assert watcher.evaluations == 1
+
+    watcher.poll_once()
+    assert watcher.evaluations == 2 and watcher.last_snapshot['btc_price'] == 100600
+    # 只有依赖市场数据的阶段重算
+    assert watcher.last_recomputed.get('fixed_cost', 0) == 0 and watcher.last_recomputed['revenue'] == 1
+
+    assert watcher.poll_once() == [] and watcher.last_recomputed == {}
+    assert watcher.poll_once() == [] and watcher.evaluations == 2
+    assert alerts == []
+
+
+def test_first_evaluation_alerts_when_already_unprofitable(tmp_path):
+    watcher, alerts = _watcher([30000, 30000])
+    watcher.sinks.append(FileSink(str(tmp_path / 'alerts.jsonl')))
+    assert [alert.kind for alert in watcher.poll_once()] == ['below_break_even', 'payback_exceeded']
+    assert watcher.poll_once() == []
+    with open(tmp_path / 'alerts.jsonl', encoding='utf-8') as f:
+        records = [json.loads(line) for line in f]
+    assert [r['kind'] for r in records] == ['below_break_even', 'payback_exceeded']
+    assert records[0]['roi_days'] is None
+
+
+def test_price_url_source_does_not_fall_back(monkeypatch):
+    requested = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            requested.append(self.path)
+            self.send_response(500)
+            self.end_headers()
+
+        def log_message(self, format, *args):
+            pass
+
+    server = HTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    calculator = BTCMiningCalculator()
+    monkeypatch.setattr(calculator, '_fetch_btc_price', lambda: pytest.fail("不应访问其他价格接口"))
+    monkeypatch.setattr(calculator, 'get_network_difficulty', lambda use_cache=False: DIFFICULTY)
+    try:
+        source = price_url_source(calculator, f"http://127.0.0.1:{server.server_address[1]}/price")
+        assert source() is None
+        assert requested == ['/price']
+    finally:
+        server.shutdown()
+        server.server_close()
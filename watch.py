@@ -0,0 +1,371 @@
+import argparse
+import contextlib
+import io
+import json
+import math
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+
+import requests
+
+from btc_mining_calculator import BTCMiningCalculator
+from incremental import build_dashboard_graph, miner_row
+from miner_catalog import MINER_MODELS
+
+# 价格或难度相对上次计算的变化超过阈值（%）才重新计算，难度每个周期才调整一次，任何调整都应触发
+DEFAULT_PRICE_THRESHOLD_PERCENT = 0.5
+DEFAULT_DIFFICULTY_THRESHOLD_PERCENT = 0.01
+DEFAULT_INTERVAL_SECONDS = 10
+
+ALERT_KINDS = {
+    'below_break_even': '跌破盈亏平衡',
+    'above_break_even': '恢复盈利',
+    'payback_exceeded': '回本天数超过上限',
+    'payback_recovered': '回本天数恢复到上限以内'
+}
+
+
+@dataclass(slots=True)
+class FleetConfig:
+    """
+    监控的矿场配置：各型号台数和计算参数，字段名与页面的计算图输入一致
+    """
+    units: dict
+    electricity_cost_kwh: float = 0.05
+    pool_fee_percent: float = 2.0
+    annual_utilization_rate: float = 100.0
+    maintenance_percent: float = 0.0
+    depreciation_percent: float = 0.0
+    block_reward: float = None
+    payback_limit_days: float = None
+
+    def __post_init__(self):
+        if isinstance(self.units, (list, tuple)):
+            self.units = {name: 1 for name in self.units}
+        unknown = [name for name in self.units if name not in MINER_MODELS]
+        if unknown:
+            raise KeyError(f"未知的矿机型号: {', '.join(unknown)}")
+        if not self.units:
+            raise ValueError("矿场配置中没有矿机")
+
+
+def load_fleet(path):
+    """
+    从JSON文件读取矿场配置
+    :param path: JSON文件，字段同FleetConfig，如
+                 {"units": {"Antminer S21": 100}, "electricity_cost_kwh": 0.06, "payback_limit_days": 720}
+    :return: FleetConfig
+    """
+    with open(path, encoding='utf-8') as f:
+        return FleetConfig(**json.load(f))
+
+
+@dataclass(slots=True)
+class Alert:
+    """
+    告警记录，回本天数为inf（无法回本）时记为None
+    """
+    kind: str
+    model: str
+    message: str
+    btc_price: float
+    network_difficulty: float
+    daily_profit_usd: float
+    fleet_daily_profit_usd: float
+    roi_days: float
+    timestamp: str = field(default_factory=lambda: datetime.now().isoformat(timespec='seconds'))
+
+    def to_dict(self):
+        record = asdict(self)
+        if record['roi_days'] is not None and not math.isfinite(record['roi_days']):
+            record['roi_days'] = None
+        return record
+
+
+class StdoutSink:
+    def __call__(self, alert):
+        print(f"[{alert.timestamp}] {alert.message}")
+
+
+class FileSink:
+    """
+    按行追加JSON告警记录
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def __call__(self, alert):
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(alert.to_dict(), ensure_ascii=False) + '\n')
+
+
+class WebhookSink:
+    """
+    以JSON POST告警记录，发送失败只打印错误，不影响监控
+    """
+
+    def __init__(self, url, timeout=5):
+        self.url = url
+        self.timeout = timeout
+
+    def __call__(self, alert):
+        try:
+            response = requests.post(self.url, json=alert.to_dict(), timeout=self.timeout)
+            if response.status_code >= 400:
+                print(f"告警Webhook返回状态码: {response.status_code}")
+        except Exception as e:
+            print(f"发送告警Webhook时出错: {e}")
+
+
+def calculator_source(calculator, quiet=False):
+    """
+    通过计算器获取市场快照（可先修改计算器的API地址指向本地接口）
+    :param quiet: 是否屏蔽获取数据时的输出
+    :return: 无参数的函数，返回市场快照，失败时返回None
+    """
+    def fetch():
+        if not quiet:
+            return calculator.get_market_snapshot()
+        with contextlib.redirect_stdout(io.StringIO()):
+            return calculator.get_market_snapshot()
+    return fetch
+
+
+def price_url_source(calculator, price_url, quiet=False):
+    """
+    从指定的Binance格式价格接口获取价格，失败时不回退到其他交易所，难度仍通过计算器获取
+    :param price_url: 返回{"price": "..."}的接口地址，如本地模拟接口
+    :param quiet: 是否屏蔽获取难度时的输出
+    :return: 无参数的函数，返回市场快照，失败时返回None
+    """
+    def fetch():
+        try:
+            response = requests.get(price_url, timeout=10)
+            response.raise_for_status()
+            btc_price = float(response.json()['price'])
+        except Exception as e:
+            print(f"从 {price_url} 获取价格时出错: {e}")
+            return None
+        if quiet:
+            with contextlib.redirect_stdout(io.StringIO()):
+                network_difficulty = calculator.get_network_difficulty()
+        else:
+            network_difficulty = calculator.get_network_difficulty()
+        if not network_difficulty:
+            return None
+        return {'btc_price': btc_price, 'network_difficulty': network_difficulty}
+    return fetch
+
+
+def snapshot_file_source(path):
+    """
+    每次调用时重新读取市场快照JSON文件，可由其他进程更新该文件
+    :return: 无参数的函数，返回市场快照，读取失败时返回None
+    """
+    def fetch():
+        try:
+            with open(path, encoding='utf-8') as f:
+                snapshot = json.load(f)
+            return {'btc_price': float(snapshot['btc_price']),
+                    'network_difficulty': float(snapshot['network_difficulty'])}
+        except Exception as e:
+            print(f"读取市场快照文件时出错: {e}")
+            return None
+    return fetch
+
+
+def moved_beyond(previous, snapshot, price_threshold_percent, difficulty_threshold_percent):
+    """
+    判断价格或难度相对previous的变化是否超过阈值
+    """
+    if previous is None:
+        return True
+    for key, threshold in (('btc_price', price_threshold_percent),
+                           ('network_difficulty', difficulty_threshold_percent)):
+        before, after = float(previous[key]), float(snapshot[key])
+        if abs(after - before) > abs(before) * threshold / 100:
+            return True
+    return False
+
+
+class FleetWatcher:
+    """
+    持续监控矿场收益：定期获取市场数据，变化超过阈值时通过计算图增量重算（只重算依赖市场数据的阶段），
+    型号跨过盈亏平衡或回本天数超过上限时发出告警。
+    首次计算时已处于亏损或超过回本上限的型号同样告警。
+    """
+
+    def __init__(self, calculator, fleet, sinks=None, source=None,
+                 price_threshold_percent=DEFAULT_PRICE_THRESHOLD_PERCENT,
+                 difficulty_threshold_percent=DEFAULT_DIFFICULTY_THRESHOLD_PERCENT):
+        """
+        :param calculator: BTCMiningCalculator实例
+        :param fleet: FleetConfig
+        :param sinks: 告警输出函数列表，为None时输出到标准输出
+        :param source: 返回市场快照的函数，为None时通过calculator获取
+        :param price_threshold_percent: 触发重算的价格变化阈值（%）
+        :param difficulty_threshold_percent: 触发重算的难度变化阈值（%）
+        """
+        self.calculator = calculator
+        self.fleet = fleet
+        self.sinks = [StdoutSink()] if sinks is None else list(sinks)
+        self.source = source or calculator_source(calculator)
+        self.price_threshold_percent = price_threshold_percent
+        self.difficulty_threshold_percent = difficulty_threshold_percent
+        self.graph = build_dashboard_graph()
+        self.rows = {name: miner_row(name, MINER_MODELS[name]) for name in fleet.units}
+        self.last_snapshot = None
+        self.results = {}
+        # 各型号上次的状态：(是否盈利, 回本天数是否在上限以内)
+        self._states = {name: (True, True) for name in fleet.units}
+        self.polls = 0
+        self.evaluations = 0
+        # 最近一次轮询中计算图各阶段重算的行数，未重算时为空
+        self.last_recomputed = {}
+
+    def _inputs(self, snapshot):
+        fleet = self.fleet
+        return {
+            'snapshot': {'btc_price': float(snapshot['btc_price']),
+                         'network_difficulty': float(snapshot['network_difficulty'])},
+            'block_reward': self.calculator.block_reward if fleet.block_reward is None else fleet.block_reward,
+            'pool_fee_percent': fleet.pool_fee_percent,
+            'annual_utilization_rate': fleet.annual_utilization_rate,
+            'electricity_cost_kwh': fleet.electricity_cost_kwh,
+            'maintenance_percent': fleet.maintenance_percent,
+            'depreciation_percent': fleet.depreciation_percent
+        }
+
+    def _state(self, result):
+        limit = self.fleet.payback_limit_days
+        return result.daily_profit_usd > 0, limit is None or result.roi_days <= limit
+
+    def _alert(self, kind, name, result, snapshot):
+        units = self.fleet.units[name]
+        if kind in ('payback_exceeded', 'payback_recovered'):
+            detail = f"回本天数 {result.roi_days:.0f} 天（上限 {self.fleet.payback_limit_days:g} 天）"
+        else:
+            detail = f"每日净利润 ${result.daily_profit_usd:,.2f}/台，{units} 台合计 ${result.daily_profit_usd * units:,.2f}"
+        return Alert(
+            kind=kind, model=name,
+            message=f"{name} {ALERT_KINDS[kind]}: {detail}（BTC ${float(snapshot['btc_price']):,.2f}，"
+                    f"难度 {float(snapshot['network_difficulty']):.4e}）",
+            btc_price=float(snapshot['btc_price']), network_difficulty=float(snapshot['network_difficulty']),
+            daily_profit_usd=float(result.daily_profit_usd),
+            fleet_daily_profit_usd=float(result.daily_profit_usd * units), roi_days=float(result.roi_days))
+
+    def update(self, snapshot):
+        """
+        用一次市场快照更新监控状态，变化未超过阈值时不计算
+        :param snapshot: 市场数据快照
+        :return: 本次产生的Alert列表
+        """
+        if not moved_beyond(self.last_snapshot, snapshot, self.price_threshold_percent,
+                            self.difficulty_threshold_percent):
+            self.last_recomputed = {}
+            return []
+        results = self.graph.evaluate('comparison', list(self.rows.values()), self._inputs(snapshot))
+        self.last_recomputed = dict(self.graph.last_recomputed)
+        self.results = {name: results[row] for name, row in self.rows.items()}
+        self.last_snapshot = snapshot
+        self.evaluations += 1
+
+        alerts = []
+        for name, result in self.results.items():
+            (was_profitable, was_within), (profitable, within) = self._states[name], self._state(result)
+            if profitable != was_profitable:
+                alerts.append(self._alert('above_break_even' if profitable else 'below_break_even',
+                                          name, result, snapshot))
+            if within != was_within:
+                alerts.append(self._alert('payback_recovered' if within else 'payback_exceeded',
+                                          name, result, snapshot))
+            self._states[name] = (profitable, within)
+        for alert in alerts:
+            for sink in self.sinks:
+                sink(alert)
+        return alerts
+
+    def poll_once(self):
+        """
+        获取一次市场数据并更新，获取失败时保持上次的状态
+        :return: 本次产生的Alert列表
+        """
+        self.polls += 1
+        snapshot = self.source()
+        if snapshot is None:
+            print("获取市场数据失败，等待下次轮询")
+            self.last_recomputed = {}
+            return []
+        return self.update(snapshot)
+
+    def run(self, interval_seconds=DEFAULT_INTERVAL_SECONDS, max_polls=None):
+        """
+        按固定间隔持续轮询，直到达到max_polls次（为None时一直运行）
+        """
+        next_poll = time.monotonic()
+        while True:
+            self.poll_once()
+            if max_polls is not None and self.polls >= max_polls:
+                return
+            # 单次轮询超过间隔时不补跑错过的轮次
+            next_poll = max(next_poll + interval_seconds, time.monotonic())
+            time.sleep(max(next_poll - time.monotonic(), 0))
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="持续监控矿场收益，跨过盈亏平衡或回本天数超限时告警")
+    parser.add_argument('fleet', help="矿场配置JSON文件")
+    parser.add_argument('--interval', type=float, default=DEFAULT_INTERVAL_SECONDS, help="轮询间隔（秒）")
+    parser.add_argument('--max-polls', type=int, help="轮询次数，默认一直运行")
+    parser.add_argument('--price-threshold', type=float, default=DEFAULT_PRICE_THRESHOLD_PERCENT,
+                        help="触发重算的价格变化（%%）")
+    parser.add_argument('--difficulty-threshold', type=float, default=DEFAULT_DIFFICULTY_THRESHOLD_PERCENT,
+                        help="触发重算的难度变化（%%）")
+    parser.add_argument('--payback-limit', type=float, help="回本天数上限，覆盖配置文件中的payback_limit_days")
+    parser.add_argument('--snapshot-file', help="每次轮询重新读取的市场快照JSON文件，不再访问外部API")
+    parser.add_argument('--price-url', help="Binance格式的价格接口地址，如本地模拟接口；指定后只使用该接口，"
+                                            "失败时不回退到其他交易所")
+    parser.add_argument('--difficulty-url', help="返回难度文本的接口地址")
+    parser.add_argument('--alert-file', help="追加写入告警记录（JSON Lines）的文件")
+    parser.add_argument('--webhook', help="以POST发送告警的地址")
+    parser.add_argument('--quiet', action='store_true', help="不输出获取市场数据的过程")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    fleet = load_fleet(args.fleet)
+    if args.payback_limit is not None:
+        fleet.payback_limit_days = args.payback_limit
+
+    calculator = BTCMiningCalculator()
+    if args.difficulty_url:
+        calculator.difficulty_api_url = args.difficulty_url
+    if args.snapshot_file:
+        source = snapshot_file_source(args.snapshot_file)
+    elif args.price_url:
+        source = price_url_source(calculator, args.price_url, quiet=args.quiet)
+    else:
+        source = calculator_source(calculator, quiet=args.quiet)
+
+    sinks = [StdoutSink()]
+    if args.alert_file:
+        sinks.append(FileSink(args.alert_file))
+    if args.webhook:
+        sinks.append(WebhookSink(args.webhook))
+
+    watcher = FleetWatcher(calculator, fleet, sinks=sinks, source=source,
+                           price_threshold_percent=args.price_threshold,
+                           difficulty_threshold_percent=args.difficulty_threshold)
+    print(f"开始监控 {len(fleet.units)} 个型号，轮询间隔 {args.interval:g} 秒")
+    try:
+        watcher.run(args.interval, args.max_polls)
+    except KeyboardInterrupt:
+        pass
+    print(f"共轮询 {watcher.polls} 次，重新计算 {watcher.evaluations} 次")
+
+
+if __name__ == "__main__":
+    main()